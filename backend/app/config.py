@@ -14,6 +14,85 @@ class Settings(BaseSettings):
     APP_NAME: str = "Employee Performance System"
     DEBUG: bool = True
     
+    # Event stream
+    EVENT_BUFFER_SIZE: int = 256  # per-subscriber, oldest events are dropped
+    EVENT_KEEPALIVE_SECONDS: int = 15
+    
+    # Model serving
+    MODEL_RELOAD_CHECK_SECONDS: float = 5.0
+    MODEL_PROFILE: str = "full"  # full, hist or linear
+    PREDICTION_BATCH_ENABLED: bool = True  # coalesce concurrent single predictions
+    PREDICTION_BATCH_MAX_WAIT_MS: float = 2.0
+    PREDICTION_BATCH_MAX_SIZE: int = 64
+    BATCH_SCORING_WORKERS: int = 1  # >1 scores /predict/batch shards on a process pool
+    BATCH_SCORING_CHUNK_SIZE: int = 5000
+    WHATIF_MAX_GRID_ROWS: int = 10000  # employees x sweep combinations per request
+    EXPLANATION_CACHE_SIZE: int = 10000
+    
+    # Prediction history
+    HISTORY_ENABLED: bool = True
+    HISTORY_BATCH_SIZE: int = 500  # buffered single predictions per insert
+    HISTORY_FLUSH_SECONDS: float = 2.0
+    HISTORY_RAW_RETENTION_DAYS: int = 30  # older rows are compacted into daily sums; at least 1
+    
+    # Re-prediction when model inputs change
+    REPREDICT_ENABLED: bool = True
+    REPREDICT_DEBOUNCE_SECONDS: float = 2.0  # quiet time after the last change
+    REPREDICT_MAX_DELAY_SECONDS: float = 30.0  # score at the latest this long after the first change
+    REPREDICT_BATCH_SIZE: int = 1000
+    REPREDICT_MAX_ATTEMPTS: int = 5  # failures before an employee is dropped from the queue
+    
+    # In-memory workforce snapshot for analytics
+    SNAPSHOT_ENABLED: bool = True
+    SNAPSHOT_MAX_ROWS: int = 2_000_000  # more active employees than this: analytics use SQL
+    SNAPSHOT_REFRESH_SECONDS: float = 300.0  # full rebuild; picks up other processes' writes
+    
+    # Similar-employee search (in-memory nearest-neighbour index)
+    SIMILAR_ENABLED: bool = True
+    SIMILAR_MAX_ROWS: int = 2_000_000  # more employees than this: search is unavailable
+    SIMILAR_REFRESH_SECONDS: float = 900.0  # full rebuild; picks up other processes' writes
+    
+    # Feature drift monitor (live scored features vs. the training data)
+    DRIFT_HALF_LIFE_ROWS: float = 50_000  # older rows count half after this many more; 0 keeps all
+    DRIFT_MIN_ROWS: int = 500  # fewer effective rows: status is insufficient_data
+    DRIFT_SYNC_SECONDS: float = 5.0  # workers publish their histograms and apply resets this often
+    
+    # Model experiments (challenger versions from the registry)
+    SHADOW_VERSION: Optional[str] = None  # also scores every real batch, off the request path
+    SHADOW_PROFILE: Optional[str] = None  # None: the profile the request used
+    SHADOW_QUEUE_SIZE: int = 64  # batches waiting for the shadow model; more are dropped
+    AB_VERSION: Optional[str] = None  # serves AB_PERCENT of single-employee predictions
+    AB_PERCENT: float = 0.0
+    EXPERIMENTS_SYNC_SECONDS: float = 5.0  # workers pick up changes made through the API this often
+    
+    # Departure forecast
+    FORECAST_HORIZON_MONTHS: float = 12.0  # period the model's attrition_probability covers
+    FORECAST_SIMULATIONS: int = 2000
+    
+    # Background jobs (jobs table)
+    JOB_WORKERS: int = 1  # worker threads per process; 0 only enqueues
+    JOB_POLL_SECONDS: float = 1.0
+    JOB_HEARTBEAT_SECONDS: float = 10.0
+    JOB_STALE_SECONDS: float = 60.0  # running jobs without a heartbeat this long are requeued
+    JOB_RETRY_BACKOFF_SECONDS: float = 5.0  # doubled on every further attempt
+    EXPORT_DIR: str = "exports"
+    
+    # Multi-worker serving (gunicorn.conf.py)
+    # 1 by default: the event stream and the workforce snapshot and
+    # similarity index only see writes made in their own process (others
+    # arrive with the periodic refresh). 0 = one per CPU
+    SERVER_WORKERS: int = 1
+    SERVER_PRELOAD: bool = True  # load models once in the master and fork workers
+    
+    # Background retraining
+    RETRAIN_ENABLED: bool = False
+    RETRAIN_DATA_SOURCE: str = "db"  # "db", a CSV file or a columnar dataset
+    RETRAIN_MIN_CHANGES: int = 500  # new employees + feedback + predictions
+    RETRAIN_CRON: Optional[str] = None  # e.g. "0 3 * * 0" (minute hour day month weekday)
+    RETRAIN_CHECK_SECONDS: int = 60
+    RETRAIN_ACCURACY_TOLERANCE: float = 0.005
+    RETRAIN_RMSE_TOLERANCE: float = 0.02
+    
     class Config:
         env_file = ".env"
 
@@ -2,7 +2,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import init_db
-from app.routes import auth, employee, prediction, feedback
+from app.ml.drift import get_drift_monitor
+from app.ml.experiments import get_model_experiments
+from app.ml.history import get_history_writer
+from app.ml.repredict import get_reprediction_queue
+from app.ml.scheduler import get_retrain_scheduler
+from app.ml.similar import get_similarity_index
+from app.ml.snapshot import get_workforce_snapshot
+from app.routes import auth, employee, prediction, feedback, events, jobs, analytics
+from app.utils.jobs import get_job_queue
 
 # Create FastAPI app
 app = FastAPI(
@@ -25,12 +33,58 @@ app.add_middleware(
 async def startup_event():
     init_db()
     print("✓ Database initialized")
+    
+    if settings.RETRAIN_ENABLED:
+        get_retrain_scheduler().start()
+    
+    if settings.REPREDICT_ENABLED:
+        get_reprediction_queue().start()
+    
+    if settings.SNAPSHOT_ENABLED:
+        get_workforce_snapshot().start()
+    
+    if settings.SIMILAR_ENABLED:
+        get_similarity_index().start()
+    
+    # Share drift counts with, and follow resets from, the other workers
+    get_drift_monitor().start()
+    
+    # Follows the shared configuration set through /predict/experiments
+    get_model_experiments().start()
+    
+    if settings.JOB_WORKERS > 0:
+        get_job_queue().start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    get_job_queue().stop()
+    
+    if settings.RETRAIN_ENABLED:
+        get_retrain_scheduler().stop()
+    
+    if settings.REPREDICT_ENABLED:
+        get_reprediction_queue().stop()
+    
+    if settings.SNAPSHOT_ENABLED:
+        get_workforce_snapshot().stop()
+    
+    if settings.SIMILAR_ENABLED:
+        get_similarity_index().stop()
+    
+    get_model_experiments().stop()
+    get_drift_monitor().stop()
+    
+    # Write out buffered prediction history
+    get_history_writer().stop()
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(employee.router)
 app.include_router(prediction.router)
 app.include_router(feedback.router)
+app.include_router(events.router)
+app.include_router(jobs.router)
+app.include_router(analytics.router)
 
 # Root endpoint
 @app.get("/")
@@ -0,0 +1,137 @@
+from typing import Dict, List, Optional
+import numpy as np
+from app.ml.db_source import EmployeeArrays
+
+# Reported name -> snapshot column
+DISTRIBUTION_METRICS = {
+    'salary': 'salary',
+    'performance': 'performance_score',
+    'satisfaction': 'satisfaction_level_raw'
+}
+PERCENTILES = (10, 50, 90)
+
+def group_order(groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Permutation that makes each group contiguous (stable, so a radix sort on small codes)"""
+
+    dtype = np.int8 if n_groups <= 127 else np.int16 if n_groups <= 32767 else np.int32
+    return np.argsort(groups.astype(dtype), kind='stable')
+
+def grouped_percentiles(values: np.ndarray, counts: np.ndarray,
+                        percentiles=PERCENTILES) -> np.ndarray:
+    """Percentiles per group: (len(counts), len(percentiles)).
+
+    `values` holds the groups one after another, `counts[g]` values for
+    group g (see group_order), so each group is a contiguous slice that
+    np.percentile partitions in linear time. Empty groups get NaN.
+    """
+
+    result = np.full((len(counts), len(percentiles)), np.nan)
+    start = 0
+    for g, count in enumerate(counts):
+        if count:
+            result[g] = np.percentile(values[start:start + count], percentiles)
+        start += count
+    return result
+
+def grouped_histograms(values: np.ndarray, groups: np.ndarray, n_groups: int, bins: int):
+    """(edges, counts per group), with the same np.histogram edges for every group"""
+
+    if not len(values):
+        return np.zeros(bins + 1), np.zeros((n_groups, bins), dtype=np.int64)
+
+    low, high = float(values.min()), float(values.max())
+    if high == low:
+        high = low + 1
+    edges = np.linspace(low, high, bins + 1)
+    # Like np.histogram the last bin is closed on the right
+    index = ((values - low) * (bins / (high - low))).astype(np.intp)
+    np.minimum(index, bins - 1, out=index)
+    index += groups * bins
+    counts = np.bincount(index, minlength=n_groups * bins).reshape(n_groups, bins)
+    return edges, counts
+
+def grouped_summary(values: np.ndarray, groups: np.ndarray, order: np.ndarray,
+                    n_groups: int, bins: int) -> Dict:
+    """Count, mean, percentiles and histogram of one column per group, ignoring NaN"""
+
+    valid = ~np.isnan(values)
+    counts = np.bincount(groups[valid], minlength=n_groups)
+    sums = np.bincount(groups[valid], weights=values[valid], minlength=n_groups)
+    ordered = values[order]
+    edges, histograms = grouped_histograms(values[valid], groups[valid], n_groups, bins)
+    return {
+        'count': counts,
+        'mean': np.divide(sums, counts, out=np.full(n_groups, np.nan), where=counts > 0),
+        'percentiles': grouped_percentiles(ordered[~np.isnan(ordered)], counts),
+        'edges': edges,
+        'histogram': histograms
+    }
+
+def _pearson(n, sx, sy, sxx, syy, sxy) -> np.ndarray:
+    covariance = n * sxy - sx * sy
+    spread = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = covariance / np.sqrt(spread)
+    return np.where((n < 2) | (spread <= 0), np.nan, correlation)
+
+def grouped_correlation(x: np.ndarray, y: np.ndarray, groups: np.ndarray, n_groups: int):
+    """(Pearson correlation of x and y per group, overall), from grouped sums; NaN when undefined"""
+
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y, groups = x[valid], y[valid], groups[valid]
+    if len(x):
+        # Centre first so the sums of squares do not cancel catastrophically
+        x = x - x.mean()
+        y = y - y.mean()
+
+    sums = [np.bincount(groups, minlength=n_groups).astype(np.float64)]
+    sums += [np.bincount(groups, weights=w, minlength=n_groups) for w in (x, y, x * x, y * y, x * y)]
+    overall = _pearson(*(np.array([s.sum()]) for s in sums))[0]
+    return _pearson(*sums), overall
+
+def _number(value) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+def department_analytics(employees: EmployeeArrays, bins: int = 10) -> Dict:
+    """Per-department distributions and the work hours / attrition correlation.
+
+    Rows are grouped once by department code; means, histograms and
+    correlations are grouped sums (np.bincount) over all departments at
+    once, and percentiles partition each department's contiguous slice.
+    """
+
+    groups = employees['department'].astype(np.intp)
+    n_groups = len(employees.departments)
+    sizes = np.bincount(groups, minlength=n_groups)
+    order = group_order(groups, n_groups)
+
+    metrics = {
+        name: grouped_summary(employees[column].astype(np.float64), groups, order, n_groups, bins)
+        for name, column in DISTRIBUTION_METRICS.items()
+    }
+    correlation, overall = grouped_correlation(
+        employees['work_hours'].astype(np.float64), employees['attrition_probability'], groups, n_groups
+    )
+
+    departments: List[Dict] = []
+    for g in np.argsort(employees.departments.astype(str)):
+        if sizes[g] == 0:
+            continue
+        entry = {'department': str(employees.departments[g]), 'employees': int(sizes[g])}
+        for name, metric in metrics.items():
+            entry[name] = {
+                'count': int(metric['count'][g]),
+                'mean': _number(metric['mean'][g]),
+                **{f'p{p}': _number(metric['percentiles'][g, i]) for i, p in enumerate(PERCENTILES)},
+                'histogram': metric['histogram'][g].tolist()
+            }
+        entry['work_hours_attrition_correlation'] = _number(correlation[g])
+        departments.append(entry)
+
+    return {
+        'employees': int(len(groups)),
+        'bins': bins,
+        'histogram_edges': {name: metric['edges'].tolist() for name, metric in metrics.items()},
+        'work_hours_attrition_correlation': _number(overall),
+        'departments': departments
+    }
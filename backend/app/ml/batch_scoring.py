@@ -0,0 +1,219 @@
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine
+from app.models.employee import Employee
+from app.models.prediction_history import PredictionHistory
+from app.ml.db_source import MODEL_COLUMNS, EmployeeArrays, read_employee_arrays
+from app.ml.explain import explain_features
+from app.ml.history import history_rows
+from app.ml.predict import MLPredictor
+from app.ml.registry import current_version
+
+def shard_ranges(n_shards: int, bind=engine) -> List[Tuple[int, int]]:
+    """Split active employees into id ranges [low, high) of about equal size"""
+
+    active = Employee.is_active == True
+    with bind.connect() as conn:
+        count = conn.execute(select(func.count()).where(active)).scalar()
+        if count == 0:
+            return []
+        n_shards = max(1, min(n_shards, count))
+
+        # One primary-key lookup per boundary, so ranges balance rows
+        # even when ids have gaps
+        bounds = [
+            conn.execute(
+                select(Employee.id).where(active).order_by(Employee.id)
+                .offset(count * i // n_shards).limit(1)
+            ).scalar()
+            for i in range(n_shards)
+        ]
+        bounds.append(conn.execute(select(func.max(Employee.id)).where(active)).scalar() + 1)
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def write_predictions(db: Session, predictor: MLPredictor, employees: EmployeeArrays,
+                      features: np.ndarray, profile: Optional[str] = None,
+                      history: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Score feature rows as one batch and write the results back.
+
+    One bulk UPDATE by primary key (plus one history insert) without
+    committing. Returns (attrition probabilities, performance predictions).
+    """
+
+    probabilities, performances = predictor.score_features(features, profile)
+    ids = employees['id'].tolist()
+    probabilities_list, performances_list = probabilities.tolist(), performances.tolist()
+    db.execute(update(Employee), [
+        {
+            'id': employee_id,
+            'attrition_prediction': 'Y' if probability > 0.5 else 'N',
+            'attrition_probability': probability,
+            'performance_prediction': performance,
+            'performance_score': performance
+        }
+        for employee_id, probability, performance in zip(ids, probabilities_list, performances_list)
+    ])
+    if history:
+        db.execute(insert(PredictionHistory), history_rows(
+            [{'employee_id': employee_id, 'department': department,
+              'attrition_probability': probability, 'performance_prediction': performance}
+             for employee_id, department, probability, performance
+             in zip(ids, employees.department_names().tolist(), probabilities_list, performances_list)],
+            predictor.version
+        ))
+    return probabilities, performances
+
+def score_shard(low: int, high: int, version: Optional[str] = None, profile: Optional[str] = None,
+                chunk_size: int = 5000, predictor: Optional[MLPredictor] = None,
+                explain: bool = False, history: bool = False) -> Dict:
+    """Score and update the active employees with low <= id < high.
+
+    Runs in a pool worker with its own database connection. Without a
+    predictor the version is loaded memory-mapped, so workers scoring
+    the same version share the model arrays. Rows are read in id order
+    chunk by chunk straight into NumPy arrays (no ORM objects), and each
+    chunk is written back in one bulk UPDATE
+    and committed, so a shard never holds more than one chunk. With
+    explain, per-employee contributions are returned as well; with
+    history, each chunk is appended to the prediction history in the
+    same transaction.
+    """
+
+    start = time.perf_counter()
+    predictor = predictor or MLPredictor(version, mmap=True)
+    load_seconds = time.perf_counter() - start
+
+    updated = skipped = 0
+    explanations = []
+    last_id = low - 1
+    with SessionLocal() as db:
+        while True:
+            # Paginate on the primary key alone and drop inactive rows
+            # here: with an is_active predicate SQLite (without ANALYZE
+            # statistics) walks ix_employees_risk and sorts every chunk
+            employees = read_employee_arrays(
+                db, MODEL_COLUMNS + ('is_active',), (Employee.id > last_id, Employee.id < high),
+                limit=chunk_size
+            )
+            if not len(employees):
+                break
+            last_id = int(employees['id'][-1])
+            employees = employees.take(employees['is_active'])
+
+            # Departments the model has never seen cannot be encoded
+            features, known = employees.features(predictor.label_encoder)
+            skipped += int((~known).sum())
+            if not known.any():
+                continue
+            employees, features = employees.take(known), features[known]
+
+            write_predictions(db, predictor, employees, features, profile, history)
+            if explain:
+                explanations.extend(
+                    {'employee_id': employee_id, **explanation}
+                    for employee_id, explanation
+                    in zip(employees['id'].tolist(), explain_features(predictor, features, profile))
+                )
+            db.commit()
+            updated += len(employees)
+
+    seconds = time.perf_counter() - start
+    result = {
+        'low': low,
+        'high': high,
+        'updated': updated,
+        'skipped': skipped,
+        'load_seconds': load_seconds,
+        'seconds': seconds,
+        'rows_per_s': updated / seconds if seconds > 0 else 0.0
+    }
+    if explain:
+        result['explanations'] = explanations
+    return result
+
+def score_active_employees(workers: int = 1, shards: Optional[int] = None,
+                           profile: Optional[str] = None, chunk_size: int = 5000,
+                           predictor: Optional[MLPredictor] = None,
+                           progress: Optional[Callable[[Dict], None]] = None,
+                           explain: bool = False, history: bool = False) -> Dict:
+    """Re-score every active employee, split into id-range shards.
+
+    With workers > 1 the shards run on a process pool (spawned, so no
+    connection or lock is inherited from the caller); otherwise they run
+    in this process using `predictor`. Several shards per worker keep
+    the pool busy when shards finish at different speeds. `progress` is
+    called with running totals after each shard.
+    """
+
+    version = predictor.version if predictor is not None else current_version()
+    ranges = shard_ranges(shards or workers * 4)
+    start = time.perf_counter()
+    results = []
+
+    def collect(index, result):
+        result['shard'] = index
+        results.append(result)
+        if progress is not None:
+            progress({
+                'completed_shards': len(results),
+                'total_shards': len(ranges),
+                'updated_count': sum(r['updated'] for r in results)
+            })
+
+    if workers <= 1:
+        predictor = predictor or MLPredictor(version)
+        for index, (low, high) in enumerate(ranges):
+            collect(index, score_shard(low, high, version, profile, chunk_size, predictor, explain, history))
+    else:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {
+                executor.submit(score_shard, low, high, version, profile, chunk_size, None, explain, history): index
+                for index, (low, high) in enumerate(ranges)
+            }
+            for future in as_completed(futures):
+                collect(futures[future], future.result())
+
+    seconds = time.perf_counter() - start
+    updated = sum(r['updated'] for r in results)
+    results.sort(key=lambda r: r['shard'])
+    summary = {
+        'version': version,
+        'workers': workers,
+        'updated_count': updated,
+        'skipped_count': sum(r['skipped'] for r in results),
+        'seconds': seconds,
+        'rows_per_s': updated / seconds if seconds > 0 else 0.0,
+        'shards': results
+    }
+    if explain:
+        summary['explanations'] = [e for r in results for e in r.pop('explanations')]
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score all active employees in parallel shards")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--shards', type=int, default=None, help="Defaults to 4 per worker")
+    parser.add_argument('--profile', default=None)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--history', action='store_true', help="Append to the prediction history")
+    args = parser.parse_args()
+
+    def report(totals):
+        print(f"Shard {totals['completed_shards']}/{totals['total_shards']} done, "
+              f"{totals['updated_count']} employees updated")
+
+    summary = score_active_employees(args.workers, args.shards, args.profile, args.chunk_size,
+                                     progress=report, history=args.history)
+    for shard in summary['shards']:
+        print(f"  shard {shard['shard']}: ids [{shard['low']}, {shard['high']}), "
+              f"{shard['updated']} rows, {shard['rows_per_s']:.0f} rows/s")
+    print(f"✓ Scored {summary['updated_count']} employees with {summary['workers']} workers "
+          f"in {summary['seconds']:.1f}s ({summary['rows_per_s']:.0f} rows/s)")
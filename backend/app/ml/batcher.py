@@ -0,0 +1,151 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+from app.config import settings
+from app.ml.predict import MLPredictor, get_predictor
+
+class BatchMetrics:
+    """Batch sizes and queueing delay, the latter over the most recent requests"""
+
+    def __init__(self, window: int = 4096):
+        self.batches = 0
+        self.rows = 0
+        self.size_histogram = {}
+        self.queue_delays = deque(maxlen=window)
+        self.score_seconds = deque(maxlen=window)
+
+    def record(self, size: int, queue_delays: List[float], score_seconds: float):
+        self.batches += 1
+        self.rows += size
+        # Power-of-two buckets: 1, 2-3, 4-7, ...
+        low = 1 << (size.bit_length() - 1)
+        bucket = str(low) if low == 1 else f"{low}-{2 * low - 1}"
+        self.size_histogram[bucket] = self.size_histogram.get(bucket, 0) + 1
+        self.queue_delays.extend(queue_delays)
+        self.score_seconds.append(score_seconds)
+
+    def summary(self) -> Dict:
+        delays = np.array(self.queue_delays) * 1000
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': self.rows / self.batches if self.batches else 0.0,
+            'batch_size_histogram': dict(
+                sorted(self.size_histogram.items(), key=lambda item: int(item[0].split('-')[0]))
+            ),
+            'queue_delay_ms': {
+                'p50': float(np.percentile(delays, 50)) if len(delays) else 0.0,
+                'p99': float(np.percentile(delays, 99)) if len(delays) else 0.0,
+                'max': float(delays.max()) if len(delays) else 0.0
+            },
+            'mean_score_ms': float(np.mean(self.score_seconds) * 1000) if self.score_seconds else 0.0
+        }
+
+def _predict_each(predictor: MLPredictor, employees: List[Dict], profile: Optional[str]) -> List:
+    """predict_all per employee; a failing row yields its exception instead of a result"""
+    results = []
+    for employee in employees:
+        try:
+            results.append(predictor.predict_all(employee, profile))
+        except Exception as e:
+            results.append(e)
+    return results
+
+class PredictionBatcher:
+    """Coalesces concurrent single-employee predictions into one model call.
+
+    A request waits at most PREDICTION_BATCH_MAX_WAIT_MS for others to
+    join; a batch is scored as soon as it reaches PREDICTION_BATCH_MAX_SIZE.
+    Scoring runs in the default thread pool so the event loop keeps
+    accepting requests meanwhile. Requests are grouped per predictor
+    (the serving model unless an A/B challenger was passed) and profile.
+    """
+
+    def __init__(self, max_wait_ms: float, max_size: int):
+        self.max_wait = max_wait_ms / 1000
+        self.max_size = max_size
+        self.metrics = BatchMetrics()
+        self._pending = []
+        self._timer = None
+
+    async def predict(self, employee_data: Dict, profile: Optional[str] = None,
+                      predictor: Optional[MLPredictor] = None) -> Dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((employee_data, profile, future, time.perf_counter(), predictor))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._score(batch))
+
+    async def _score(self, batch):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            serving = get_predictor()
+
+            groups = {}
+            for item in batch:
+                groups.setdefault((item[4] or serving, item[1]), []).append(item)
+
+            for (predictor, profile), items in groups.items():
+                employees = [item[0] for item in items]
+                try:
+                    results = await loop.run_in_executor(None, predictor.predict_many, employees, profile)
+                except Exception:
+                    # One bad row (e.g. an unknown department) must not fail
+                    # the others, so fall back to scoring rows one by one
+                    results = await loop.run_in_executor(None, _predict_each, predictor, employees, profile)
+
+                for (_, _, future, _, _), result in zip(items, results):
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        except Exception as e:
+            # e.g. the predictor could not be loaded; no request may be left waiting
+            for item in batch:
+                if not item[2].done():
+                    item[2].set_exception(e)
+
+        self.metrics.record(
+            len(batch),
+            [started - item[3] for item in batch],
+            time.perf_counter() - started
+        )
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': settings.PREDICTION_BATCH_ENABLED,
+            'max_wait_ms': self.max_wait * 1000,
+            'max_size': self.max_size,
+            'pending': len(self._pending),
+            **self.metrics.summary()
+        }
+
+# Singleton instance
+_batcher = None
+
+def get_prediction_batcher() -> PredictionBatcher:
+    """Get or create the prediction batcher"""
+    global _batcher
+    if _batcher is None:
+        _batcher = PredictionBatcher(
+            settings.PREDICTION_BATCH_MAX_WAIT_MS, settings.PREDICTION_BATCH_MAX_SIZE
+        )
+    return _batcher
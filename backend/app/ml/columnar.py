@@ -0,0 +1,166 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+META_FILE = 'meta.json'
+
+# Physical type of every column the pipeline writes. String columns are
+# dictionary-encoded: a small code array plus the list of distinct values.
+EMPLOYEE_SCHEMA = {
+    'name': 'dictionary',
+    'email': 'dictionary',
+    'department': 'dictionary',
+    'age': 'int16',
+    'experience': 'int16',
+    'salary': 'float64',
+    'satisfaction_level': 'float32',
+    'last_evaluation_score': 'float32',
+    'project_count': 'int16',
+    'work_hours': 'int16',
+    'performance_score': 'float32',
+    'attrition': 'dictionary',
+    'attrition_probability': 'float32'
+}
+
+def is_columnar(path: str) -> bool:
+    """Columnar datasets are directories holding one .npy file per column"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+def _code_dtype(size: int):
+    return np.uint8 if size <= 255 else (np.uint16 if size <= 65535 else np.uint32)
+
+class ColumnarWriter:
+    """Write a fixed number of rows, chunk by chunk, into per-column .npy files.
+
+    Columns are preallocated as memory-mapped .npy files so chunks go
+    straight to disk. Dictionary columns collect their distinct values as
+    they are seen and are written at close().
+    """
+
+    def __init__(self, path: str, rows: int, schema: Dict[str, str]):
+        self.path = path
+        self.rows = rows
+        self.schema = schema
+        self.offset = 0
+        self.dictionaries = {name: {} for name, dtype in schema.items() if dtype == 'dictionary'}
+
+        os.makedirs(path, exist_ok=True)
+        self.arrays = {}
+        for name, dtype in schema.items():
+            # Codes are widened at close() if the dictionary stays small
+            physical = np.uint32 if dtype == 'dictionary' else dtype
+            self.arrays[name] = np.lib.format.open_memmap(
+                os.path.join(path, f'{name}.npy'), mode='w+', dtype=physical, shape=(rows,)
+            )
+
+    def _encode(self, name: str, values) -> np.ndarray:
+        dictionary = self.dictionaries[name]
+
+        if isinstance(values, pd.Categorical) or isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+            categorical = pd.Categorical(values)
+            local_codes = categorical.codes
+            categories = categorical.categories
+        else:
+            local_codes, categories = pd.factorize(np.asarray(values))
+
+        # Map this chunk's categories onto the dataset-wide dictionary
+        remap = np.empty(len(categories), dtype=np.uint32)
+        for i, value in enumerate(categories):
+            remap[i] = dictionary.setdefault(value, len(dictionary))
+        return remap[local_codes]
+
+    def write(self, chunk):
+        """Append a DataFrame (or dict of arrays) holding every schema column"""
+
+        n = len(chunk[next(iter(self.schema))])
+        if self.offset + n > self.rows:
+            raise ValueError(f"Writing {self.offset + n} rows into a dataset sized for {self.rows}")
+
+        for name, dtype in self.schema.items():
+            values = chunk[name]
+            if dtype == 'dictionary':
+                values = self._encode(name, values)
+            self.arrays[name][self.offset:self.offset + n] = np.asarray(values)
+
+        self.offset += n
+
+    def close(self):
+        if self.offset != self.rows:
+            raise ValueError(f"Expected {self.rows} rows, wrote {self.offset}")
+
+        meta = {'rows': self.rows, 'columns': {}}
+        for name, dtype in self.schema.items():
+            self.arrays[name].flush()
+            column = {'dtype': dtype}
+            if dtype == 'dictionary':
+                values = list(self.dictionaries[name])
+                column['dictionary'] = values
+                code_dtype = _code_dtype(len(values))
+                if code_dtype != np.uint32:
+                    codes = np.asarray(self.arrays[name]).astype(code_dtype)
+                    self.arrays[name] = None
+                    np.save(os.path.join(self.path, f'{name}.npy'), codes)
+                column['codes'] = np.dtype(code_dtype).name
+            meta['columns'][name] = column
+
+        self.arrays = {}
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump(meta, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+class ColumnarTable:
+    """Read-only view over a columnar dataset; columns are memory-mapped"""
+
+    def __init__(self, path: str, mmap: bool = True):
+        self.path = path
+        self.mmap = mmap
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.rows = self.meta['rows']
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.meta['columns'])
+
+    def dictionary(self, name: str) -> Optional[List[str]]:
+        return self.meta['columns'][name].get('dictionary')
+
+    def codes(self, name: str) -> np.ndarray:
+        """Raw column values; dictionary columns return their integer codes"""
+        return np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r' if self.mmap else None)
+
+    def column(self, name: str) -> np.ndarray:
+        """Decoded column; dictionary columns are materialized as strings"""
+
+        values = self.codes(name)
+        dictionary = self.dictionary(name)
+        if dictionary is not None:
+            return np.asarray(dictionary, dtype=object)[values]
+        return values
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load columns into a DataFrame; dictionary columns become Categoricals"""
+
+        data = {}
+        for name in columns or self.columns:
+            dictionary = self.dictionary(name)
+            if dictionary is not None:
+                data[name] = pd.Categorical.from_codes(self.codes(name), dictionary)
+            else:
+                data[name] = self.codes(name)
+        return pd.DataFrame(data)
+
+def write_frame(path: str, df: pd.DataFrame, schema: Dict[str, str] = None):
+    """Write a whole DataFrame as a columnar dataset"""
+
+    schema = schema or {name: dtype for name, dtype in EMPLOYEE_SCHEMA.items() if name in df.columns}
+    with ColumnarWriter(path, len(df), schema) as writer:
+        writer.write(df)
@@ -0,0 +1,300 @@
+import argparse
+import os
+import joblib
+import numpy as np
+from app.ml.registry import MODEL_DIR, PROFILES, profile_dir
+
+# Largest difference to the original model that compaction may introduce
+PARITY_TOLERANCE = 1e-4
+
+# Rows traversed at once; bounds the (rows x trees) node index matrix
+CHUNK_ROWS = 1024
+
+def _floor_float32(threshold: np.ndarray) -> np.ndarray:
+    """Largest float32 not above each float64 threshold.
+
+    scikit-learn compares float32 features against float64 thresholds.
+    For a float32 x, x <= t holds exactly when x <= floor32(t), so
+    routing is unchanged by the downcast.
+    """
+    threshold32 = threshold.astype(np.float32)
+    over = threshold32.astype(np.float64) > threshold
+    threshold32[over] = np.nextafter(threshold32[over], np.float32(-np.inf))
+    return threshold32
+
+def _prune_tree(tree, values):
+    """Copy one fitted tree, collapsing subtrees whose leaves all predict the same.
+
+    Returns (feature, threshold, left, value) with node ids local to the
+    tree. Nodes are laid out breadth-first with siblings side by side, so
+    the right child is always left + 1. Leaves point at themselves with
+    an infinite threshold, which keeps a finished row in place. Internal
+    nodes keep their own value (the mean over the samples that reached
+    them).
+    """
+
+    left, right = tree.children_left, tree.children_right
+
+    # Children always have larger ids than their parent, so a reverse
+    # scan visits every subtree before its root
+    uniform = left == -1
+    for node in range(tree.node_count - 1, -1, -1):
+        if left[node] != -1:
+            l, r = left[node], right[node]
+            if uniform[l] and uniform[r] and np.array_equal(values[l], values[r]):
+                uniform[node] = True
+                values[node] = values[l]
+
+    original = [0]
+    new_left = []
+    index = 0
+    while index < len(original):
+        node = original[index]
+        if uniform[node]:
+            new_left.append(index)
+        else:
+            new_left.append(len(original))
+            original.extend((left[node], right[node]))
+        index += 1
+
+    original = np.array(original)
+    feature = np.where(uniform[original], 0, tree.feature[original])
+    threshold = np.where(uniform[original], np.inf, tree.threshold[original])
+    return feature, threshold, np.array(new_left), values[original]
+
+class CompactForest:
+    """Read-only tree ensemble with float32 node arrays.
+
+    Replaces a fitted RandomForest or GradientBoosting model for
+    prediction. All trees live in one set of flat arrays and a batch is
+    routed through every tree at once, one level per step. Averaging
+    (forests) and the learning rate (boosting) are folded into the node
+    values, so a prediction is baseline + the sum of one leaf per tree.
+    """
+
+    def __init__(self, estimator):
+        # scikit-learn's ensemble module is only needed to build the
+        # compact model; workers that just load one never import it
+        from sklearn.dummy import DummyRegressor
+        from sklearn.ensemble import GradientBoostingRegressor
+        from sklearn.ensemble._forest import ForestClassifier, ForestRegressor
+
+        if isinstance(estimator, ForestClassifier):
+            self.classes_ = estimator.classes_
+            trees = [tree.tree_ for tree in estimator.estimators_]
+            scale = 1.0 / len(trees)
+            baseline = np.zeros(len(self.classes_))
+        elif isinstance(estimator, ForestRegressor):
+            self.classes_ = None
+            trees = [tree.tree_ for tree in estimator.estimators_]
+            scale = 1.0 / len(trees)
+            baseline = np.zeros(1)
+        elif isinstance(estimator, GradientBoostingRegressor):
+            self.classes_ = None
+            trees = [tree.tree_ for tree in estimator.estimators_[:, 0]]
+            scale = estimator.learning_rate
+            if estimator.init_ == 'zero':
+                baseline = np.zeros(1)
+            elif isinstance(estimator.init_, DummyRegressor):
+                baseline = np.asarray(estimator.init_.constant_, dtype=np.float64).reshape(1)
+            else:
+                raise ValueError("Only the default GradientBoosting init can be compacted")
+        else:
+            raise ValueError(f"Cannot compact {type(estimator).__name__}")
+
+        self.n_features_in_ = estimator.n_features_in_
+        self.feature_importances_ = estimator.feature_importances_
+        self.baseline = baseline
+        self.nodes_before = sum(tree.node_count for tree in trees)
+
+        parts = []
+        for tree in trees:
+            values = tree.value[:, 0, :].astype(np.float64)
+            if self.classes_ is not None:
+                values = values / values.sum(axis=1, keepdims=True)
+            parts.append(_prune_tree(tree, (values * scale).astype(np.float32)))
+
+        sizes = [len(part[0]) for part in parts]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        index_type = np.int32 if sum(sizes) < 2 ** 31 else np.int64
+        feature_type = np.int16 if self.n_features_in_ < 2 ** 15 else np.int32
+
+        self.roots = offsets.astype(index_type)
+        self.feature = np.concatenate([part[0] for part in parts]).astype(feature_type)
+        self.threshold = np.concatenate([_floor_float32(part[1]) for part in parts])
+        self.children_left = np.concatenate(
+            [part[2] + offset for part, offset in zip(parts, offsets)]).astype(index_type)
+        self.value = np.concatenate([part[3] for part in parts])
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self._build_index()
+
+    def _build_index(self):
+        # Native-width copies used as gather indices; not pickled
+        self._feature_index = self.feature.astype(np.intp)
+        self._left_index = self.children_left.astype(np.intp)
+        self._roots_index = self.roots.astype(np.intp)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('_feature_index', '_left_index', '_roots_index'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_index()
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node id reached in every tree, shape (rows, trees)"""
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        features = X.ravel()
+        row_start = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+
+        nodes = np.broadcast_to(self._roots_index, (n_rows, self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            x = features.take(row_start + self._feature_index.take(nodes))
+            # Right child is left + 1
+            nodes = self._left_index.take(nodes) + (x > self.threshold.take(nodes))
+        return nodes
+
+    def contributions(self, X: np.ndarray, output: int = 0):
+        """Per-feature contributions to one output column, by tree path.
+
+        Every split a row passes moves the prediction from the parent's
+        value to the child's; that difference is credited to the split
+        feature (Saabas' decomposition). Rows and trees advance one level
+        per step, like apply(). Returns (bias, contributions) where bias
+        is the prediction for an average row and
+        bias + contributions.sum(axis=1) equals the prediction.
+        """
+
+        values = self.value[:, output].astype(np.float64)
+        bias = self.baseline[output] + values.take(self._roots_index).sum()
+
+        X = np.asarray(X)
+        contributions = np.zeros((len(X), self.n_features_in_))
+        for start in range(0, len(X), CHUNK_ROWS):
+            block = np.ascontiguousarray(X[start:start + CHUNK_ROWS], dtype=np.float32)
+            n_rows, n_features = block.shape
+            features = block.ravel()
+            row_start = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+
+            totals = np.zeros(n_rows * n_features)
+            nodes = np.broadcast_to(self._roots_index, (n_rows, self.n_trees)).copy()
+            for _ in range(self.max_depth):
+                split_feature = row_start + self._feature_index.take(nodes)
+                child = self._left_index.take(nodes) + (features.take(split_feature) > self.threshold.take(nodes))
+                # Leaves point at themselves, so their delta is zero
+                totals += np.bincount(split_feature.ravel(),
+                                      weights=(values.take(child) - values.take(nodes)).ravel(),
+                                      minlength=n_rows * n_features)
+                nodes = child
+            contributions[start:start + n_rows] = totals.reshape(n_rows, n_features)
+
+        return bias, contributions
+
+    def _raw_predict(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X)
+        output = np.empty((len(X), len(self.baseline)))
+        for start in range(0, len(X), CHUNK_ROWS):
+            leaves = self.apply(X[start:start + CHUNK_ROWS])
+            output[start:start + CHUNK_ROWS] = (
+                self.baseline + self.value.take(leaves, axis=0).sum(axis=1, dtype=np.float64)
+            )
+        return output
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._raw_predict(X)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        raw = self._raw_predict(X)
+        if self.classes_ is not None:
+            return self.classes_[raw.argmax(axis=1)]
+        return raw[:, 0]
+
+def compact_estimator(estimator):
+    """CompactForest for a supported tree ensemble, None for anything else"""
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.ensemble._forest import ForestClassifier, ForestRegressor
+
+    if isinstance(estimator, (ForestClassifier, ForestRegressor, GradientBoostingRegressor)):
+        return CompactForest(estimator)
+    return None
+
+def _parity_error(original, compact, X) -> float:
+    if compact.classes_ is not None:
+        return float(np.abs(original.predict_proba(X) - compact.predict_proba(X)).max())
+    return float(np.abs(original.predict(X) - compact.predict(X)).max())
+
+def compact_model_dir(model_dir=MODEL_DIR, X=None, tolerance=PARITY_TOLERANCE):
+    """Replace the tree ensembles in a model directory with CompactForests.
+
+    X holds raw (unscaled) rows used to check that the compacted models
+    predict within `tolerance` of the originals. A model that fails the
+    check is left as it was. Already compacted and non-tree models are
+    skipped, so running this twice is harmless.
+    """
+
+    scalers = {
+        'attrition': joblib.load(f'{model_dir}/attrition_scaler.pkl'),
+        'performance': joblib.load(f'{model_dir}/performance_scaler.pkl')
+    }
+
+    report = {}
+    for profile in PROFILES:
+        for target, scaler in scalers.items():
+            path = f'{profile_dir(model_dir, profile)}/{target}_model.pkl'
+            if not os.path.exists(path):
+                continue
+
+            estimator = joblib.load(path)
+            compact = compact_estimator(estimator)
+            if compact is None:
+                continue
+
+            entry = {
+                'size_before': os.path.getsize(path),
+                'nodes_before': compact.nodes_before,
+                'nodes_after': compact.node_count
+            }
+            if X is not None:
+                entry['max_abs_error'] = _parity_error(estimator, compact, scaler.transform(X))
+                if entry['max_abs_error'] > tolerance:
+                    print(f"Warning: not compacting {path}, predictions differ by "
+                          f"{entry['max_abs_error']:.2e}")
+                    continue
+
+            joblib.dump(compact, path)
+            entry['size_after'] = os.path.getsize(path)
+            report[f'{profile}/{target}'] = entry
+
+            print(f"✓ Compacted {profile}/{target}: {entry['size_before'] / 1024:.0f}KB -> "
+                  f"{entry['size_after'] / 1024:.0f}KB, {entry['nodes_before']} -> "
+                  f"{entry['nodes_after']} nodes")
+
+    return report
+
+if __name__ == "__main__":
+    from app.ml.train_model import DATA_PATH, holdout_split, load_training_data
+
+    parser = argparse.ArgumentParser(description="Compact trained tree models for serving")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--data', default=DATA_PATH,
+                        help="Dataset whose holdout rows are used for the parity check")
+    args = parser.parse_args()
+
+    X, y_attrition, _, _ = load_training_data(args.data)
+    _, test_index = holdout_split(y_attrition)
+    compact_model_dir(args.model_dir, X[test_index])
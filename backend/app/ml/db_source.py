@@ -0,0 +1,295 @@
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
+from sklearn.preprocessing import LabelEncoder
+from app.database import engine
+from app.models.employee import Employee
+from app.models.feedback import Feedback
+from app.ml.predict import FEATURE_DEFAULTS
+
+NUMERIC_COLUMNS = [
+    'age', 'experience', 'salary', 'satisfaction_level',
+    'last_evaluation_score', 'project_count', 'work_hours'
+]
+
+def dictionary_encode(values, dictionary: Dict[str, int]) -> np.ndarray:
+    """int32 codes for `values`, adding unseen values to `dictionary` (value -> code).
+
+    Only the distinct values of a chunk are looked up in Python, so a
+    dictionary can be grown chunk by chunk over a whole table.
+    """
+
+    distinct, inverse = np.unique(np.asarray(values, dtype=object), return_inverse=True)
+    remap = np.fromiter((dictionary.setdefault(v, len(dictionary)) for v in distinct),
+                        dtype=np.int32, count=len(distinct))
+    return remap[inverse]
+
+def _feedback_summary():
+    """Average rating and count per employee"""
+    return select(
+        Feedback.employee_id.label('employee_id'),
+        func.avg(Feedback.rating).label('avg_rating'),
+        func.count(Feedback.id).label('rating_count')
+    ).group_by(Feedback.employee_id).subquery()
+
+def training_query():
+    """Column-projected SELECT of labelled training rows.
+
+    An employee who is no longer active counts as attrition. The
+    performance label comes from the average feedback rating (1-5 mapped
+    to 0-100) when there is one, because the stored performance_score is
+    overwritten by model predictions. Otherwise the stored score is used.
+    """
+
+    feedback = _feedback_summary()
+    performance_label = case(
+        (feedback.c.rating_count > 0, (feedback.c.avg_rating - 1) * 25),
+        else_=Employee.performance_score
+    )
+
+    columns = {
+        'age': Employee.age,
+        'experience': Employee.experience,
+        'salary': Employee.salary,
+        'satisfaction_level': func.coalesce(Employee.satisfaction_level, FEATURE_DEFAULTS['satisfaction_level']),
+        'last_evaluation_score': func.coalesce(Employee.last_evaluation_score,
+                                               FEATURE_DEFAULTS['last_evaluation_score']),
+        'project_count': func.coalesce(Employee.project_count, FEATURE_DEFAULTS['project_count']),
+        'work_hours': func.coalesce(Employee.work_hours, FEATURE_DEFAULTS['work_hours']),
+        'performance_score': performance_label,
+        'attrition': case((Employee.is_active == False, 'Y'), else_='N'),
+        'department': Employee.department
+    }
+
+    has_label = or_(Employee.performance_score.isnot(None), feedback.c.rating_count > 0)
+    query = select(*[expr.label(name) for name, expr in columns.items()]) \
+        .select_from(Employee) \
+        .outerjoin(feedback, feedback.c.employee_id == Employee.id) \
+        .where(has_label) \
+        .order_by(Employee.id)
+    count_query = select(func.count()) \
+        .select_from(Employee) \
+        .outerjoin(feedback, feedback.c.employee_id == Employee.id) \
+        .where(has_label)
+
+    return list(columns), query, count_query
+
+@contextmanager
+def snapshot_connection(bind=engine):
+    """Connection inside a transaction that sees one consistent snapshot.
+
+    REPEATABLE READ gives PostgreSQL and MySQL (InnoDB) a single read
+    view for the whole transaction, so the row count and the streamed rows
+    agree even while the API keeps writing. SQLite read transactions are
+    already snapshot-isolated.
+    """
+
+    isolation_level = 'SERIALIZABLE' if bind.dialect.name == 'sqlite' else 'REPEATABLE READ'
+    with bind.connect() as conn:
+        conn = conn.execution_options(isolation_level=isolation_level)
+        with conn.begin():
+            yield conn
+
+def stream_training_rows(conn, chunk_size=10000):
+    """Return (count, column_names, partitions) read through a server-side cursor"""
+
+    names, query, count_query = training_query()
+    rows = conn.execute(count_query).scalar()
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+    return rows, names, result.partitions()
+
+def load_training_arrays(chunk_size=10000, bind=engine):
+    """Stream labelled employees from the database into preallocated arrays.
+
+    Rows are fetched chunk by chunk from a server-side cursor and copied
+    column-wise into NumPy arrays, so no ORM objects are built and at most
+    one chunk of DB-API tuples is alive at a time.
+
+    Returns (X, y_attrition, y_performance, department_encoder), in the
+    same layout as train_model.load_training_data.
+    """
+
+    with snapshot_connection(bind) as conn:
+        rows, names, partitions = stream_training_rows(conn, chunk_size)
+        if rows == 0:
+            raise ValueError("No labelled employees in the database")
+
+        X = np.empty((rows, len(NUMERIC_COLUMNS) + 1))
+        y_attrition = np.empty(rows, dtype=np.int64)
+        y_performance = np.empty(rows)
+        dept_codes = np.empty(rows, dtype=np.int32)
+        dictionary = {}
+
+        index = {name: i for i, name in enumerate(names)}
+        offset = 0
+        for partition in partitions:
+            n = len(partition)
+            columns = list(zip(*partition))
+            block = slice(offset, offset + n)
+
+            for i, name in enumerate(NUMERIC_COLUMNS):
+                X[block, i] = np.fromiter(columns[index[name]], dtype=np.float64, count=n)
+            y_performance[block] = np.fromiter(columns[index['performance_score']], dtype=np.float64, count=n)
+            y_attrition[block] = np.fromiter(
+                (value == 'Y' for value in columns[index['attrition']]), dtype=np.int64, count=n
+            )
+
+            dept_codes[block] = dictionary_encode(columns[index['department']], dictionary)
+
+            offset += n
+
+    if offset != rows:
+        raise RuntimeError(f"Snapshot returned {offset} rows, expected {rows}")
+
+    departments = np.asarray(list(dictionary), dtype=object)
+    le_dept = LabelEncoder().fit(departments)
+    X[:, -1] = le_dept.transform(departments)[dept_codes]
+
+    return X, y_attrition, y_performance, le_dept
+
+
+# Typed, column-projected employee reads. Nullable model inputs get the
+# same defaults as training; other nullable floats decode to NaN.
+EMPLOYEE_COLUMNS = {
+    'id': (Employee.id, np.int64),
+    'department': (Employee.department, None),  # dictionary-encoded
+    'age': (Employee.age, np.int32),
+    'experience': (Employee.experience, np.int32),
+    'salary': (Employee.salary, np.float64),
+    'satisfaction_level': (func.coalesce(Employee.satisfaction_level, FEATURE_DEFAULTS['satisfaction_level']),
+                           np.float64),
+    'last_evaluation_score': (func.coalesce(Employee.last_evaluation_score,
+                                            FEATURE_DEFAULTS['last_evaluation_score']), np.float64),
+    'project_count': (func.coalesce(Employee.project_count, FEATURE_DEFAULTS['project_count']), np.int32),
+    'work_hours': (func.coalesce(Employee.work_hours, FEATURE_DEFAULTS['work_hours']), np.int32),
+    'satisfaction_level_raw': (Employee.satisfaction_level, np.float64),  # NaN when not reported
+    'performance_score': (Employee.performance_score, np.float64),
+    'attrition_probability': (Employee.attrition_probability, np.float64),
+    'performance_prediction': (Employee.performance_prediction, np.float64),
+    'is_active': (Employee.is_active, np.bool_)
+}
+
+# What the models read, in FEATURE_NAMES order after id and department
+MODEL_COLUMNS = ('id', 'department', *NUMERIC_COLUMNS)
+
+class EmployeeArrays:
+    """Employee columns as NumPy arrays, one entry per row.
+
+    `department` holds int32 codes into `departments`.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], departments: List[str]):
+        self.columns = columns
+        self.departments = np.asarray(departments, dtype=object)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def take(self, index) -> 'EmployeeArrays':
+        """Rows selected by a boolean mask or positions, sharing the dictionary"""
+        return EmployeeArrays({name: values[index] for name, values in self.columns.items()},
+                              self.departments)
+
+    def department_names(self) -> np.ndarray:
+        return self.departments[self.columns['department']]
+
+    def features(self, label_encoder) -> Tuple[np.ndarray, np.ndarray]:
+        """(feature matrix in FEATURE_NAMES order, mask of rows the encoder knows).
+
+        Only the distinct departments go through the encoder; rows with
+        departments it has never seen get code -1 and a False mask.
+        """
+
+        known = np.isin(self.departments, label_encoder.classes_)
+        codes = np.full(len(self.departments), -1, dtype=np.float64)
+        if known.any():
+            codes[known] = label_encoder.transform(self.departments[known].astype(str))
+        department = codes[self.columns['department']]
+
+        X = np.empty((len(self), len(NUMERIC_COLUMNS) + 1))
+        for i, name in enumerate(NUMERIC_COLUMNS):
+            X[:, i] = self.columns[name]
+        X[:, -1] = department
+        return X, department >= 0
+
+class EmployeeArrayBuilder:
+    """Decodes chunks of DB-API rows column-wise into preallocated arrays"""
+
+    def __init__(self, names: Sequence[str], capacity: int):
+        self.names = list(names)
+        self.size = 0
+        self.dictionary = {}
+        self.columns = {
+            name: np.empty(capacity, dtype=np.int32 if EMPLOYEE_COLUMNS[name][1] is None
+                           else EMPLOYEE_COLUMNS[name][1])
+            for name in self.names
+        }
+
+    def append(self, rows: List[Tuple]):
+        n = len(rows)
+        if n == 0:
+            return
+        block = slice(self.size, self.size + n)
+        for name, values in zip(self.names, zip(*rows)):
+            dtype = EMPLOYEE_COLUMNS[name][1]
+            if dtype is None:
+                self.columns[name][block] = dictionary_encode(values, self.dictionary)
+            elif dtype is np.float64:
+                # np.array maps NULL (None) to NaN, fromiter would fail
+                self.columns[name][block] = np.array(values, dtype=np.float64)
+            else:
+                self.columns[name][block] = np.fromiter(values, dtype=dtype, count=n)
+        self.size += n
+
+    def finish(self) -> EmployeeArrays:
+        return EmployeeArrays({name: values[:self.size] for name, values in self.columns.items()},
+                              list(self.dictionary))
+
+def employee_query(names: Sequence[str], where: Iterable = ()):
+    return select(*[EMPLOYEE_COLUMNS[name][0].label(name) for name in names]) \
+        .select_from(Employee).where(*where)
+
+def read_employee_arrays(conn, names: Sequence[str] = MODEL_COLUMNS, where: Iterable = (),
+                         limit: Optional[int] = None) -> EmployeeArrays:
+    """One column-projected SELECT (ordered by id) decoded into arrays.
+
+    `conn` may be a Connection or a Session. For bounded reads such as a
+    keyset-paginated chunk or a list of ids.
+    """
+
+    query = employee_query(names, where).order_by(Employee.id)
+    if limit is not None:
+        query = query.limit(limit)
+    if isinstance(conn, Session):
+        # Same transaction, without ORM statement processing
+        conn = conn.connection()
+    rows = conn.execute(query).all()
+    builder = EmployeeArrayBuilder(names, len(rows))
+    builder.append(rows)
+    return builder.finish()
+
+def load_employee_arrays(names: Sequence[str] = MODEL_COLUMNS, where: Iterable = (),
+                         chunk_size: int = 10000, bind=engine) -> EmployeeArrays:
+    """Stream matching employees into arrays sized from a COUNT in the same snapshot.
+
+    Rows arrive chunk by chunk from a server-side cursor, so at most one
+    chunk of DB-API tuples is alive at a time and no ORM objects are built.
+    """
+
+    where = list(where)
+    with snapshot_connection(bind) as conn:
+        count = conn.execute(select(func.count()).select_from(Employee).where(*where)).scalar()
+        builder = EmployeeArrayBuilder(names, count)
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size) \
+            .execute(employee_query(names, where).order_by(Employee.id))
+        for partition in result.partitions():
+            builder.append(partition)
+
+    if builder.size != count:
+        raise RuntimeError(f"Snapshot returned {builder.size} rows, expected {count}")
+    return builder.finish()
@@ -0,0 +1,316 @@
+import argparse
+import bisect
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from app.config import settings
+from app.ml.registry import MODEL_DIR
+from app.ml.worker_stats import WorkerStatsFiles, read_json, write_json
+
+# Written next to the scalers by every training run
+REFERENCE_FILE = 'drift_reference.json'
+REFERENCE_BINS = 20
+
+# Every worker's live histograms, and the reset shared by all of them
+STATS_DIR = os.path.join(MODEL_DIR, 'drift_stats')
+RESET_FILE = os.path.join(MODEL_DIR, 'DRIFT_RESET')
+
+# Usual PSI reading: below 0.1 stable, up to 0.25 moderate shift, above that drift
+PSI_MODERATE = 0.1
+PSI_DRIFT = 0.25
+
+# Up to this many rows are binned in plain Python rather than NumPy
+SMALL_BATCH = 8
+
+def bin_edges(values: np.ndarray, bins: int = REFERENCE_BINS) -> np.ndarray:
+    """Interior bin edges for one feature.
+
+    Features with at most `bins` distinct values (counts, department
+    codes) get one bin per value; others get quantile edges, so every
+    reference bin holds about the same share of rows. The outer bins are
+    open, so live values outside the training range still land in one.
+    """
+
+    distinct = np.unique(values)
+    if len(distinct) <= bins:
+        return (distinct[:-1] + distinct[1:]) / 2
+    return np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+
+class FeatureHistograms:
+    """Fixed-edge histograms of every feature column, in constant memory.
+
+    All features share one flat counts array (feature j's bins start at
+    offsets[j]), so a batch of rows is binned with one searchsorted per
+    feature and a single bincount. A few rows (single predictions) take
+    a plain bisect per value instead, which skips NumPy's per-call
+    overhead. With a half-life, counts decay by half
+    every `half_life` rows observed, so the histograms follow recent
+    traffic instead of everything since startup.
+    """
+
+    def __init__(self, edges: Sequence[np.ndarray], half_life: float = 0):
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        sizes = [len(e) + 1 for e in self.edges]
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        self.counts = np.zeros(sum(sizes))
+        self.half_life = half_life
+        self.rows = 0  # observed, before decay
+        self._edge_lists = [(int(offset), e.tolist()) for offset, e in zip(self.offsets, self.edges)]
+
+    def observe(self, X: np.ndarray):
+        X = np.atleast_2d(X)
+        if self.half_life:
+            self.counts *= 0.5 ** (len(X) / self.half_life)
+        self.rows += len(X)
+
+        if len(X) <= SMALL_BATCH:
+            for row in X.tolist():
+                for (offset, edges), value in zip(self._edge_lists, row):
+                    self.counts[offset + bisect.bisect_right(edges, value)] += 1
+            return
+
+        index = np.empty(X.shape, dtype=np.intp)
+        for j, edges in enumerate(self.edges):
+            index[:, j] = np.searchsorted(edges, X[:, j], side='right')
+        index += self.offsets
+        self.counts += np.bincount(index.ravel(), minlength=len(self.counts))
+
+    def feature_counts(self, j: int) -> np.ndarray:
+        return self.counts[self.offsets[j]:self.offsets[j] + len(self.edges[j]) + 1]
+
+def psi(expected: np.ndarray, actual: np.ndarray, floor: float = 1e-4) -> float:
+    """Population stability index between two histograms over the same bins"""
+
+    e = np.maximum(expected / max(expected.sum(), 1e-12), floor)
+    a = np.maximum(actual / max(actual.sum(), 1e-12), floor)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+def ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Largest gap between the two cumulative distributions, at the bin edges"""
+
+    e = np.cumsum(expected) / max(expected.sum(), 1e-12)
+    a = np.cumsum(actual) / max(actual.sum(), 1e-12)
+    return float(np.abs(a - e).max())
+
+def reference_histograms(X: np.ndarray, bins: int = REFERENCE_BINS) -> FeatureHistograms:
+    """Histograms of every column of X on edges taken from X itself"""
+
+    histograms = FeatureHistograms([bin_edges(X[:, j], bins) for j in range(X.shape[1])])
+    histograms.observe(X)
+    return histograms
+
+def save_reference(model_dir: str, histograms: FeatureHistograms, feature_names: Sequence[str]):
+    """Write the training distribution of every feature next to the model artifacts"""
+
+    reference = {
+        'rows': int(histograms.rows),
+        'created_at': datetime.now().isoformat(),
+        'features': {
+            name: {
+                'edges': histograms.edges[j].tolist(),
+                'counts': histograms.feature_counts(j).astype(np.int64).tolist()
+            }
+            for j, name in enumerate(feature_names)
+        }
+    }
+    with open(os.path.join(model_dir, REFERENCE_FILE), 'w') as f:
+        json.dump(reference, f)
+
+def load_reference(model_dir: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(model_dir, REFERENCE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+class DriftMonitor:
+    """Live feature distributions of scored rows compared with the training data.
+
+    MLPredictor.score_features hands every scored feature matrix to
+    observe(); the monitor keeps FeatureHistograms on the reference's
+    edges, so memory does not grow with traffic and a single prediction
+    costs about ten microseconds. The histograms start over when a model
+    version with a different reference is served.
+
+    Each server process counts the rows it scored and publishes its
+    counts to STATS_DIR every sync_seconds; report() adds up those of all
+    workers serving the same version, since histogram counts are
+    additive. reset() writes a new generation to RESET_FILE, which every
+    worker applies at its next sync.
+    """
+
+    def __init__(self, half_life: float, min_rows: int, sync_seconds: float = 5.0,
+                 stats_dir: str = STATS_DIR, reset_path: str = RESET_FILE):
+        self.half_life = half_life
+        self.min_rows = min_rows
+        self.sync_seconds = sync_seconds
+        self.reset_path = reset_path
+        self.model_version = None
+        self.reference = None
+        self.since = None
+        self.generation = None
+        self._features = []
+        self._live = None
+        self._files = WorkerStatsFiles(stats_dir, max_age=3 * sync_seconds)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _reset(self, model_version: Optional[str], reference: Optional[Dict]):
+        self.model_version = model_version
+        self.reference = reference
+        self.since = datetime.now().isoformat()
+        self._features = list(reference['features']) if reference else []
+        self._live = FeatureHistograms(
+            [reference['features'][name]['edges'] for name in self._features], self.half_life
+        ) if reference else None
+
+    def observe(self, model_version: str, reference: Optional[Dict], X: np.ndarray):
+        with self._lock:
+            if model_version != self.model_version:
+                self._reset(model_version, reference)
+            if self._live is not None and len(X):
+                self._live.observe(X)
+
+    def reset(self):
+        """Start the live histograms over in every worker"""
+        generation = uuid.uuid4().hex
+        os.makedirs(os.path.dirname(self.reset_path) or '.', exist_ok=True)
+        write_json(self.reset_path, {'generation': generation, 'reset_at': datetime.now().isoformat()})
+        with self._lock:
+            self.generation = generation
+            self._reset(self.model_version, self.reference)
+        self.publish()
+
+    # Sharing between workers
+
+    def _state(self) -> Dict:
+        with self._lock:
+            return {
+                'model_version': self.model_version,
+                'generation': self.generation,
+                'since': self.since,
+                'rows': self._live.rows if self._live else 0,
+                'counts': self._live.counts.tolist() if self._live else None
+            }
+
+    def publish(self):
+        """Apply a reset made in another worker and publish this worker's counts"""
+
+        shared = read_json(self.reset_path)
+        generation = shared['generation'] if shared else None
+        with self._lock:
+            if generation != self.generation:
+                self.generation = generation
+                self._reset(self.model_version, self.reference)
+        try:
+            self._files.publish(self._state())
+        except OSError as e:
+            print(f"Warning: could not publish drift statistics: {str(e)}")
+
+    def _merged(self, others: List[Dict]):
+        """(workers, rows observed, counts) over every worker on this version and generation"""
+
+        live = self._live
+        rows, counts, workers = live.rows, live.counts.copy(), 1
+        for state in others:
+            if (state['model_version'], state['generation']) != (self.model_version, self.generation):
+                continue
+            if state['counts'] is None or len(state['counts']) != len(counts):
+                continue
+            rows += state['rows']
+            counts += np.asarray(state['counts'])
+            workers += 1
+        return workers, rows, counts
+
+    def report(self) -> Dict:
+        others = self._files.others()
+        with self._lock:
+            live = self._live
+            workers, rows, counts = self._merged(others) if live else (1, 0, None)
+            result = {
+                'model_version': self.model_version,
+                'since': self.since,
+                'workers': workers,
+                'half_life_rows': self.half_life,
+                'reference_rows': self.reference['rows'] if self.reference else None,
+                'rows_observed': rows,
+                'effective_rows': float(counts[:len(live.edges[0]) + 1].sum()) if live else 0.0,
+                'features': {}
+            }
+            if self.reference is None:
+                result['status'] = 'no_reference' if self.model_version else 'no_predictions'
+                return result
+
+            drifted: List[str] = []
+            for j, name in enumerate(self._features):
+                expected = np.asarray(self.reference['features'][name]['counts'], dtype=np.float64)
+                offset = live.offsets[j]
+                actual = counts[offset:offset + len(live.edges[j]) + 1]
+                score = psi(expected, actual)
+                status = 'drift' if score > PSI_DRIFT else 'moderate' if score > PSI_MODERATE else 'stable'
+                if status == 'drift':
+                    drifted.append(name)
+                result['features'][name] = {
+                    'psi': score,
+                    'ks': ks(expected, actual),
+                    'status': status,
+                    'edges': self.reference['features'][name]['edges'],
+                    'reference': (expected / max(expected.sum(), 1e-12)).tolist(),
+                    'live': (actual / max(actual.sum(), 1e-12)).tolist()
+                }
+
+        result['drifted_features'] = drifted
+        result['status'] = ('insufficient_data' if result['effective_rows'] < self.min_rows
+                            else 'drift' if drifted else 'stable')
+        return result
+
+    # Lifecycle
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.publish()
+        self._thread = threading.Thread(target=self._run, name="drift-sync", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.sync_seconds):
+            self.publish()
+
+    def stop(self):
+        self._stop.set()
+        self._files.withdraw()
+
+# Singleton instance
+_monitor = None
+
+def get_drift_monitor() -> DriftMonitor:
+    """Get or create the drift monitor"""
+    global _monitor
+    if _monitor is None:
+        _monitor = DriftMonitor(settings.DRIFT_HALF_LIFE_ROWS, settings.DRIFT_MIN_ROWS,
+                                settings.DRIFT_SYNC_SECONDS)
+    return _monitor
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write the drift reference for an already trained model directory"
+    )
+    parser.add_argument('--data', default='app/ml/employee_data.csv',
+                        help="The data the models in --model-dir were trained on")
+    parser.add_argument('--model-dir', default='app/ml/models')
+    parser.add_argument('--bins', type=int, default=REFERENCE_BINS)
+    args = parser.parse_args()
+
+    from app.ml.predict import FEATURE_NAMES
+    from app.ml.train_model import holdout_split, load_training_data
+    X, y_attrition, _, _ = load_training_data(args.data)
+    train_index, _ = holdout_split(y_attrition)
+    save_reference(args.model_dir, reference_histograms(X[train_index], args.bins), FEATURE_NAMES)
+    print(f"✓ Drift reference for {len(train_index)} training rows written to "
+          f"{os.path.join(args.model_dir, REFERENCE_FILE)}")
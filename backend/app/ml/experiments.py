@@ -0,0 +1,514 @@
+import os
+import queue
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.ml.registry import MODEL_DIR
+from app.ml.worker_stats import WorkerStatsFiles, read_json, write_json
+
+# Runtime configuration shared by every worker, next to the CURRENT pointer
+EXPERIMENTS_FILE = os.path.join(MODEL_DIR, 'EXPERIMENTS')
+# One statistics file per worker process, merged when read
+STATS_DIR = os.path.join(MODEL_DIR, 'experiment_stats')
+
+# |attrition probability delta| histogram: 100 bins of 0.01
+DELTA_BINS = 100
+
+# Latency histogram: bin k ends at 0.01ms * 2**(k / 4), up to about 11 minutes
+LATENCY_EDGES_MS = 0.01 * 2 ** (np.arange(1, 105) / 4)
+
+class LatencyHistogram:
+    """Log-spaced latency counts; histograms from several processes add up"""
+
+    def __init__(self):
+        self.counts = np.zeros(len(LATENCY_EDGES_MS) + 1, dtype=np.int64)
+        self.total_seconds = 0.0
+
+    def record(self, seconds: float):
+        self.counts[np.searchsorted(LATENCY_EDGES_MS, seconds * 1000)] += 1
+        self.total_seconds += seconds
+
+    def state(self) -> Dict:
+        return {'counts': self.counts.tolist(), 'total_seconds': self.total_seconds}
+
+    def add(self, state: Dict):
+        self.counts += np.asarray(state['counts'], dtype=np.int64)
+        self.total_seconds += state['total_seconds']
+
+    def _quantile(self, q: float) -> float:
+        # Upper edge of the bin holding the q-quantile
+        n = self.counts.sum()
+        index = int(np.searchsorted(np.cumsum(self.counts), q * n))
+        return float(LATENCY_EDGES_MS[min(index, len(LATENCY_EDGES_MS) - 1)])
+
+    def summary(self) -> Dict:
+        n = int(self.counts.sum())
+        if not n:
+            return {'p50': 0.0, 'p99': 0.0, 'mean': 0.0}
+        return {'p50': self._quantile(0.5), 'p99': self._quantile(0.99), 'mean': self.total_seconds / n * 1000}
+
+class ShadowComparison:
+    """Running comparison of primary and shadow scores for the same rows, in constant memory"""
+
+    SUMS = ('batches', 'rows', 'disagreements', 'risk_disagreements', 'delta_sum',
+            'abs_delta_sum', 'performance_abs_delta_sum')
+
+    def __init__(self):
+        self.batches = 0
+        self.rows = 0
+        self.disagreements = 0  # Y/N at the 0.5 threshold
+        self.risk_disagreements = 0  # Low/Medium/High
+        self.delta_sum = 0.0  # shadow - primary
+        self.abs_delta_sum = 0.0
+        self.max_abs_delta = 0.0
+        self.performance_abs_delta_sum = 0.0
+        self.delta_histogram = np.zeros(DELTA_BINS, dtype=np.int64)
+        self.shadow_latency = LatencyHistogram()
+
+    def record(self, probabilities: np.ndarray, performances: np.ndarray,
+               shadow_probabilities: np.ndarray, shadow_performances: np.ndarray, seconds: float):
+        delta = shadow_probabilities - probabilities
+        abs_delta = np.abs(delta)
+        risk = np.digitize(probabilities, (0.3, 0.6))
+        shadow_risk = np.digitize(shadow_probabilities, (0.3, 0.6))
+
+        self.batches += 1
+        self.rows += len(delta)
+        self.disagreements += int(np.count_nonzero((probabilities > 0.5) != (shadow_probabilities > 0.5)))
+        self.risk_disagreements += int(np.count_nonzero(risk != shadow_risk))
+        self.delta_sum += float(delta.sum())
+        self.abs_delta_sum += float(abs_delta.sum())
+        self.max_abs_delta = max(self.max_abs_delta, float(abs_delta.max()))
+        self.performance_abs_delta_sum += float(np.abs(shadow_performances - performances).sum())
+        self.delta_histogram += np.bincount(
+            np.minimum((abs_delta * DELTA_BINS).astype(np.intp), DELTA_BINS - 1), minlength=DELTA_BINS
+        )
+        self.shadow_latency.record(seconds)
+
+    def state(self) -> Dict:
+        return {
+            **{name: getattr(self, name) for name in self.SUMS},
+            'max_abs_delta': self.max_abs_delta,
+            'delta_histogram': self.delta_histogram.tolist(),
+            'shadow_latency': self.shadow_latency.state()
+        }
+
+    def add(self, state: Dict):
+        for name in self.SUMS:
+            setattr(self, name, getattr(self, name) + state[name])
+        self.max_abs_delta = max(self.max_abs_delta, state['max_abs_delta'])
+        self.delta_histogram += np.asarray(state['delta_histogram'], dtype=np.int64)
+        self.shadow_latency.add(state['shadow_latency'])
+
+    def _abs_delta_quantile(self, q: float) -> float:
+        # Upper edge of the bin holding the q-quantile
+        if not self.rows:
+            return 0.0
+        return float(np.searchsorted(np.cumsum(self.delta_histogram), q * self.rows) + 1) / DELTA_BINS
+
+    def summary(self) -> Dict:
+        rows = max(self.rows, 1)
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'disagreement_rate': self.disagreements / rows,
+            'risk_level_disagreement_rate': self.risk_disagreements / rows,
+            'attrition_probability_delta': {
+                'mean': self.delta_sum / rows,
+                'mean_abs': self.abs_delta_sum / rows,
+                'p50_abs': self._abs_delta_quantile(0.5),
+                'p95_abs': self._abs_delta_quantile(0.95),
+                'max_abs': self.max_abs_delta
+            },
+            'performance_mean_abs_delta': self.performance_abs_delta_sum / rows,
+            'shadow_score_ms': self.shadow_latency.summary()
+        }
+
+class ArmStats:
+    """What one side of the A/B split served"""
+
+    SUMS = ('requests', 'leave_predictions', 'probability_sum', 'performance_sum')
+
+    def __init__(self):
+        self.requests = 0
+        self.leave_predictions = 0
+        self.probability_sum = 0.0
+        self.performance_sum = 0.0
+        self.latency = LatencyHistogram()
+
+    def record(self, prediction: Dict, seconds: float):
+        self.requests += 1
+        self.leave_predictions += prediction['attrition_prediction'] == 'Y'
+        self.probability_sum += prediction['attrition_probability']
+        self.performance_sum += prediction['performance_prediction']
+        self.latency.record(seconds)
+
+    def state(self) -> Dict:
+        return {**{name: getattr(self, name) for name in self.SUMS}, 'latency': self.latency.state()}
+
+    def add(self, state: Dict):
+        for name in self.SUMS:
+            setattr(self, name, getattr(self, name) + state[name])
+        self.latency.add(state['latency'])
+
+    def summary(self) -> Dict:
+        requests = max(self.requests, 1)
+        return {
+            'requests': self.requests,
+            'leave_rate': self.leave_predictions / requests,
+            'mean_attrition_probability': self.probability_sum / requests,
+            'mean_performance_prediction': self.performance_sum / requests,
+            'latency_ms': self.latency.summary()
+        }
+
+class ModelExperiments:
+    """Shadow scoring and an A/B split between the serving model and a challenger version.
+
+    Shadow: MLPredictor.score_features hands every real scored batch to
+    shadow(), which only puts it on a bounded queue; a worker thread
+    scores it with the shadow version and aggregates the comparison.
+    Nothing on the request path waits for the shadow model, and when the
+    worker falls behind SHADOW_QUEUE_SIZE batches, new ones are dropped
+    (and counted) rather than queued without bound.
+
+    A/B: single-employee predictions are split by a hash of the employee
+    id, so the same employee always gets the same arm, and the
+    challenger serves ab_percent of them. Batch re-scoring stays on the
+    serving model. Both sides are aggregated per arm.
+
+    Challengers are ordinary model versions from the registry, loaded
+    once per process and marked experimental so their own scoring is
+    neither shadowed nor fed to the drift monitor.
+
+    configure() writes the configuration to EXPERIMENTS_FILE with a new
+    generation id; every worker's sync thread applies it within
+    EXPERIMENTS_SYNC_SECONDS, loading challengers off the request path,
+    and writes its own statistics to STATS_DIR. stats() merges the
+    statistics of every worker on the current generation. Without the
+    file, the SHADOW_* and AB_* settings apply in each worker.
+    """
+
+    def __init__(self, queue_size: int, sync_seconds: float, defaults: Optional[Dict] = None,
+                 config_path: str = EXPERIMENTS_FILE, stats_dir: str = STATS_DIR):
+        self.queue_size = queue_size
+        self.sync_seconds = sync_seconds
+        self.defaults = defaults
+        self.config_path = config_path
+        self._files = WorkerStatsFiles(stats_dir, max_age=3 * sync_seconds)
+        self.generation = None
+        self.shadow_version = None
+        self.shadow_profile = None
+        self.ab_version = None
+        self.ab_percent = 0.0
+        self.since = None
+        self.last_error = None
+        self.errors = 0
+        self.dropped = 0
+        self._predictors = {}  # version -> experimental MLPredictor
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._comparison = ShadowComparison()
+        self._arms = {'control': ArmStats(), 'challenger': ArmStats()}
+        self._lock = threading.Lock()
+        self._config_lock = threading.Lock()
+        self._failed_generation = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._sync_thread = None
+
+    # Configuration
+
+    def _load(self, version: str):
+        predictor = self._predictors.get(version)
+        if predictor is None:
+            # Imported here: predict imports this module
+            from app.ml.predict import MLPredictor
+            from app.ml.registry import BASE_VERSION, list_versions
+            if version != BASE_VERSION and version not in list_versions():
+                raise ValueError(f"Unknown model version '{version}'")
+            predictor = MLPredictor(version)
+            predictor.experimental = True
+            self._predictors[version] = predictor
+        return predictor
+
+    def _apply(self, config: Dict, generation: str):
+        """Load the challengers, then switch to `config` with fresh statistics"""
+
+        shadow_version, shadow_profile = config.get('shadow_version'), config.get('shadow_profile')
+        ab_version = config.get('ab_version')
+        shadow = self._load(shadow_version) if shadow_version else None
+        if shadow is not None and shadow_profile is not None:
+            shadow.get_models(shadow_profile)  # ValueError for an unknown profile
+        if ab_version:
+            self._load(ab_version)
+
+        with self._lock:
+            self.generation = generation
+            self.shadow_version = shadow_version or None
+            self.shadow_profile = shadow_profile
+            self.ab_version = ab_version or None
+            self.ab_percent = config.get('ab_percent', 0.0) if ab_version else 0.0
+            self._reset()
+            # Only the configured challengers stay loaded
+            self._predictors = {v: p for v, p in self._predictors.items()
+                                if v in (self.shadow_version, self.ab_version)}
+        if self.shadow_version:
+            self._start_shadow_worker()
+
+    def configure(self, shadow_version: Optional[str] = None, shadow_profile: Optional[str] = None,
+                  ab_version: Optional[str] = None, ab_percent: float = 0.0):
+        """Replace the running experiments in every worker (None turns one off) and start the statistics over.
+
+        Applied here at once and by the other workers at their next sync.
+        Raises ValueError for unknown versions or profiles.
+        """
+
+        config = {
+            'shadow_version': shadow_version,
+            'shadow_profile': shadow_profile,
+            'ab_version': ab_version,
+            'ab_percent': ab_percent
+        }
+        generation = uuid.uuid4().hex
+        with self._config_lock:
+            self._apply(config, generation)
+            write_json(self.config_path, {**config, 'generation': generation,
+                                           'configured_at': datetime.now().isoformat()})
+        self.write_stats()
+
+    def sync(self) -> bool:
+        """Apply the shared configuration if it changed and publish this worker's statistics.
+
+        False while there is no shared configuration.
+        """
+
+        config = read_json(self.config_path)
+        if config is None:
+            return False
+        generation = config['generation']
+        with self._config_lock:
+            if generation not in (self.generation, self._failed_generation):
+                try:
+                    self._apply(config, generation)
+                    print(f"✓ Model experiments updated: shadow {self.shadow_version}, "
+                          f"A/B {self.ab_version} at {self.ab_percent}%")
+                except Exception as e:
+                    # e.g. a version deleted since; retried when the configuration changes
+                    self._failed_generation = generation
+                    self.last_error = str(e)
+                    print(f"Warning: could not apply model experiments: {str(e)}")
+        self.write_stats()
+        return True
+
+    def _reset(self):
+        self.since = datetime.now().isoformat()
+        self.errors = 0
+        self.dropped = 0
+        self.last_error = None
+        self._comparison = ShadowComparison()
+        self._arms = {'control': ArmStats(), 'challenger': ArmStats()}
+
+    def reset(self):
+        """Start the statistics over in every worker, keeping the configuration"""
+        self.configure(self.shadow_version, self.shadow_profile, self.ab_version, self.ab_percent)
+
+    # A/B
+
+    def assign(self, employee_id: int, primary) -> Tuple[object, str]:
+        """(predictor, arm) serving this employee's single predictions"""
+
+        version, percent = self.ab_version, self.ab_percent
+        if version is None or percent <= 0:
+            return primary, 'control'
+        bucket = zlib.crc32(f"{version}:{employee_id}".encode()) % 10000 / 100
+        if bucket >= percent:
+            return primary, 'control'
+        predictor = self._predictors.get(version)
+        return (predictor, 'challenger') if predictor is not None else (primary, 'control')
+
+    def record_arm(self, arm: str, prediction: Dict, seconds: float):
+        if self.ab_version is None:
+            return
+        with self._lock:
+            self._arms[arm].record(prediction, seconds)
+
+    # Shadow
+
+    def shadow(self, primary, features: np.ndarray, probabilities: np.ndarray,
+               performances: np.ndarray, profile: Optional[str]):
+        """Queue a scored batch for the shadow model; never blocks"""
+
+        version = self.shadow_version
+        if version is None or primary.version == version:
+            return
+        try:
+            # The caller's arrays are not modified after scoring, so no copy is needed
+            self._queue.put_nowait((version, features, probabilities, performances, profile))
+        except queue.Full:
+            self.dropped += 1
+
+    def _score_shadow(self, version: str, features: np.ndarray, probabilities: np.ndarray,
+                      performances: np.ndarray, profile: Optional[str]):
+        predictor = self._predictors.get(version)
+        if predictor is None or version != self.shadow_version:
+            return  # reconfigured since this batch was queued
+        start = time.perf_counter()
+        shadow_probabilities, shadow_performances = predictor.score_features(
+            features, self.shadow_profile or profile
+        )
+        seconds = time.perf_counter() - start
+        with self._lock:
+            if version == self.shadow_version:
+                self._comparison.record(probabilities, performances,
+                                        shadow_probabilities, shadow_performances, seconds)
+
+    def _run_shadow(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._score_shadow(*item)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+            finally:
+                self._queue.task_done()
+
+    def drain(self):
+        """Wait until every queued shadow batch has been scored"""
+        self._queue.join()
+
+    def _start_shadow_worker(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run_shadow, name="shadow-scorer", daemon=True)
+        self._thread.start()
+        print("✓ Shadow scorer started")
+
+    # Statistics
+
+    def _state(self) -> Dict:
+        with self._lock:
+            return {
+                'generation': self.generation,
+                'pid': os.getpid(),
+                'since': self.since,
+                'queued': self._queue.qsize(),
+                'dropped_batches': self.dropped,
+                'errors': self.errors,
+                'last_error': self.last_error,
+                'shadow': self._comparison.state(),
+                'arms': {arm: stats.state() for arm, stats in self._arms.items()}
+            }
+
+    def write_stats(self):
+        """Publish this worker's statistics.
+
+        Files of other workers are never removed for their generation:
+        a live worker replaces its own at its next sync, and files of
+        exited or hung workers are dropped by WorkerStatsFiles.
+        """
+
+        if self.generation is None:
+            return
+        try:
+            self._files.publish(self._state())
+        except OSError as e:
+            self.last_error = str(e)
+
+    def _worker_states(self) -> List[Dict]:
+        """This worker's live state and the last published state of the others on this generation"""
+
+        states = [self._state()]
+        if self.generation is not None:
+            states.extend(state for state in self._files.others() if state.get('generation') == self.generation)
+        return states
+
+    def stats(self) -> Dict:
+        states = self._worker_states()
+        comparison = ShadowComparison()
+        arms = {'control': ArmStats(), 'challenger': ArmStats()}
+        for state in states:
+            comparison.add(state['shadow'])
+            for arm, stats in arms.items():
+                stats.add(state['arms'][arm])
+        errors = [state['last_error'] for state in states if state['last_error']]
+        return {
+            'generation': self.generation,
+            'since': min((state['since'] for state in states if state['since']), default=None),
+            'workers': len(states),
+            'sync_seconds': self.sync_seconds,
+            'shadow': {
+                'version': self.shadow_version,
+                'profile': self.shadow_profile,
+                'queued': sum(state['queued'] for state in states),
+                'queue_size': self.queue_size,
+                'dropped_batches': sum(state['dropped_batches'] for state in states),
+                'errors': sum(state['errors'] for state in states),
+                'last_error': errors[0] if errors else None,
+                **comparison.summary()
+            },
+            'ab': {
+                'version': self.ab_version,
+                'percent': self.ab_percent,
+                'arms': {arm: stats.summary() for arm, stats in arms.items()}
+            }
+        }
+
+    # Lifecycle
+
+    def start(self):
+        """Apply the shared configuration (or the settings without one) and start syncing"""
+
+        if self._sync_thread is not None:
+            return
+        if not self.sync() and self.defaults and (self.defaults.get('shadow_version') or
+                                                  self.defaults.get('ab_version')):
+            try:
+                with self._config_lock:
+                    self._apply(self.defaults, 'settings')
+            except ValueError as e:
+                print(f"Warning: model experiments not started: {str(e)}")
+        self._sync_thread = threading.Thread(target=self._run_sync, name="experiments-sync", daemon=True)
+        self._sync_thread.start()
+
+    def _run_sync(self):
+        while not self._stop.wait(self.sync_seconds):
+            try:
+                self.sync()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Warning: model experiments sync failed: {str(e)}")
+
+    def stop(self):
+        self._stop.set()
+        self._files.withdraw()
+        if self._thread is not None:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass  # daemon thread; exits with the process
+
+# Singleton instance
+_experiments = None
+
+def get_model_experiments() -> ModelExperiments:
+    """Get or create the model experiments"""
+    global _experiments
+    if _experiments is None:
+        _experiments = ModelExperiments(
+            settings.SHADOW_QUEUE_SIZE,
+            settings.EXPERIMENTS_SYNC_SECONDS,
+            {
+                'shadow_version': settings.SHADOW_VERSION,
+                'shadow_profile': settings.SHADOW_PROFILE,
+                'ab_version': settings.AB_VERSION,
+                'ab_percent': settings.AB_PERCENT
+            }
+        )
+    return _experiments
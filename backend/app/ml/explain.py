@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from app.config import settings
+from app.ml.predict import FEATURE_NAMES, MLPredictor
+
+# Contributions are reported per input field, not per model column
+CONTRIBUTION_NAMES = [name.replace('_encoded', '') for name in FEATURE_NAMES]
+
+class ExplanationCache:
+    """LRU cache of explanations keyed by model version, profile and feature row.
+
+    The same inputs always get the same explanation from a given model,
+    so entries never need invalidating; a new version simply misses.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+explanation_cache = ExplanationCache(settings.EXPLANATION_CACHE_SIZE)
+
+def _explanation(bias: float, contributions: np.ndarray) -> Dict:
+    return {
+        'base_value': float(bias),
+        'contributions': dict(zip(CONTRIBUTION_NAMES, map(float, contributions)))
+    }
+
+def explain_features(predictor: MLPredictor, features: np.ndarray,
+                     profile: Optional[str] = None) -> List[Dict]:
+    """Attrition-probability and performance contributions for each feature row.
+
+    Contributions are in the units of each prediction (probability and
+    score points) before performance is clipped to 0-100. Cached rows
+    are reused; the rest are computed in one vectorized pass per model.
+    """
+
+    profile = profile or predictor.default_profile
+    keys = [(predictor.version, profile, row.tobytes()) for row in features]
+    explanations = [explanation_cache.get(key) for key in keys]
+    missing = [i for i, explanation in enumerate(explanations) if explanation is None]
+
+    if missing:
+        attrition_explainer, performance_explainer = predictor.get_explainers(profile)
+        rows = features[missing]
+        attrition_bias, attrition = attrition_explainer.contributions(
+            predictor.attrition_scaler.transform(rows), output=1
+        )
+        performance_bias, performance = performance_explainer.contributions(
+            predictor.performance_scaler.transform(rows), output=0
+        )
+        for j, i in enumerate(missing):
+            explanations[i] = {
+                'attrition': _explanation(attrition_bias, attrition[j]),
+                'performance': _explanation(performance_bias, performance[j])
+            }
+            explanation_cache.put(keys[i], explanations[i])
+
+    return explanations
+
+def explain_many(predictor: MLPredictor, employees: List[Dict],
+                 profile: Optional[str] = None) -> List[Dict]:
+    return explain_features(predictor, predictor.prepare_features_many(employees), profile)
@@ -0,0 +1,35 @@
+import argparse
+import os
+import pandas as pd
+from app.ml.columnar import ColumnarWriter, EMPLOYEE_SCHEMA
+from app.ml.db_source import snapshot_connection, stream_training_rows
+
+def export_employees(path, fmt='columnar', chunk_size=10000):
+    """Export labelled employee rows for training as CSV or a columnar dataset"""
+
+    with snapshot_connection() as conn:
+        rows, names, partitions = stream_training_rows(conn, chunk_size)
+
+        if fmt == 'columnar':
+            sink = ColumnarWriter(path, rows, {name: EMPLOYEE_SCHEMA[name] for name in names})
+            write_chunk = lambda i, chunk: sink.write(chunk)
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            sink = open(path, 'w', newline='')
+            write_chunk = lambda i, chunk: chunk.to_csv(sink, index=False, header=(i == 0))
+
+        with sink:
+            for i, partition in enumerate(partitions):
+                write_chunk(i, pd.DataFrame.from_records(partition, columns=names))
+
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export employees from the database for training")
+    parser.add_argument('--output', default='app/ml/employee_export.cols')
+    parser.add_argument('--format', choices=['csv', 'columnar'], default='columnar')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    rows = export_employees(args.output, args.format, args.chunk_size)
+    print(f"✓ Exported {rows} employees to {args.output}")
@@ -1,170 +1,259 @@
+import argparse
+import os
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from app.ml.columnar import ColumnarWriter, EMPLOYEE_SCHEMA
 
-def generate_employee_data(n_samples=500):
-    """Generate synthetic employee data for training with more extreme cases"""
-    
-    np.random.seed(42)
-    random.seed(42)
-    
-    departments = ['IT', 'Sales', 'Marketing', 'HR', 'Finance', 'Operations', 'Support']
-    names_first = ['John', 'Jane', 'Michael', 'Sarah', 'David', 'Emily', 'Robert', 
-                   'Lisa', 'William', 'Mary', 'James', 'Patricia', 'Richard', 'Jennifer']
-    names_last = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller',
-                  'Davis', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez']
-    
-    data = []
-    
-    # Create specific distributions for different risk levels
+DEPARTMENTS = ['IT', 'Sales', 'Marketing', 'HR', 'Finance', 'Operations', 'Support']
+NAMES_FIRST = ['John', 'Jane', 'Michael', 'Sarah', 'David', 'Emily', 'Robert',
+               'Lisa', 'William', 'Mary', 'James', 'Patricia', 'Richard', 'Jennifer']
+NAMES_LAST = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller',
+              'Davis', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez']
+
+# Department multiplier, aligned with DEPARTMENTS
+DEPT_MULTIPLIER = np.array([1.3, 1.2, 1.1, 1.0, 1.25, 1.05, 0.95])
+
+# Every name is one of len(NAMES_FIRST) * len(NAMES_LAST) combinations, so
+# build them once and index by code instead of formatting strings per row
+FULL_NAMES = [f"{first} {last}" for first in NAMES_FIRST for last in NAMES_LAST]
+EMAILS = [f"{name.lower().replace(' ', '.')}@company.com" for name in FULL_NAMES]
+
+DEFAULT_SEED = 42
+DEFAULT_CHUNK_SIZE = 100_000
+
+def _risk_counts(n_samples):
+    """Rows [0, high) are high risk, [high, high + medium) medium, the rest low"""
     high_risk_count = int(n_samples * 0.25)  # 25% high risk
     medium_risk_count = int(n_samples * 0.35)  # 35% medium risk
-    low_risk_count = n_samples - high_risk_count - medium_risk_count  # 40% low risk
-    
-    for i in range(n_samples):
-        name = f"{random.choice(names_first)} {random.choice(names_last)}"
-        email = f"{name.lower().replace(' ', '.')}@company.com"
-        department = random.choice(departments)
-        age = np.random.randint(22, 65)
-        experience = min(np.random.randint(0, age - 21), 40)
-        
-        # Determine risk category for this employee
-        if i < high_risk_count:
-            risk_category = 'high'
-        elif i < high_risk_count + medium_risk_count:
-            risk_category = 'medium'
-        else:
-            risk_category = 'low'
-        
-        # Generate data based on risk category
-        if risk_category == 'high':
-            # HIGH RISK: Very low satisfaction, overworked, poor evaluation
-            satisfaction_level = np.random.uniform(0.15, 0.40)  # Very low
-            last_evaluation = np.random.uniform(0.30, 0.65)  # Poor to mediocre
-            project_count = np.random.choice([1, 8, 9, 10])  # Too few or too many
-            work_hours = np.random.uniform(60, 75)  # Overworked
-            base_salary = 40000 + (experience * 1500)  # Underpaid
-            
-        elif risk_category == 'medium':
-            # MEDIUM RISK: Moderate satisfaction, some issues
-            satisfaction_level = np.random.uniform(0.40, 0.65)  # Moderate
-            last_evaluation = np.random.uniform(0.55, 0.75)  # Average
-            project_count = np.random.choice([2, 5, 6])  # Acceptable
-            work_hours = np.random.uniform(48, 58)  # Somewhat overworked
-            base_salary = 40000 + (experience * 2000)  # Slightly underpaid
-            
-        else:  # low risk
-            # LOW RISK: High satisfaction, balanced workload
-            satisfaction_level = np.random.uniform(0.70, 0.95)  # High
-            last_evaluation = np.random.uniform(0.75, 0.95)  # Good to excellent
-            project_count = np.random.choice([3, 4])  # Balanced
-            work_hours = np.random.uniform(38, 48)  # Normal
-            base_salary = 40000 + (experience * 2800)  # Well paid
-        
-        # Department multiplier
-        dept_multiplier = {
-            'IT': 1.3, 'Sales': 1.2, 'Finance': 1.25,
-            'Marketing': 1.1, 'HR': 1.0, 'Operations': 1.05, 'Support': 0.95
-        }
-        salary = base_salary * dept_multiplier[department] * np.random.uniform(0.95, 1.05)
-        
-        # Calculate performance score
-        performance_score = (
-            last_evaluation * 40 +
-            min(project_count / 5, 1) * 30 +
-            satisfaction_level * 20 +
-            (1 - abs(work_hours - 45) / 45) * 10
-        )
-        
-        # Calculate attrition score based on multiple factors
-        attrition_score = 0
-        
-        # Satisfaction is the biggest factor
-        if satisfaction_level < 0.3:
-            attrition_score += 50
-        elif satisfaction_level < 0.5:
-            attrition_score += 30
-        elif satisfaction_level < 0.7:
-            attrition_score += 10
-        
-        # Work hours
-        if work_hours > 60:
-            attrition_score += 30
-        elif work_hours > 52:
-            attrition_score += 15
-        elif work_hours < 38:
-            attrition_score += 5
-        
-        # Projects
-        if project_count > 7:
-            attrition_score += 20
-        elif project_count < 2:
-            attrition_score += 15
-        
-        # Evaluation
-        if last_evaluation < 0.5:
-            attrition_score += 15
-        
-        # Salary vs experience
-        expected_salary = 40000 + (experience * 2500) * dept_multiplier[department]
-        if salary < expected_salary * 0.80:
-            attrition_score += 20
-        elif salary < expected_salary * 0.90:
-            attrition_score += 10
-        
-        # Add randomness
-        attrition_score += np.random.randint(-8, 8)
-        
-        # Ensure high risk employees have high scores
-        if risk_category == 'high':
-            attrition_score = max(attrition_score, 65)
-        elif risk_category == 'medium':
-            attrition_score = min(max(attrition_score, 35), 65)
-        else:
-            attrition_score = min(attrition_score, 35)
-        
-        # Convert to probability
-        attrition_probability = min(max(attrition_score / 100, 0), 0.99)
-        
+    return high_risk_count, medium_risk_count
+
+def _shard_rng(seed, shard_index):
+    """Independent, deterministic generator for one shard"""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(shard_index,)))
+
+def generate_shard(start, stop, n_samples, seed=DEFAULT_SEED, shard_index=0):
+    """Generate rows [start, stop) of an n_samples dataset, fully vectorized.
+
+    The risk category depends on the global row index, so shards can be
+    generated independently and concatenated in order.
+    """
+
+    rng = _shard_rng(seed, shard_index)
+    n = stop - start
+
+    name_codes = rng.integers(0, len(FULL_NAMES), n)
+    dept_codes = rng.integers(0, len(DEPARTMENTS), n)
+    age = rng.integers(22, 65, n)
+    # Uniform over [0, age - 22], same as randint(0, age - 21)
+    experience = np.minimum((rng.random(n) * (age - 21)).astype(np.int64), 40)
+
+    # Determine risk category for each row
+    high_risk_count, medium_risk_count = _risk_counts(n_samples)
+    index = np.arange(start, stop)
+    high = index < high_risk_count
+    medium = ~high & (index < high_risk_count + medium_risk_count)
+    low = ~high & ~medium
+
+    satisfaction_level = np.empty(n)
+    last_evaluation = np.empty(n)
+    project_count = np.empty(n, dtype=np.int64)
+    work_hours = np.empty(n)
+    salary_per_year = np.empty(n)
+
+    # HIGH RISK: Very low satisfaction, overworked, poor evaluation, underpaid
+    # MEDIUM RISK: Moderate satisfaction, some issues, slightly underpaid
+    # LOW RISK: High satisfaction, balanced workload, well paid
+    for mask, satisfaction, evaluation, projects, hours, raise_per_year in (
+        (high, (0.15, 0.40), (0.30, 0.65), [1, 8, 9, 10], (60, 75), 1500),
+        (medium, (0.40, 0.65), (0.55, 0.75), [2, 5, 6], (48, 58), 2000),
+        (low, (0.70, 0.95), (0.75, 0.95), [3, 4], (38, 48), 2800),
+    ):
+        count = int(mask.sum())
+        if count == 0:
+            continue
+        satisfaction_level[mask] = rng.uniform(*satisfaction, count)
+        last_evaluation[mask] = rng.uniform(*evaluation, count)
+        project_count[mask] = rng.choice(projects, count)
+        work_hours[mask] = rng.uniform(*hours, count)
+        salary_per_year[mask] = raise_per_year
+
+    base_salary = 40000 + experience * salary_per_year
+    dept_multiplier = DEPT_MULTIPLIER[dept_codes]
+    salary = base_salary * dept_multiplier * rng.uniform(0.95, 1.05, n)
+
+    # Calculate performance score
+    performance_score = (
+        last_evaluation * 40 +
+        np.minimum(project_count / 5, 1) * 30 +
+        satisfaction_level * 20 +
+        (1 - np.abs(work_hours - 45) / 45) * 10
+    )
+
+    # Calculate attrition score based on multiple factors
+    # Satisfaction is the biggest factor
+    attrition_score = np.select(
+        [satisfaction_level < 0.3, satisfaction_level < 0.5, satisfaction_level < 0.7],
+        [50, 30, 10], 0
+    )
+    # Work hours
+    attrition_score += np.select(
+        [work_hours > 60, work_hours > 52, work_hours < 38], [30, 15, 5], 0
+    )
+    # Projects
+    attrition_score += np.select([project_count > 7, project_count < 2], [20, 15], 0)
+    # Evaluation
+    attrition_score += np.where(last_evaluation < 0.5, 15, 0)
+    # Salary vs experience
+    expected_salary = 40000 + (experience * 2500) * dept_multiplier
+    attrition_score += np.select(
+        [salary < expected_salary * 0.80, salary < expected_salary * 0.90], [20, 10], 0
+    )
+    # Add randomness
+    attrition_score += rng.integers(-8, 8, n)
+
+    # Ensure high risk employees have high scores
+    attrition_score = np.where(high, np.maximum(attrition_score, 65), attrition_score)
+    attrition_score = np.where(medium, np.clip(attrition_score, 35, 65), attrition_score)
+    attrition_score = np.where(low, np.minimum(attrition_score, 35), attrition_score)
+
+    # Convert to probability
+    attrition_probability = np.clip(attrition_score / 100, 0, 0.99)
+
+    return pd.DataFrame({
+        'name': pd.Categorical.from_codes(name_codes, FULL_NAMES),
+        'email': pd.Categorical.from_codes(name_codes, EMAILS),
+        'department': pd.Categorical.from_codes(dept_codes, DEPARTMENTS),
+        'age': age,
+        'experience': experience,
+        'salary': np.round(salary, 2),
+        'satisfaction_level': np.round(satisfaction_level, 3),
+        'last_evaluation_score': np.round(last_evaluation, 3),
+        'project_count': project_count,
+        'work_hours': work_hours.astype(np.int64),
+        'performance_score': np.round(performance_score, 2),
         # Binary attrition
-        attrition = 'Y' if attrition_probability > 0.5 else 'N'
-        
-        data.append({
-            'name': name,
-            'email': email,
-            'department': department,
-            'age': int(age),
-            'experience': int(experience),
-            'salary': round(salary, 2),
-            'satisfaction_level': round(satisfaction_level, 3),
-            'last_evaluation_score': round(last_evaluation, 3),
-            'project_count': int(project_count),
-            'work_hours': int(work_hours),
-            'performance_score': round(performance_score, 2),
-            'attrition': attrition,
-            'attrition_probability': round(attrition_probability, 3)
-        })
-    
-    df = pd.DataFrame(data)
-    return df
+        'attrition': np.where(attrition_probability > 0.5, 'Y', 'N'),
+        'attrition_probability': np.round(attrition_probability, 3)
+    })
+
+def _shard_bounds(n_samples, chunk_size):
+    return [
+        (shard_index, start, min(start + chunk_size, n_samples))
+        for shard_index, start in enumerate(range(0, n_samples, chunk_size))
+    ]
+
+def _generate_shard_task(args):
+    shard_index, start, stop, n_samples, seed = args
+    return generate_shard(start, stop, n_samples, seed=seed, shard_index=shard_index)
+
+def iter_employee_chunks(n_samples, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED, workers=1):
+    """Yield the dataset as in-order DataFrame chunks.
+
+    Shard seeds depend only on (seed, shard index), so the output is the
+    same for any number of workers. At most 2 * workers shards are in
+    flight, which bounds memory regardless of n_samples.
+    """
+
+    tasks = [
+        (shard_index, start, stop, n_samples, seed)
+        for shard_index, start, stop in _shard_bounds(n_samples, chunk_size)
+    ]
+
+    if workers <= 1:
+        for task in tasks:
+            yield _generate_shard_task(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        tasks = iter(tasks)
+        for task in tasks:
+            pending.append(executor.submit(_generate_shard_task, task))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            chunk = pending.popleft().result()
+            for task in tasks:
+                pending.append(executor.submit(_generate_shard_task, task))
+                break
+            yield chunk
+
+def generate_employee_data(n_samples=500, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """Generate synthetic employee data for training with more extreme cases"""
+
+    chunks = list(iter_employee_chunks(n_samples, chunk_size, seed, workers))
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+def write_employee_data(path, n_samples, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED,
+                        workers=1, fmt='csv'):
+    """Stream generated chunks to a CSV file or columnar dataset and return summary counts"""
+
+    summary = {
+        'rows': 0,
+        'attrition': pd.Series(dtype='int64'),
+        'department': pd.Series(dtype='int64'),
+        'high_risk': 0,
+        'medium_risk': 0,
+        'low_risk': 0
+    }
+
+    if fmt == 'columnar':
+        sink = ColumnarWriter(path, n_samples, EMPLOYEE_SCHEMA)
+        write_chunk = lambda i, chunk: sink.write(chunk)
+    else:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        sink = open(path, 'w', newline='')
+        write_chunk = lambda i, chunk: chunk.to_csv(sink, index=False, header=(i == 0))
+
+    with sink:
+        for i, chunk in enumerate(iter_employee_chunks(n_samples, chunk_size, seed, workers)):
+            write_chunk(i, chunk)
+
+            probability = chunk['attrition_probability']
+            summary['rows'] += len(chunk)
+            summary['attrition'] = summary['attrition'].add(
+                chunk['attrition'].value_counts(), fill_value=0)
+            summary['department'] = summary['department'].add(
+                chunk['department'].value_counts(), fill_value=0)
+            summary['high_risk'] += int((probability > 0.6).sum())
+            summary['medium_risk'] += int(((probability > 0.3) & (probability <= 0.6)).sum())
+            summary['low_risk'] += int((probability <= 0.3).sum())
+
+    return summary
 
 if __name__ == "__main__":
-    # Generate data
-    df = generate_employee_data(500)
-    
-    # Save to CSV
-    df.to_csv('app/ml/employee_data.csv', index=False)
-    print(f"Generated {len(df)} employee records")
+    parser = argparse.ArgumentParser(description="Generate synthetic employee training data")
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--output', default=None,
+                        help="Defaults to app/ml/employee_data.csv (or .cols for columnar)")
+    parser.add_argument('--format', choices=['csv', 'columnar'], default='csv')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Generator processes (0 = all cores)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count()
+    output = args.output or (
+        'app/ml/employee_data.cols' if args.format == 'columnar' else 'app/ml/employee_data.csv'
+    )
+
+    # Generate data and save it
+    summary = write_employee_data(output, args.rows, args.chunk_size, args.seed, workers, args.format)
+    print(f"Generated {summary['rows']} employee records")
     print(f"\nAttrition distribution:")
-    print(df['attrition'].value_counts())
-    
+    print(summary['attrition'].astype(int).sort_values(ascending=False))
+
     # Show risk distribution
     print(f"\nRisk distribution:")
-    print(f"High risk (>60%): {len(df[df['attrition_probability'] > 0.6])}")
-    print(f"Medium risk (30-60%): {len(df[(df['attrition_probability'] > 0.3) & (df['attrition_probability'] <= 0.6)])}")
-    print(f"Low risk (<30%): {len(df[df['attrition_probability'] <= 0.3])}")
-    
+    print(f"High risk (>60%): {summary['high_risk']}")
+    print(f"Medium risk (30-60%): {summary['medium_risk']}")
+    print(f"Low risk (<30%): {summary['low_risk']}")
+
     print(f"\nDepartment distribution:")
-    print(df['department'].value_counts())
-    print(f"\nData saved to app/ml/employee_data.csv")
\ No newline at end of file
+    print(summary['department'].astype(int).sort_values(ascending=False))
+    print(f"\nData saved to {output}")
@@ -0,0 +1,252 @@
+import argparse
+import math
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import engine
+from app.models.prediction_history import (
+    PredictionHistory,
+    EmployeePredictionDaily,
+    DepartmentPredictionDaily
+)
+
+EPOCH = date(1970, 1, 1)
+
+def day_number(moment: datetime) -> int:
+    """Days since 1970-01-01 (UTC) for a timezone-aware or UTC-naive datetime"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return (moment.date() - EPOCH).days
+
+def day_date(day: int) -> date:
+    return EPOCH + timedelta(days=day)
+
+def history_rows(predictions: List[Dict], model_version: Optional[str],
+                 predicted_at: Optional[datetime] = None) -> List[Dict]:
+    """History rows for predictions made together.
+
+    Each prediction needs employee_id and department besides the model
+    outputs.
+    """
+
+    predicted_at = predicted_at or datetime.now(timezone.utc)
+    day = day_number(predicted_at)
+    return [
+        {
+            'employee_id': p['employee_id'],
+            'department': p['department'],
+            'day': day,
+            'predicted_at': predicted_at,
+            'attrition_probability': p['attrition_probability'],
+            'performance_prediction': p['performance_prediction'],
+            'model_version': model_version
+        }
+        for p in predictions
+    ]
+
+class HistoryWriter:
+    """Buffers single predictions and appends them in bulk.
+
+    Rows are inserted with one executemany when HISTORY_BATCH_SIZE are
+    waiting or every HISTORY_FLUSH_SECONDS, by a background thread
+    started on first use. Batch scoring does not go through the buffer:
+    it appends each chunk in the same transaction as its updates.
+    """
+
+    def __init__(self, batch_size: int, flush_seconds: float, bind=engine):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.bind = bind
+        self.written = 0
+        self.failed = 0
+        self._rows = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, rows: List[Dict]):
+        with self._lock:
+            self._rows.extend(rows)
+            full = len(self._rows) >= self.batch_size
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            with self.bind.begin() as conn:
+                conn.execute(insert(PredictionHistory), rows)
+        except Exception as e:
+            # History is best effort; predictions are already saved
+            self.failed += len(rows)
+            print(f"Warning: could not write {len(rows)} prediction history rows: {str(e)}")
+            return 0
+        self.written += len(rows)
+        return len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            'pending': len(self._rows),
+            'written': self.written,
+            'failed': self.failed,
+            'batch_size': self.batch_size,
+            'flush_seconds': self.flush_seconds
+        }
+
+# Singleton instance
+_writer = None
+
+def get_history_writer() -> HistoryWriter:
+    """Get or create the prediction history writer"""
+    global _writer
+    if _writer is None:
+        _writer = HistoryWriter(settings.HISTORY_BATCH_SIZE, settings.HISTORY_FLUSH_SECONDS)
+    return _writer
+
+def compact_history(retention_days: int, bind=engine, today: Optional[int] = None) -> Dict:
+    """Fold raw history older than `retention_days` into the daily tables.
+
+    Per-employee and per-department daily sums are inserted and the raw
+    rows deleted in one transaction, so trends read the same before and
+    after. Compaction only ever moves forward in time: raw rows are
+    always appended for the current day, so a day is compacted once.
+    That holds only while the current day stays raw (retention_days >= 1);
+    otherwise rows another worker flushes later for the same day would
+    collide with the daily rows already written.
+    """
+
+    if retention_days < 1:
+        raise ValueError("retention_days must be at least 1 so the current day is never compacted")
+    start = time.perf_counter()
+    cutoff = (today if today is not None else day_number(datetime.now(timezone.utc))) - retention_days
+    old = PredictionHistory.day < cutoff
+    sums = (
+        func.count().label('predictions'),
+        func.sum(PredictionHistory.attrition_probability).label('attrition_probability_sum'),
+        func.sum(PredictionHistory.performance_prediction).label('performance_prediction_sum')
+    )
+
+    with bind.begin() as conn:
+        employees = conn.execute(
+            insert(EmployeePredictionDaily).from_select(
+                ['employee_id', 'day', 'department', 'predictions',
+                 'attrition_probability_sum', 'performance_prediction_sum'],
+                select(PredictionHistory.employee_id, PredictionHistory.day,
+                       func.max(PredictionHistory.department), *sums)
+                .where(old)
+                .group_by(PredictionHistory.employee_id, PredictionHistory.day)
+            )
+        ).rowcount
+        departments = conn.execute(
+            insert(DepartmentPredictionDaily).from_select(
+                ['department', 'day', 'predictions',
+                 'attrition_probability_sum', 'performance_prediction_sum'],
+                select(PredictionHistory.department, PredictionHistory.day, *sums)
+                .where(old)
+                .group_by(PredictionHistory.department, PredictionHistory.day)
+            )
+        ).rowcount
+        deleted = conn.execute(delete(PredictionHistory).where(old)).rowcount
+
+    return {
+        'cutoff': day_date(cutoff).isoformat(),
+        'raw_rows_compacted': deleted,
+        'employee_days': employees,
+        'department_days': departments,
+        'seconds': time.perf_counter() - start
+    }
+
+def prediction_trend(db: Session, days: int, points: int, employee_id: Optional[int] = None,
+                     department: Optional[str] = None, today: Optional[int] = None) -> Dict:
+    """Average predictions over the last `days` days in at most `points` buckets.
+
+    Filter by employee_id or department. Buckets are aggregated in the
+    database: recent days from the raw rows (through the
+    (employee_id | department, predicted_at) indexes), older days from
+    the compacted daily table, so the cost depends on the window and not
+    on how much history exists.
+    """
+
+    end_day = today if today is not None else day_number(datetime.now(timezone.utc))
+    start_day = end_day - days + 1
+    bucket_days = max(1, math.ceil(days / points))
+    start_at = datetime.combine(day_date(start_day), datetime.min.time(), timezone.utc)
+
+    if employee_id is not None:
+        raw_filter = PredictionHistory.employee_id == employee_id
+        daily = EmployeePredictionDaily
+        daily_filter = EmployeePredictionDaily.employee_id == employee_id
+    else:
+        raw_filter = PredictionHistory.department == department
+        daily = DepartmentPredictionDaily
+        daily_filter = DepartmentPredictionDaily.department == department
+
+    raw_bucket = ((PredictionHistory.day - start_day) // bucket_days).label('bucket')
+    daily_bucket = ((daily.day - start_day) // bucket_days).label('bucket')
+    queries = (
+        select(raw_bucket, func.count(), func.sum(PredictionHistory.attrition_probability),
+               func.sum(PredictionHistory.performance_prediction))
+        .where(raw_filter, PredictionHistory.predicted_at >= start_at)
+        .group_by(raw_bucket),
+        select(daily_bucket, func.sum(daily.predictions), func.sum(daily.attrition_probability_sum),
+               func.sum(daily.performance_prediction_sum))
+        .where(daily_filter, daily.day >= start_day, daily.day <= end_day)
+        .group_by(daily_bucket)
+    )
+
+    buckets = {}
+    for query in queries:
+        for bucket, count, attrition_sum, performance_sum in db.execute(query):
+            totals = buckets.setdefault(bucket, [0, 0.0, 0.0])
+            totals[0] += count
+            totals[1] += attrition_sum
+            totals[2] += performance_sum
+
+    return {
+        'start': day_date(start_day).isoformat(),
+        'end': day_date(end_day).isoformat(),
+        'bucket_days': bucket_days,
+        'points': [
+            {
+                'start': day_date(start_day + bucket * bucket_days).isoformat(),
+                'predictions': count,
+                'attrition_probability': attrition_sum / count,
+                'performance_prediction': performance_sum / count
+            }
+            for bucket, (count, attrition_sum, performance_sum) in sorted(buckets.items())
+        ]
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact prediction history older than the retention window")
+    parser.add_argument('--retention-days', type=int, default=settings.HISTORY_RAW_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    report = compact_history(args.retention_days)
+    print(f"✓ Compacted {report['raw_rows_compacted']} history rows before {report['cutoff']} into "
+          f"{report['employee_days']} employee-days and {report['department_days']} department-days "
+          f"in {report['seconds']:.1f}s")
@@ -1,68 +1,155 @@
 import joblib
 import numpy as np
 import pandas as pd
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 import os
+import threading
+import time
+from app.config import settings
+from app.ml.compact import CompactForest, compact_estimator
+from app.ml.drift import get_drift_monitor, load_reference
+from app.ml.experiments import get_model_experiments
+from app.ml.registry import FULL_PROFILE, PROFILES, current_version, profile_dir, version_dir
+
+# Column order of the feature matrix; must match train_model.FEATURE_COLUMNS
+FEATURE_NAMES = [
+    'age', 'experience', 'salary', 'satisfaction_level',
+    'last_evaluation_score', 'project_count', 'work_hours', 'department_encoded'
+]
+
+# Used for missing (or NULL) optional inputs, in training and in every scoring path
+FEATURE_DEFAULTS = {
+    'satisfaction_level': 0.7,
+    'last_evaluation_score': 0.7,
+    'project_count': 0,
+    'work_hours': 40
+}
 
 class MLPredictor:
-    def __init__(self):
-        model_dir = 'app/ml/models'
-        
-        # Load models
-        self.attrition_model = joblib.load(f'{model_dir}/attrition_model.pkl')
-        self.attrition_scaler = joblib.load(f'{model_dir}/attrition_scaler.pkl')
-        self.performance_model = joblib.load(f'{model_dir}/performance_model.pkl')
-        self.performance_scaler = joblib.load(f'{model_dir}/performance_scaler.pkl')
-        self.label_encoder = joblib.load(f'{model_dir}/label_encoder.pkl')
-        
+    def __init__(self, version: Optional[str] = None, model_dir: Optional[str] = None,
+                 mmap: bool = False):
+        self.version = version or current_version()
+        model_dir = model_dir or version_dir(self.version)
+        
+        # With mmap, NumPy arrays inside the pickles are memory-mapped
+        # read-only, so processes loading the same version share them
+        # through the page cache
+        load = lambda path: joblib.load(path, mmap_mode='r' if mmap else None)
+        
+        # Load preprocessing shared by all profiles
+        self.attrition_scaler = load(f'{model_dir}/attrition_scaler.pkl')
+        self.performance_scaler = load(f'{model_dir}/performance_scaler.pkl')
+        self.label_encoder = load(f'{model_dir}/label_encoder.pkl')
+        
+        # Training feature distribution for the drift monitor (None for older artifacts)
+        self.drift_reference = load_reference(model_dir)
+        
+        # Load models for every profile that was trained
+        self.profiles = {}
+        for profile in PROFILES:
+            path = profile_dir(model_dir, profile)
+            if os.path.exists(f'{path}/attrition_model.pkl'):
+                self.profiles[profile] = (
+                    load(f'{path}/attrition_model.pkl'),
+                    load(f'{path}/performance_model.pkl')
+                )
+        
+        self.default_profile = settings.MODEL_PROFILE
+        if self.default_profile not in self.profiles:
+            print(f"Warning: model profile '{self.default_profile}' not available, using '{FULL_PROFILE}'")
+            self.default_profile = FULL_PROFILE
+        
+        self.attrition_model, self.performance_model = self.profiles[self.default_profile]
+        self._explainers = {}
+        
+        # Set on shadow and A/B challengers, whose scoring is not observed
+        self.experimental = False
+    
+    def get_models(self, profile: Optional[str] = None) -> Tuple:
+        """(attrition model, performance model) for a profile; None means the default"""
+        
+        profile = profile or self.default_profile
+        if profile not in self.profiles:
+            raise ValueError(
+                f"Unknown model profile '{profile}'. Available: {', '.join(self.profiles)}"
+            )
+        return self.profiles[profile]
+        
+    def get_explainers(self, profile: Optional[str] = None) -> Tuple:
+        """CompactForests for a profile's models, used for contributions.
+
+        Compacted models are used as they are; scikit-learn forests are
+        converted once on first use. Raises ValueError for profiles
+        that are not tree ensembles.
+        """
+        
+        profile = profile or self.default_profile
+        if profile not in self._explainers:
+            explainers = []
+            for model in self.get_models(profile):
+                explainer = model if isinstance(model, CompactForest) else compact_estimator(model)
+                if explainer is None:
+                    raise ValueError(f"Model profile '{profile}' does not support explanations")
+                explainers.append(explainer)
+            self._explainers[profile] = tuple(explainers)
+        return self._explainers[profile]
+    
     def prepare_features(self, employee_data: Dict) -> np.ndarray:
         """Prepare features from employee data"""
+        return self.prepare_features_many([employee_data])
+    
+    def prepare_features_many(self, employees: List[Dict]) -> np.ndarray:
+        """Feature matrix for several employees, one row each (columns as in FEATURE_NAMES)"""
         
-        # Encode department
-        dept_encoded = self.label_encoder.transform([employee_data['department']])[0]
+        # Encode departments in one call
+        dept_encoded = self.label_encoder.transform([e['department'] for e in employees])
         
+        optional = lambda e, name: FEATURE_DEFAULTS[name] if e.get(name) is None else e[name]
         features = np.array([[
-            employee_data['age'],
-            employee_data['experience'],
-            employee_data['salary'],
-            employee_data.get('satisfaction_level', 0.7),
-            employee_data.get('last_evaluation_score', 0.7),
-            employee_data.get('project_count', 3),
-            employee_data.get('work_hours', 40),
-            dept_encoded
-        ]])
+            e['age'],
+            e['experience'],
+            e['salary'],
+            optional(e, 'satisfaction_level'),
+            optional(e, 'last_evaluation_score'),
+            optional(e, 'project_count'),
+            optional(e, 'work_hours'),
+            dept
+        ] for e, dept in zip(employees, dept_encoded)], dtype=np.float64)
         
         return features
     
-    def predict_attrition(self, employee_data: Dict) -> Tuple[str, float]:
+    def predict_attrition(self, employee_data: Dict, profile: Optional[str] = None) -> Tuple[str, float]:
         """Predict if employee will leave"""
         
+        attrition_model, _ = self.get_models(profile)
         features = self.prepare_features(employee_data)
         features_scaled = self.attrition_scaler.transform(features)
         
         # Get probability
-        probability = self.attrition_model.predict_proba(features_scaled)[0][1]
+        probability = attrition_model.predict_proba(features_scaled)[0][1]
         
         # Get prediction
         prediction = 'Y' if probability > 0.5 else 'N'
         
         return prediction, float(probability)
     
-    def predict_performance(self, employee_data: Dict) -> float:
+    def predict_performance(self, employee_data: Dict, profile: Optional[str] = None) -> float:
         """Predict employee performance score"""
         
+        _, performance_model = self.get_models(profile)
         features = self.prepare_features(employee_data)
         features_scaled = self.performance_scaler.transform(features)
         
         # Get prediction
-        performance = self.performance_model.predict(features_scaled)[0]
+        performance = performance_model.predict(features_scaled)[0]
         
         # Ensure within bounds
         performance = max(0, min(100, performance))
         
         return float(performance)
     
-    def get_risk_level(self, probability: float) -> str:
+    @staticmethod
+    def get_risk_level(probability: float) -> str:
         """Determine risk level based on attrition probability"""
         
         if probability < 0.3:
@@ -72,26 +159,79 @@ class MLPredictor:
         else:
             return "High"
     
-    def predict_all(self, employee_data: Dict) -> Dict:
+    def predict_all(self, employee_data: Dict, profile: Optional[str] = None) -> Dict:
         """Get all predictions for an employee"""
         
-        attrition_pred, attrition_prob = self.predict_attrition(employee_data)
-        performance_pred = self.predict_performance(employee_data)
-        risk_level = self.get_risk_level(attrition_prob)
-        
-        return {
-            'attrition_prediction': attrition_pred,
-            'attrition_probability': attrition_prob,
-            'performance_prediction': performance_pred,
-            'risk_level': risk_level
-        }
+        return self.predict_many([employee_data], profile)[0]
+
+    def score_features(self, features: np.ndarray, profile: Optional[str] = None,
+                       observe: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """(attrition probabilities, performance scores) for a prepared feature matrix.
+        
+        Scored rows feed the drift monitor and are queued for the shadow
+        model, if one is configured, unless observe=False (hypothetical rows).
+        """
+        
+        observe = observe and not self.experimental
+        if observe:
+            get_drift_monitor().observe(self.version, self.drift_reference, features)
+        attrition_model, performance_model = self.get_models(profile)
+        probabilities = attrition_model.predict_proba(self.attrition_scaler.transform(features))[:, 1]
+        performances = np.clip(performance_model.predict(self.performance_scaler.transform(features)), 0, 100)
+        if observe:
+            get_model_experiments().shadow(self, features, probabilities, performances, profile)
+        return probabilities, performances
+    
+    def predict_many(self, employees: List[Dict], profile: Optional[str] = None) -> List[Dict]:
+        """predict_all for several employees with one model call per target"""
+        
+        probabilities, performances = self.score_features(self.prepare_features_many(employees), profile)
+        
+        return [
+            {
+                'attrition_prediction': 'Y' if probability > 0.5 else 'N',
+                'attrition_probability': float(probability),
+                'performance_prediction': float(performance),
+                'risk_level': self.get_risk_level(probability)
+            }
+            for probability, performance in zip(probabilities, performances)
+        ]
 
 # Singleton instance
 _predictor = None
+_last_version_check = 0.0
+_reload_lock = threading.Lock()
 
-def get_predictor() -> MLPredictor:
-    """Get or create predictor instance"""
+def _reload_predictor(version: str):
+    """Load a newly promoted version off the request path and swap it in"""
     global _predictor
+    try:
+        predictor = MLPredictor(version)
+        _predictor = predictor
+        print(f"✓ Loaded model version {version}")
+    except Exception as e:
+        print(f"Warning: could not load model version {version}: {str(e)}")
+    finally:
+        _reload_lock.release()
+
+def get_predictor() -> MLPredictor:
+    """Get or create predictor instance.
+
+    Every MODEL_RELOAD_CHECK_SECONDS the current-version pointer is
+    re-read. A newly promoted version is loaded in a background thread
+    while requests keep using the previous predictor.
+    """
+    global _predictor, _last_version_check
     if _predictor is None:
         _predictor = MLPredictor()
+        _last_version_check = time.monotonic()
+        return _predictor
+    
+    now = time.monotonic()
+    if now - _last_version_check >= settings.MODEL_RELOAD_CHECK_SECONDS:
+        _last_version_check = now
+        version = current_version()
+        if version != _predictor.version and _reload_lock.acquire(blocking=False):
+            threading.Thread(target=_reload_predictor, args=(version,), daemon=True).start()
+    
     return _predictor
\ No newline at end of file
@@ -0,0 +1,62 @@
+import os
+import re
+import tempfile
+
+# Flat directory with the originally shipped artifacts ("base" version)
+MODEL_DIR = 'app/ml/models'
+VERSIONS_DIR = os.path.join(MODEL_DIR, 'versions')
+CURRENT_FILE = os.path.join(MODEL_DIR, 'CURRENT')
+
+BASE_VERSION = 'base'
+
+# Model profiles trade accuracy for latency. "full" lives in the version
+# directory itself; lighter profiles sit in profiles/<name> and share its
+# scalers and department encoder.
+FULL_PROFILE = 'full'
+PROFILES = [FULL_PROFILE, 'hist', 'linear']
+
+def current_version() -> str:
+    """Name of the version live workers should serve"""
+    try:
+        with open(CURRENT_FILE) as f:
+            return f.read().strip() or BASE_VERSION
+    except FileNotFoundError:
+        return BASE_VERSION
+
+def version_dir(version: str) -> str:
+    return MODEL_DIR if version == BASE_VERSION else os.path.join(VERSIONS_DIR, version)
+
+def profile_dir(model_dir: str, profile: str) -> str:
+    return model_dir if profile == FULL_PROFILE else os.path.join(model_dir, 'profiles', profile)
+
+def current_model_dir() -> str:
+    return version_dir(current_version())
+
+def new_candidate_dir() -> str:
+    """Empty directory for a training run; promote() turns it into a version"""
+    os.makedirs(VERSIONS_DIR, exist_ok=True)
+    return tempfile.mkdtemp(prefix='candidate_', dir=VERSIONS_DIR)
+
+def list_versions():
+    if not os.path.isdir(VERSIONS_DIR):
+        return []
+    versions = [name for name in os.listdir(VERSIONS_DIR) if re.fullmatch(r'v\d+', name)]
+    return sorted(versions, key=lambda name: int(name[1:]))
+
+def promote(candidate_dir: str) -> str:
+    """Publish a trained candidate as the next version and make it current.
+
+    The pointer file is replaced atomically, so a worker reading it sees
+    either the old or the new version, never a partial write.
+    """
+
+    versions = list_versions()
+    version = f"v{int(versions[-1][1:]) + 1 if versions else 1}"
+    os.rename(candidate_dir, os.path.join(VERSIONS_DIR, version))
+
+    fd, tmp_path = tempfile.mkstemp(dir=MODEL_DIR)
+    with os.fdopen(fd, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, CURRENT_FILE)
+
+    return version
@@ -0,0 +1,240 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable
+from app.config import settings
+from app.database import SessionLocal
+from app.models.employee import Employee
+from app.ml.batch_scoring import write_predictions
+from app.ml.db_source import MODEL_COLUMNS, read_employee_arrays
+from app.ml.predict import get_predictor
+from app.utils.events import event_bus
+
+# Employee fields the models read; changing any of them stales the prediction
+MODEL_INPUTS = frozenset(MODEL_COLUMNS) - {'id'}
+
+# Longest wait before retrying an employee whose scoring failed
+RETRY_MAX_DELAY_SECONDS = 300.0
+
+class RepredictionQueue:
+    """Re-scores employees whose model inputs changed.
+
+    Employee ids are queued from employee.created / employee.updated
+    events. An id queued again before it is scored is not duplicated;
+    its deadline moves to REPREDICT_DEBOUNCE_SECONDS after the latest
+    change, but never past REPREDICT_MAX_DELAY_SECONDS after the first,
+    so a burst of edits costs one prediction. A background thread takes
+    due ids in batches of up to REPREDICT_BATCH_SIZE and scores each
+    batch with one model call and one bulk UPDATE.
+
+    A failing batch is split in halves until the failing ids are
+    isolated, so one bad row does not hold back the rest. Those ids are
+    retried with exponential backoff and dropped after
+    REPREDICT_MAX_ATTEMPTS failures.
+    """
+
+    def __init__(self, debounce_seconds: float, max_delay_seconds: float, batch_size: int,
+                 max_attempts: int = 5):
+        self.debounce = debounce_seconds
+        self.max_delay = max_delay_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.enqueued = 0
+        self.coalesced = 0
+        self.updated = 0
+        self.skipped = 0
+        self.batches = 0
+        self.failed = 0
+        self.last_error = None
+        # employee_id -> (first queued, due); insertion order is first-queued order
+        self._pending = OrderedDict()
+        self._attempts = {}  # employee_id -> failed attempts so far
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _on_event(self, event: Dict):
+        data = event['data']
+        if event['type'] == 'employee.created':
+            if data.get('is_active', True):
+                self.enqueue([data['employee_id']])
+        elif event['type'] == 'employee.updated':
+            changes = data.get('changes', {})
+            if MODEL_INPUTS.intersection(changes) or changes.get('is_active') is True:
+                self.enqueue([data['employee_id']])
+
+    def enqueue(self, employee_ids: Iterable[int]):
+        now = time.monotonic()
+        with self._lock:
+            for employee_id in employee_ids:
+                self.enqueued += 1
+                if employee_id in self._pending:
+                    self.coalesced += 1
+                    first = self._pending[employee_id][0]
+                    self._pending[employee_id] = (first, min(now + self.debounce, first + self.max_delay))
+                else:
+                    self._pending[employee_id] = (now, now + self.debounce)
+
+    def _take_due(self, flush: bool = False, skip=frozenset()):
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                employee_id for employee_id, (_, deadline) in self._pending.items()
+                if (flush or deadline <= now) and employee_id not in skip
+            ][:self.batch_size]
+            for employee_id in due:
+                del self._pending[employee_id]
+        return due
+
+    def drain(self, flush: bool = False) -> int:
+        """Score every due id (all ids with flush); returns employees updated.
+
+        Failed ids wait for a later drain, however short their backoff:
+        without flush the drain stops at the first failure, with flush
+        (on shutdown) it skips them and scores everything else.
+        """
+
+        updated = 0
+        failed = set()
+        while True:
+            employee_ids = self._take_due(flush, failed)
+            if not employee_ids:
+                return updated
+            failures = []
+            updated += self._score_isolating(employee_ids, failures)
+            if failures:
+                self._retry_later(failures)
+                if not flush:
+                    return updated
+                failed.update(employee_id for employee_id, _ in failures)
+
+    def _score_isolating(self, employee_ids, failures) -> int:
+        """_score, halving a failing batch until the failing ids are isolated"""
+
+        try:
+            updated = self._score(employee_ids)
+        except Exception as e:
+            if len(employee_ids) == 1:
+                failures.append((employee_ids[0], e))
+                return 0
+            middle = len(employee_ids) // 2
+            return (self._score_isolating(employee_ids[:middle], failures) +
+                    self._score_isolating(employee_ids[middle:], failures))
+        with self._lock:
+            for employee_id in employee_ids:
+                self._attempts.pop(employee_id, None)
+        return updated
+
+    def _retry_later(self, failures):
+        """Requeue failed ids with exponential backoff; drop those out of attempts"""
+
+        now = time.monotonic()
+        dropped = []
+        with self._lock:
+            for employee_id, _ in failures:
+                attempts = self._attempts.get(employee_id, 0) + 1
+                if attempts >= self.max_attempts:
+                    del self._attempts[employee_id]
+                    dropped.append(employee_id)
+                    continue
+                self._attempts[employee_id] = attempts
+                # An id changed again meanwhile is already queued
+                if employee_id not in self._pending:
+                    delay = min(self.debounce * 2 ** attempts, RETRY_MAX_DELAY_SECONDS)
+                    self._pending[employee_id] = (now, now + delay)
+            self.failed += len(dropped)
+
+        self.last_error = str(failures[-1][1])
+        print(f"Warning: re-prediction failed for {len(failures)} employees: {self.last_error}")
+        if dropped:
+            print(f"Warning: gave up re-predicting employees {dropped} after {self.max_attempts} attempts")
+
+    def _score(self, employee_ids) -> int:
+        predictor = get_predictor()
+        with SessionLocal() as db:
+            # Deleted or deactivated employees simply drop out here
+            employees = read_employee_arrays(
+                db, MODEL_COLUMNS, (Employee.id.in_(employee_ids), Employee.is_active == True)
+            )
+            features, known = employees.features(predictor.label_encoder)
+            self.skipped += len(employee_ids) - int(known.sum())
+            if not known.any():
+                return 0
+            employees = employees.take(known)
+            write_predictions(db, predictor, employees, features[known],
+                              history=settings.HISTORY_ENABLED)
+            db.commit()
+
+        self.batches += 1
+        self.updated += len(employees)
+        event_bus.publish("prediction.batch", {
+            "updated_count": len(employees),
+            "employee_ids": employees['id'].tolist()
+        })
+        return len(employees)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        event_bus.add_listener(self._on_event)
+        self._thread = threading.Thread(target=self._run, name="repredict-queue", daemon=True)
+        self._thread.start()
+        print("✓ Re-prediction queue started")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            if self._thread.is_alive():
+                # Still inside a drain; draining here too would score ids twice
+                print("Warning: re-prediction queue still busy on shutdown; pending ids not drained")
+                return
+        try:
+            self.drain(flush=True)
+        except Exception as e:
+            print(f"Warning: re-prediction queue could not drain on shutdown: {str(e)}")
+
+    def _run(self):
+        # Check often enough that an id is scored soon after it is due
+        interval = max(0.05, self.debounce / 4)
+        while not self._stop.is_set():
+            self._wake.wait(interval)
+            try:
+                self.drain()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Warning: re-prediction queue error: {str(e)}")
+
+    def stats(self) -> Dict:
+        return {
+            'running': self._thread is not None and not self._stop.is_set(),
+            'pending': len(self._pending),
+            'enqueued': self.enqueued,
+            'coalesced': self.coalesced,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'batches': self.batches,
+            'retrying': len(self._attempts),
+            'failed': self.failed,
+            'debounce_seconds': self.debounce,
+            'max_delay_seconds': self.max_delay,
+            'batch_size': self.batch_size,
+            'last_error': self.last_error
+        }
+
+# Singleton instance
+_queue = None
+
+def get_reprediction_queue() -> RepredictionQueue:
+    """Get or create the re-prediction queue"""
+    global _queue
+    if _queue is None:
+        _queue = RepredictionQueue(
+            settings.REPREDICT_DEBOUNCE_SECONDS,
+            settings.REPREDICT_MAX_DELAY_SECONDS,
+            settings.REPREDICT_BATCH_SIZE,
+            settings.REPREDICT_MAX_ATTEMPTS
+        )
+    return _queue
@@ -0,0 +1,375 @@
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import joblib
+import numpy as np
+from sqlalchemy import func, select
+from app.config import settings
+from app.database import engine
+from app.models.employee import Employee
+from app.models.feedback import Feedback
+from app.models.prediction_history import DepartmentPredictionDaily, PredictionHistory
+from app.ml.history import day_number
+from app.ml.registry import MODEL_DIR, current_version, new_candidate_dir, promote, version_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process guard
+    fcntl = None
+
+STATE_FILE = os.path.join(MODEL_DIR, 'retrain_state.json')
+LOCK_FILE = os.path.join(MODEL_DIR, '.retrain.lock')  # held by the process running the scheduler
+RUN_LOCK_FILE = os.path.join(MODEL_DIR, '.retrain.run.lock')  # held while any process retrains
+
+def try_lock(path: str):
+    """Open `path` with an exclusive flock on it; None if another process holds it"""
+    handle = open(path, 'w')
+    if fcntl is None:
+        return handle
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return handle
+    except OSError:
+        handle.close()
+        return None
+
+def _cron_field_matches(field: str, value: int, low: int, high: int) -> bool:
+    """Match one cron field: *, n, a-b, lists and /step"""
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/')
+            step = int(step_text)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(v) for v in part.split('-'))
+        else:
+            start = end = int(part)
+        if start <= value <= end and (value - start) % step == 0:
+            return True
+    return False
+
+def cron_matches(expression: str, moment: datetime) -> bool:
+    """True if `moment` matches a 5-field cron expression (minute hour day month weekday)"""
+    minute, hour, day, month, weekday = expression.split()
+    return (
+        _cron_field_matches(minute, moment.minute, 0, 59) and
+        _cron_field_matches(hour, moment.hour, 0, 23) and
+        _cron_field_matches(day, moment.day, 1, 31) and
+        _cron_field_matches(month, moment.month, 1, 12) and
+        # cron counts weekdays from Sunday = 0
+        _cron_field_matches(weekday, (moment.weekday() + 1) % 7, 0, 6)
+    )
+
+def evaluate_model_dir(model_dir: str, X: np.ndarray, departments: np.ndarray,
+                       y_attrition: np.ndarray, y_performance: np.ndarray) -> Optional[Dict]:
+    """Score a model version on raw (unscaled) features.
+
+    Departments are re-encoded with the version's own encoder. Rows with
+    departments it has never seen are skipped.
+    """
+
+    try:
+        le_dept = joblib.load(f'{model_dir}/label_encoder.pkl')
+        attrition_model = joblib.load(f'{model_dir}/attrition_model.pkl')
+        attrition_scaler = joblib.load(f'{model_dir}/attrition_scaler.pkl')
+        performance_model = joblib.load(f'{model_dir}/performance_model.pkl')
+        performance_scaler = joblib.load(f'{model_dir}/performance_scaler.pkl')
+    except FileNotFoundError:
+        return None
+
+    known = np.isin(departments, le_dept.classes_)
+    if not known.any():
+        return None
+
+    X = X[known].copy()
+    X[:, -1] = le_dept.transform(departments[known])
+
+    attrition_pred = attrition_model.predict(attrition_scaler.transform(X))
+    performance_pred = np.clip(performance_model.predict(performance_scaler.transform(X)), 0, 100)
+
+    return {
+        'rows': int(known.sum()),
+        'accuracy': float((attrition_pred == y_attrition[known]).mean()),
+        'rmse': float(np.sqrt(((performance_pred - y_performance[known]) ** 2).mean()))
+    }
+
+def retrain_candidate(data_source: str, live_version: str) -> Dict:
+    """Train a candidate and score it and the live version on the same holdout.
+
+    Runs in a separate process so training never competes with request
+    handling for the GIL. The data is read once, so the holdout never
+    contains rows the candidate trained on, even while the database changes.
+    """
+
+    from app.ml.train_model import holdout_split, load_training_data, train_models
+
+    candidate_dir = new_candidate_dir()
+    try:
+        data = load_training_data(data_source)
+        X, y_attrition, y_performance, le_dept = data
+        train_index, test_index = holdout_split(y_attrition)
+        train_models(data_source, candidate_dir, data=data, split=(train_index, test_index))
+
+        X_test = X[test_index]
+        departments = le_dept.inverse_transform(X_test[:, -1].astype(int))
+        y_attrition, y_performance = y_attrition[test_index], y_performance[test_index]
+
+        return {
+            'candidate_dir': candidate_dir,
+            'candidate': evaluate_model_dir(candidate_dir, X_test, departments, y_attrition, y_performance),
+            'current': evaluate_model_dir(version_dir(live_version), X_test, departments,
+                                          y_attrition, y_performance)
+        }
+    except Exception:
+        shutil.rmtree(candidate_dir, ignore_errors=True)
+        raise
+
+def should_promote(candidate: Optional[Dict], current: Optional[Dict]) -> bool:
+    """A candidate trained on fresher data wins unless it is measurably worse"""
+    if candidate is None:
+        return False
+    if current is None:
+        return True
+    return (
+        candidate['accuracy'] >= current['accuracy'] - settings.RETRAIN_ACCURACY_TOLERANCE and
+        candidate['rmse'] <= current['rmse'] * (1 + settings.RETRAIN_RMSE_TOLERANCE)
+    )
+
+class RetrainScheduler:
+    """Retrains in a child process when enough data changed or on a cron schedule.
+
+    Only one process per host runs the scheduler (guarded by a file lock).
+    Every run, scheduled or manual from any worker, also takes a second
+    file lock, so two processes never train or promote concurrently.
+    Changes are counted from the database against a baseline kept in the
+    state file, so predictions made by every worker count. Promoted
+    versions reach every worker through get_predictor()'s reload check.
+    """
+
+    def __init__(self):
+        self.running = False
+        self.last_result = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._future = None
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+        self._baseline = None
+        self._lock_handle = None
+        self._run_lock_handle = None
+        self._last_cron_minute = None
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(STATE_FILE) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {'employees': None, 'feedback': None, 'last_trained_at': None}
+
+    def _save_state(self):
+        tmp_path = STATE_FILE + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, default=str)
+        os.replace(tmp_path, STATE_FILE)
+
+    def _counts(self) -> Dict:
+        """Current totals, and the watermarks predictions are counted from"""
+        with engine.connect() as conn:
+            return {
+                'employees': conn.execute(select(func.count()).select_from(Employee)).scalar(),
+                'feedback': conn.execute(select(func.count()).select_from(Feedback)).scalar(),
+                'history_id': conn.execute(select(func.max(PredictionHistory.id))).scalar() or 0,
+                'history_day': day_number(datetime.now(timezone.utc)),
+                'counted_at': conn.execute(select(func.now())).scalar().isoformat()
+            }
+
+    def predictions_since(self) -> int:
+        """Predictions made by any worker since the baseline in the state file.
+
+        Counted from prediction history: raw rows after the baseline's
+        last row, plus compacted days after the baseline's day. Without
+        history, employees updated since the baseline are counted instead.
+        0 until pending_changes() or a run has recorded a baseline.
+        """
+        with engine.connect() as conn:
+            if not settings.HISTORY_ENABLED:
+                counted_at = self.state.get('counted_at')
+                if counted_at is None:
+                    return 0
+                return conn.execute(
+                    select(func.count()).select_from(Employee)
+                    .where(Employee.updated_at > datetime.fromisoformat(counted_at))
+                ).scalar()
+            history_id, history_day = self.state.get('history_id'), self.state.get('history_day')
+            if history_id is None or history_day is None:
+                return 0
+            raw = conn.execute(
+                select(func.count()).select_from(PredictionHistory)
+                .where(PredictionHistory.id > history_id)
+            ).scalar()
+            compacted = conn.execute(
+                select(func.sum(DepartmentPredictionDaily.predictions))
+                .where(DepartmentPredictionDaily.day > history_day)
+            ).scalar()
+            return raw + (compacted or 0)
+
+    def pending_changes(self) -> int:
+        # Another worker may have trained since this one last looked
+        self.state = self._load_state()
+        counts = self._counts()
+        missing = {key: value for key, value in counts.items() if self.state.get(key) is None}
+        if missing:
+            # First run: only count what happens from now on
+            self.state.update(missing)
+            self._save_state()
+        return (
+            abs(counts['employees'] - self.state['employees']) +
+            abs(counts['feedback'] - self.state['feedback']) +
+            self.predictions_since()
+        )
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._lock_handle = try_lock(LOCK_FILE)
+        if self._lock_handle is None:
+            print("✓ Retraining scheduler is running in another worker")
+            return
+        self._thread = threading.Thread(target=self._run, name="retrain-scheduler", daemon=True)
+        self._thread.start()
+        print("✓ Retraining scheduler started")
+
+    def stop(self):
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._lock_handle is not None:
+            self._lock_handle.close()
+
+    def _run(self):
+        while not self._stop.wait(settings.RETRAIN_CHECK_SECONDS):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Warning: retraining scheduler error: {str(e)}")
+
+    def tick(self):
+        """One scheduler step; starts a run when one is due"""
+
+        if self._future is not None:
+            return
+
+        now = datetime.now()
+        minute = now.replace(second=0, microsecond=0)
+        if (settings.RETRAIN_CRON and minute != self._last_cron_minute
+                and cron_matches(settings.RETRAIN_CRON, now)):
+            self._last_cron_minute = minute
+            self.trigger("schedule")
+        elif self.pending_changes() >= settings.RETRAIN_MIN_CHANGES:
+            self.trigger("changes")
+
+    def trigger(self, reason: str) -> bool:
+        """Start a retraining run in the background; False if one is running in any process"""
+
+        with self._lock:
+            if self._future is not None:
+                return False
+            self._run_lock_handle = try_lock(RUN_LOCK_FILE)
+            if self._run_lock_handle is None:
+                return False
+
+            self._baseline = self._counts()
+            self._finished.clear()
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context('spawn')
+                )
+            self._future = self._executor.submit(
+                retrain_candidate, settings.RETRAIN_DATA_SOURCE, current_version()
+            )
+            self.running = True
+
+        print(f"⚙️  Retraining started ({reason})")
+        self._future.add_done_callback(self._finish)
+        return True
+
+    def run(self, reason: str) -> Dict:
+        """Retrain now and wait for the outcome; raises if a run is in progress or fails"""
+
+        if not self.trigger(reason):
+            raise RuntimeError("Retraining already in progress")
+        self._finished.wait()
+        if 'error' in self.last_result:
+            raise RuntimeError(self.last_result['error'])
+        return self.last_result
+
+    def _finish(self, future):
+        counts = self._baseline
+
+        try:
+            result = future.result()
+            candidate_dir = result.pop('candidate_dir')
+            if should_promote(result['candidate'], result['current']):
+                result['version'] = promote(candidate_dir)
+                print(f"✓ Promoted model version {result['version']}: {result['candidate']}")
+            else:
+                shutil.rmtree(candidate_dir, ignore_errors=True)
+                result['version'] = None
+                print(f"✓ Kept model version {current_version()}; candidate {result['candidate']} "
+                      f"did not beat {result['current']}")
+        except Exception as e:
+            # Still reset the baseline so a failing run is not retried every tick
+            result = {'error': str(e)}
+            print(f"Warning: retraining failed: {str(e)}")
+
+        result['finished_at'] = datetime.now().isoformat()
+        with self._lock:
+            self.last_result = result
+            self.state = self._load_state()
+            self.state.update(counts)
+            self.state['last_trained_at'] = result['finished_at']
+            self._save_state()
+            self._run_lock_handle.close()
+            self._run_lock_handle = None
+            self._future = None
+            self.running = False
+        self._finished.set()
+
+    def in_progress(self) -> bool:
+        """True while this or any other process on the host is retraining"""
+        if self.running:
+            return True
+        handle = try_lock(RUN_LOCK_FILE)
+        if handle is None:
+            return True
+        handle.close()
+        return False
+
+    def status(self) -> Dict:
+        return {
+            'enabled': settings.RETRAIN_ENABLED,
+            'running': self.in_progress(),
+            'current_version': current_version(),
+            'predictions_since_last_training': self.predictions_since(),
+            'last_trained_at': self.state.get('last_trained_at'),
+            'last_result': self.last_result
+        }
+
+# Singleton instance
+_scheduler = None
+
+def get_retrain_scheduler() -> RetrainScheduler:
+    """Get or create the retraining scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RetrainScheduler()
+    return _scheduler
@@ -0,0 +1,327 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from app.config import settings
+from app.database import engine
+from app.models.employee import Employee
+from app.ml.db_source import MODEL_COLUMNS, EmployeeArrays, load_employee_arrays, read_employee_arrays
+from app.ml.predict import get_predictor
+from app.ml.repredict import MODEL_INPUTS
+from app.utils.events import event_bus
+
+INDEX_COLUMNS = MODEL_COLUMNS + ('is_active',)
+
+def smallest(values: np.ndarray, k: int, allowed: Optional[np.ndarray] = None,
+             sample_step: int = 64) -> np.ndarray:
+    """Indices of up to k smallest finite values where `allowed`, smallest first.
+
+    The k-th smallest allowed value of every sample_step-th value bounds
+    the k-th smallest overall from above (the sample holds k allowed
+    values at or below it), so one comparison pass cuts the candidates
+    down to about k * sample_step and only those are checked against
+    `allowed` and partitioned exactly.
+    """
+
+    threshold = np.inf
+    if len(values) > 4 * sample_step * k:
+        sample = values[::sample_step]
+        if allowed is not None:
+            sample = sample[allowed[::sample_step]]
+        if len(sample) >= k:
+            threshold = np.partition(sample, k - 1)[k - 1]
+    candidates = np.flatnonzero(values <= threshold if np.isfinite(threshold) else np.isfinite(values))
+    if allowed is not None:
+        candidates = candidates[allowed[candidates]]
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(values[candidates], k - 1)[:k]]
+    return candidates[np.argsort(values[candidates], kind='stable')]
+
+class SimilarityIndex:
+    """Brute-force nearest-neighbour index over scaled employee features.
+
+    Rows are the model features of every employee (active or not) put
+    through the attrition scaler, the space the models see, stored as a
+    dense float32 matrix with their squared norms. A query is one
+    matrix-vector product plus a sampled top-k selection, so filters are
+    just a mask and the index updates in place: the event bus hooks re-read
+    changed employees by primary key and a removed row is swapped with
+    the last one. A tree would answer faster but cannot be filtered or
+    updated without rebuilding.
+
+    Employees in departments the label encoder has never seen have no
+    features and are left out. A newly promoted model version changes
+    the scaler, so the index is rebuilt in the background when it sees
+    one, and also every SIMILAR_REFRESH_SECONDS to pick up other
+    processes' writes.
+    """
+
+    def __init__(self, max_rows: int, refresh_seconds: float):
+        self.max_rows = max_rows
+        self.refresh_seconds = refresh_seconds
+        self.size = 0
+        self.ready = False
+        self.model_version = None
+        self.built_at = None
+        self.build_seconds = None
+        self.last_error = None
+        self._features = np.empty((0, 0), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._departments = np.empty(0, dtype=np.int32)
+        self._active = np.empty(0, dtype=bool)
+        self._names = []
+        self._codes = {}  # department -> code
+        self._rows = {}  # employee id -> row
+        self._building = 0
+        self._touched = set()  # ids changed while a build was reading
+        self._lock = threading.RLock()
+        self._rebuild = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # Building
+
+    def _scaled(self, arrays: EmployeeArrays, predictor) -> Tuple[np.ndarray, np.ndarray]:
+        """(scaled float32 features of the rows the encoder knows, that mask)"""
+
+        X, known = arrays.features(predictor.label_encoder)
+        return predictor.attrition_scaler.transform(X[known]).astype(np.float32), known
+
+    def build(self, bind=engine) -> bool:
+        """(Re)load every employee; False if there are more than max_rows"""
+
+        start = time.perf_counter()
+        with bind.connect() as conn:
+            count = conn.execute(select(func.count()).select_from(Employee)).scalar()
+        if count > self.max_rows:
+            with self._lock:
+                self.ready = False
+            print(f"Warning: {count} employees exceed SIMILAR_MAX_ROWS ({self.max_rows}); "
+                  f"similar-employee search is unavailable")
+            return False
+
+        predictor = get_predictor()
+        with self._lock:
+            self._building += 1
+        try:
+            arrays = load_employee_arrays(INDEX_COLUMNS, bind=bind)
+            features, known = self._scaled(arrays, predictor)
+        except Exception:
+            with self._lock:
+                self._building -= 1
+            raise
+        n = len(features)
+        capacity = min(self.max_rows, max(1024, n + n // 4))
+
+        def grow(values, dtype, shape=()):
+            grown = np.empty((capacity, *shape), dtype=dtype)
+            grown[:n] = values
+            return grown
+
+        with self._lock:
+            self._features = grow(features, np.float32, features.shape[1:])
+            self._norms = grow(np.einsum('ij,ij->i', features, features), np.float32)
+            self._ids = grow(arrays['id'][known], np.int64)
+            self._departments = grow(arrays['department'][known], np.int32)
+            self._active = grow(arrays['is_active'][known], bool)
+            self._names = list(arrays.departments)
+            self._codes = {name: code for code, name in enumerate(self._names)}
+            self._rows = dict(zip(self._ids[:n].tolist(), range(n)))
+            self.size = n
+            self.model_version = predictor.version
+            self.ready = True
+            self.built_at = datetime.now().isoformat()
+            self.build_seconds = time.perf_counter() - start
+            self._building -= 1
+            touched, self._touched = self._touched, set()
+
+        # Changes that landed after the read started may be missing from it
+        self.reload(touched, bind)
+        return True
+
+    # Incremental updates
+
+    def _code(self, department: str) -> int:
+        code = self._codes.get(department)
+        if code is None:
+            code = self._codes[department] = len(self._names)
+            self._names.append(department)
+        return code
+
+    def _grow(self):
+        capacity = min(self.max_rows, 2 * len(self._ids))
+        for name in ('_features', '_norms', '_ids', '_departments', '_active'):
+            values = getattr(self, name)
+            grown = np.empty((capacity, *values.shape[1:]), dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            setattr(self, name, grown)
+
+    def remove(self, employee_ids: Iterable[int]):
+        with self._lock:
+            for employee_id in employee_ids:
+                row = self._rows.pop(employee_id, None)
+                if row is None:
+                    continue
+                last = self.size - 1
+                if row != last:
+                    for name in ('_features', '_norms', '_ids', '_departments', '_active'):
+                        values = getattr(self, name)
+                        values[row] = values[last]
+                    self._rows[int(self._ids[row])] = row
+                self.size = last
+
+    def reload(self, employee_ids: Iterable[int], bind=engine):
+        """Re-read employees by primary key and insert, overwrite or drop their rows"""
+
+        employee_ids = list(employee_ids)
+        if not self.ready or not employee_ids:
+            return
+        with bind.connect() as conn:
+            arrays = read_employee_arrays(conn, INDEX_COLUMNS, (Employee.id.in_(employee_ids),))
+        predictor = get_predictor()
+        if predictor.version != self.model_version:
+            # Rows scaled by another model version would not be comparable
+            self._rebuild.set()
+            return
+        features, known = self._scaled(arrays, predictor)
+        arrays = arrays.take(known)
+        departments = arrays.department_names().tolist()
+
+        with self._lock:
+            if not self.ready:
+                return
+            for i, employee_id in enumerate(arrays['id'].tolist()):
+                row = self._rows.get(employee_id)
+                if row is None:
+                    if self.size == len(self._ids):
+                        if self.size >= self.max_rows:
+                            self.ready = False
+                            print(f"Warning: similarity index is full ({self.max_rows} rows); "
+                                  f"unavailable until the next rebuild")
+                            return
+                        self._grow()
+                    row = self._rows[employee_id] = self.size
+                    self.size += 1
+                self._features[row] = features[i]
+                self._norms[row] = features[i] @ features[i]
+                self._ids[row] = employee_id
+                self._departments[row] = self._code(departments[i])
+                self._active[row] = arrays['is_active'][i]
+            # Deleted, or moved to a department the encoder does not know
+            self.remove(set(employee_ids) - set(arrays['id'].tolist()))
+
+    def _on_event(self, event: Dict):
+        data = event['data']
+        if event['type'] == 'employee.updated':
+            changes = data.get('changes', {})
+            if not (MODEL_INPUTS.intersection(changes) or 'is_active' in changes):
+                return
+        elif event['type'] not in ('employee.created', 'employee.deleted'):
+            return
+
+        with self._lock:
+            if self._building:
+                self._touched.add(data['employee_id'])
+        try:
+            if event['type'] == 'employee.deleted':
+                self.remove([data['employee_id']])
+            else:
+                self.reload([data['employee_id']])
+        except Exception as e:
+            # A missed update is repaired by the next rebuild
+            self.last_error = str(e)
+            print(f"Warning: similarity index update failed: {str(e)}")
+
+    # Reading
+
+    def neighbours(self, employee_id: int, k: int = 10, department: Optional[str] = None,
+                   active_only: bool = True) -> Optional[List[Tuple[int, float]]]:
+        """[(employee id, distance)] of the k nearest employees, nearest first.
+
+        None when `employee_id` is not in the index. Distances are
+        Euclidean in the scaled feature space.
+        """
+
+        if get_predictor().version != self.model_version:
+            self._rebuild.set()
+        with self._lock:
+            row = self._rows.get(employee_id)
+            if row is None:
+                return None
+            n = self.size
+            # |x - q|^2 = |x|^2 - 2 x.q + |q|^2, computed in place; |q|^2 is added to the k found
+            distances = self._features[:n] @ self._features[row]
+            distances *= -2
+            distances += self._norms[:n]
+            distances[row] = np.inf
+            allowed = self._active[:n] if active_only else None
+            if department is not None:
+                code = self._codes.get(department)
+                if code is None:
+                    return []
+                in_department = self._departments[:n] == code
+                allowed = in_department if allowed is None else allowed & in_department
+
+            nearest = smallest(distances, k, allowed)
+            return list(zip(self._ids[nearest].tolist(),
+                            np.sqrt(np.maximum(distances[nearest] + self._norms[row], 0)).tolist()))
+
+    def memory_bytes(self) -> int:
+        return sum(getattr(self, name).nbytes
+                   for name in ('_features', '_norms', '_ids', '_departments', '_active'))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': settings.SIMILAR_ENABLED,
+                'ready': self.ready,
+                'rows': self.size,
+                'capacity': len(self._ids),
+                'max_rows': self.max_rows,
+                'model_version': self.model_version,
+                'memory_bytes': self.memory_bytes(),
+                'built_at': self.built_at,
+                'build_seconds': self.build_seconds,
+                'refresh_seconds': self.refresh_seconds,
+                'last_error': self.last_error
+            }
+
+    # Lifecycle
+
+    def start(self):
+        if self._thread is not None:
+            return
+        event_bus.add_listener(self._on_event)
+        self._thread = threading.Thread(target=self._run, name="similarity-index", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._rebuild.set()
+
+    def _run(self):
+        # Built off the startup path; until then similar-employee search returns 503
+        while not self._stop.is_set():
+            try:
+                first = self.built_at is None
+                if self.build() and first:
+                    print(f"✓ Similarity index built: {self.size} employees, "
+                          f"{self.memory_bytes() / 2**20:.1f}MB in {self.build_seconds:.2f}s")
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Warning: could not build similarity index: {str(e)}")
+            self._rebuild.wait(self.refresh_seconds)
+            self._rebuild.clear()
+
+# Singleton instance
+_index = None
+
+def get_similarity_index() -> SimilarityIndex:
+    """Get or create the similarity index"""
+    global _index
+    if _index is None:
+        _index = SimilarityIndex(settings.SIMILAR_MAX_ROWS, settings.SIMILAR_REFRESH_SECONDS)
+    return _index
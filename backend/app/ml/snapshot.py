@@ -0,0 +1,324 @@
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable
+import numpy as np
+from sqlalchemy import func, select
+from app.config import settings
+from app.database import engine
+from app.models.employee import Employee
+from app.ml.db_source import (
+    MODEL_COLUMNS,
+    EmployeeArrays,
+    load_employee_arrays,
+    read_employee_arrays
+)
+from app.utils.events import event_bus
+
+SNAPSHOT_COLUMNS = MODEL_COLUMNS + (
+    'satisfaction_level_raw', 'performance_score', 'attrition_probability', 'performance_prediction'
+)
+
+# Cached analytics results; query parameters vary freely, so the least
+# recently used are dropped beyond this
+CACHE_ENTRIES = 32
+
+class WorkforceSnapshot:
+    """Active employees held in memory as NumPy columns.
+
+    Built from the database in one streamed read, then kept current by
+    the write hooks on the event bus: employee changes re-read the
+    affected rows by primary key, single predictions are applied in
+    place, and a batch prediction without ids triggers a rebuild. Every
+    change bumps `version`; every build also draws a random `epoch`, so
+    (epoch, version) never repeats across processes or restarts. Rows stay dense (a removed row is swapped
+    with the last one), so analytics are plain vectorized NumPy over
+    `size` rows. Writes made by other server processes only arrive with
+    the periodic rebuild every SNAPSHOT_REFRESH_SECONDS.
+
+    Holds at most SNAPSHOT_MAX_ROWS rows; with more active employees it
+    stays unavailable and callers fall back to SQL.
+    """
+
+    def __init__(self, max_rows: int, refresh_seconds: float):
+        self.max_rows = max_rows
+        self.refresh_seconds = refresh_seconds
+        self.version = 0
+        self.epoch = None
+        self.size = 0
+        self.ready = False
+        self.built_at = None
+        self.build_seconds = None
+        self.last_error = None
+        self._columns = {}
+        self._departments = []
+        self._codes = {}  # department -> code
+        self._rows = {}  # employee id -> row
+        self._cache = OrderedDict()  # key -> (epoch, version, result), least recently used first
+        self._building = 0
+        self._touched = set()  # ids changed while a build was reading
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # Building
+
+    def build(self, bind=engine) -> bool:
+        """(Re)load every active employee; False if there are more than max_rows"""
+
+        start = time.perf_counter()
+        active = (Employee.is_active == True,)
+        with bind.connect() as conn:
+            count = conn.execute(select(func.count()).where(*active)).scalar()
+        if count > self.max_rows:
+            with self._lock:
+                self.ready = False
+                self._columns, self._rows, self.size = {}, {}, 0
+            print(f"Warning: {count} active employees exceed SNAPSHOT_MAX_ROWS ({self.max_rows}); "
+                  f"analytics use SQL")
+            return False
+
+        with self._lock:
+            self._building += 1
+        try:
+            arrays = load_employee_arrays(SNAPSHOT_COLUMNS, active, bind=bind)
+        except Exception:
+            with self._lock:
+                self._building -= 1
+            raise
+        n = len(arrays)
+        capacity = min(self.max_rows, max(1024, n + n // 4))
+        columns = {}
+        for name in SNAPSHOT_COLUMNS:
+            columns[name] = np.empty(capacity, dtype=arrays[name].dtype)
+            columns[name][:n] = arrays[name]
+
+        with self._lock:
+            self._columns = columns
+            self._departments = list(arrays.departments)
+            self._codes = {name: code for code, name in enumerate(self._departments)}
+            self._rows = dict(zip(arrays['id'].tolist(), range(n)))
+            self.size = n
+            self.version += 1
+            self.epoch = uuid.uuid4().hex[:8]
+            self.ready = True
+            self.built_at = datetime.now().isoformat()
+            self.build_seconds = time.perf_counter() - start
+            self._building -= 1
+            touched, self._touched = self._touched, set()
+
+        # Changes that landed after the read started may be missing from it
+        self.reload(touched, bind)
+        return True
+
+    # Incremental updates
+
+    def _code(self, department: str) -> int:
+        code = self._codes.get(department)
+        if code is None:
+            code = self._codes[department] = len(self._departments)
+            self._departments.append(department)
+        return code
+
+    def _grow(self):
+        capacity = min(self.max_rows, 2 * len(self._columns['id']))
+        for name, values in self._columns.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            self._columns[name] = grown
+
+    def upsert(self, arrays: EmployeeArrays):
+        """Insert or overwrite rows (arrays read with SNAPSHOT_COLUMNS)"""
+
+        with self._lock:
+            if not self.ready:
+                return
+            departments = arrays.department_names().tolist()
+            for i, employee_id in enumerate(arrays['id'].tolist()):
+                row = self._rows.get(employee_id)
+                if row is None:
+                    if self.size == len(self._columns['id']):
+                        if self.size >= self.max_rows:
+                            # Over the bound: stop serving rather than serve partial data
+                            self.ready = False
+                            print(f"Warning: workforce snapshot is full ({self.max_rows} rows); "
+                                  f"analytics use SQL until the next rebuild")
+                            return
+                        self._grow()
+                    row = self._rows[employee_id] = self.size
+                    self.size += 1
+                for name in SNAPSHOT_COLUMNS:
+                    if name == 'department':
+                        self._columns[name][row] = self._code(departments[i])
+                    else:
+                        self._columns[name][row] = arrays[name][i]
+            self.version += 1
+
+    def remove(self, employee_ids: Iterable[int]):
+        with self._lock:
+            if not self.ready:
+                return
+            for employee_id in employee_ids:
+                row = self._rows.pop(employee_id, None)
+                if row is None:
+                    continue
+                last = self.size - 1
+                if row != last:
+                    for values in self._columns.values():
+                        values[row] = values[last]
+                    self._rows[int(self._columns['id'][row])] = row
+                self.size = last
+            self.version += 1
+
+    def set_prediction(self, employee_id: int, probability: float, performance: float):
+        with self._lock:
+            row = self._rows.get(employee_id)
+            if not self.ready or row is None:
+                return
+            self._columns['attrition_probability'][row] = probability
+            self._columns['performance_prediction'][row] = performance
+            self._columns['performance_score'][row] = performance
+            self.version += 1
+
+    def reload(self, employee_ids: Iterable[int], bind=engine):
+        """Re-read employees by primary key: active ones are upserted, others removed"""
+
+        employee_ids = list(employee_ids)
+        if not self.ready or not employee_ids:
+            return
+        with bind.connect() as conn:
+            arrays = read_employee_arrays(conn, SNAPSHOT_COLUMNS + ('is_active',),
+                                          (Employee.id.in_(employee_ids),))
+        active = arrays['is_active']
+        with self._lock:
+            self.upsert(arrays.take(active))
+            self.remove(set(employee_ids) - set(arrays['id'][active].tolist()))
+
+    def _on_event(self, event: Dict):
+        data = event['data']
+        with self._lock:
+            if self._building:
+                self._touched.update(
+                    data['employee_ids'] if data.get('employee_ids') is not None
+                    else [data['employee_id']] if 'employee_id' in data else []
+                )
+        try:
+            if event['type'] in ('employee.created', 'employee.updated'):
+                self.reload([data['employee_id']])
+            elif event['type'] == 'employee.deleted':
+                self.remove([data['employee_id']])
+            elif event['type'] == 'prediction.updated':
+                self.set_prediction(data['employee_id'], data['attrition_probability'],
+                                    data['performance_prediction'])
+            elif event['type'] == 'prediction.batch':
+                if data.get('employee_ids') is not None:
+                    self.reload(data['employee_ids'])
+                else:
+                    self.build()
+        except Exception as e:
+            # A missed update is repaired by the next rebuild
+            self.last_error = str(e)
+            print(f"Warning: workforce snapshot update failed: {str(e)}")
+
+    # Reading
+
+    def compute(self, key, fn: Callable[[EmployeeArrays], object]):
+        """fn(current rows), cached until the next change; None when not ready"""
+
+        computed = self.compute_versioned(key, fn)
+        return None if computed is None else computed[2]
+
+    def compute_versioned(self, key, fn: Callable[[EmployeeArrays], object]):
+        """(epoch, version, fn(current rows)) for callers that tag results with the version.
+
+        fn runs on a copy of the rows taken under the lock, so the write
+        hooks (called on the event loop) never wait for it. The result is
+        cached only if no change landed meanwhile.
+        """
+
+        with self._lock:
+            if not self.ready:
+                return None
+            epoch, version = self.epoch, self.version
+            cached = self._cache.get(key)
+            if cached is not None and cached[:2] == (epoch, version):
+                self._cache.move_to_end(key)
+                return cached
+            view = EmployeeArrays({name: values[:self.size].copy() for name, values in self._columns.items()},
+                                  list(self._departments))
+
+        computed = (epoch, version, fn(view))
+        with self._lock:
+            if (self.epoch, self.version) == (epoch, version):
+                # Results from older versions can never be served again
+                for stale in [k for k, c in self._cache.items() if c[:2] != (epoch, version)]:
+                    del self._cache[stale]
+                self._cache[key] = computed
+                self._cache.move_to_end(key)
+                while len(self._cache) > CACHE_ENTRIES:
+                    self._cache.popitem(last=False)
+        return computed
+
+    def memory_bytes(self) -> Dict:
+        arrays = sum(values.nbytes for values in self._columns.values())
+        # Dict table plus one int key per row (values are small cached ints)
+        index = sys.getsizeof(self._rows) + 28 * len(self._rows)
+        return {'arrays': arrays, 'index': index, 'total': arrays + index}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': settings.SNAPSHOT_ENABLED,
+                'ready': self.ready,
+                'version': self.version,
+                'epoch': self.epoch,
+                'cached_results': len(self._cache),
+                'rows': self.size,
+                'capacity': len(self._columns['id']) if self._columns else 0,
+                'max_rows': self.max_rows,
+                'departments': len(self._departments),
+                'memory_bytes': self.memory_bytes(),
+                'built_at': self.built_at,
+                'build_seconds': self.build_seconds,
+                'refresh_seconds': self.refresh_seconds,
+                'last_error': self.last_error
+            }
+
+    # Lifecycle
+
+    def start(self):
+        if self._thread is not None:
+            return
+        event_bus.add_listener(self._on_event)
+        self._thread = threading.Thread(target=self._run, name="workforce-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # Built off the startup path; until then analytics use SQL
+        while True:
+            try:
+                first = self.version == 0
+                if self.build() and first:
+                    print(f"✓ Workforce snapshot built: {self.size} employees, "
+                          f"{self.memory_bytes()['total'] / 2**20:.1f}MB in {self.build_seconds:.2f}s")
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Warning: could not build workforce snapshot: {str(e)}")
+            if self._stop.wait(self.refresh_seconds):
+                return
+
+# Singleton instance
+_snapshot = None
+
+def get_workforce_snapshot() -> WorkforceSnapshot:
+    """Get or create the workforce snapshot"""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = WorkforceSnapshot(settings.SNAPSHOT_MAX_ROWS, settings.SNAPSHOT_REFRESH_SECONDS)
+    return _snapshot
@@ -0,0 +1,177 @@
+import math
+import os
+import time
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+from app.ml.columnar import ColumnarTable, is_columnar
+from app.ml.compact import compact_model_dir
+from app.ml.drift import FeatureHistograms, bin_edges, save_reference
+from app.ml.train_model import FEATURE_COLUMNS, MODEL_DIR, columnar_encoder, read_columnar_rows
+
+# Every 5th row is held out for evaluation, the same 20% train_models uses
+HOLDOUT_MODULUS = 5
+
+def _is_holdout(rows):
+    return rows % HOLDOUT_MODULUS == 0
+
+def _training_sample(rng, n_rows, size):
+    """Uniform sample of at most `size` distinct training rows, sorted so memmap reads stay sequential.
+
+    Row numbers are drawn with replacement and then deduplicated, which
+    keeps memory O(size) instead of O(n_rows), as a permutation of the
+    whole dataset would need. The sample has no duplicate rows; drawing
+    30% extra makes up for the duplicates and holdout rows dropped.
+    """
+    rows = np.unique(rng.integers(0, n_rows, int(size * 1.3)))
+    rows = rows[~_is_holdout(rows)]
+    if len(rows) > size:
+        rows = np.sort(rng.choice(rows, size, replace=False))
+    return rows
+
+def _merge_forests(forests):
+    """Combine independently trained forests into a single ensemble"""
+    merged = forests[0]
+    merged.estimators_ = [tree for forest in forests for tree in forest.estimators_]
+    merged.n_estimators = len(merged.estimators_)
+    return merged
+
+def train_models_incremental(data_path, model_dir=MODEL_DIR, chunk_size=100_000,
+                             n_estimators=100, trees_per_chunk=10, eval_size=200_000,
+                             random_state=42, compact=False):
+    """Train attrition and performance models out-of-core.
+
+    Memory is bounded by chunk_size rather than dataset size:
+
+    1. The scaler is fitted with partial_fit over sequential chunks.
+    2. Each chunk is a uniform random sample of training rows, read from
+       the memory-mapped columns. A small forest is fitted per chunk for
+       each target, and the per-chunk trees are merged into one
+       RandomForestClassifier and one RandomForestRegressor. Both load
+       in MLPredictor unchanged.
+    3. Metrics are accumulated over the held-out rows chunk by chunk.
+
+    Gradient boosting cannot be merged across chunks, so the performance
+    model becomes a bagged regression forest in this mode. With
+    compact=True the merged forests are compacted afterwards.
+    """
+
+    if not is_columnar(data_path):
+        raise ValueError(
+            "Incremental training needs random access to a columnar dataset; "
+            "create one with generate_data --format columnar or export_data"
+        )
+
+    table = ColumnarTable(data_path)
+    n_rows = table.rows
+    le_dept, dept_remap = columnar_encoder(table)
+    rng = np.random.default_rng(random_state)
+
+    print(f"Dataset rows: {n_rows}, chunk size: {chunk_size}")
+
+    # ========== SCALER ==========
+    start = time.perf_counter()
+    scaler = StandardScaler()
+    for offset in range(0, n_rows, chunk_size):
+        rows = slice(offset, min(offset + chunk_size, n_rows))
+        X, _, _ = read_columnar_rows(table, rows, dept_remap)
+        scaler.partial_fit(X[~_is_holdout(np.arange(rows.start, rows.stop))])
+    print(f"✓ Scaler fitted in {time.perf_counter() - start:.2f}s")
+
+    # ========== MODELS ==========
+    print("\n" + "="*50)
+    print("Training Models Incrementally")
+    print("="*50)
+
+    classifiers = []
+    regressors = []
+    n_chunks = math.ceil(n_estimators / trees_per_chunk)
+    for chunk in range(n_chunks):
+        start = time.perf_counter()
+        rows = _training_sample(rng, n_rows, chunk_size)
+        X, y_attrition, y_performance = read_columnar_rows(table, rows, dept_remap)
+        X_scaled = scaler.transform(X)
+        if chunk == 0:
+            # Drift reference: edges from the first sample, counts from every sample
+            reference = FeatureHistograms([bin_edges(X[:, j]) for j in range(X.shape[1])])
+        reference.observe(X)
+        trees = min(trees_per_chunk, n_estimators - chunk * trees_per_chunk)
+
+        # Chunks missing a class would produce trees with a different output shape
+        if len(np.unique(y_attrition)) == 2:
+            classifiers.append(RandomForestClassifier(
+                n_estimators=trees,
+                max_depth=10,
+                min_samples_split=5,
+                min_samples_leaf=2,
+                random_state=random_state + chunk,
+                n_jobs=-1
+            ).fit(X_scaled, y_attrition))
+
+        regressors.append(RandomForestRegressor(
+            n_estimators=trees,
+            max_depth=12,
+            min_samples_leaf=2,
+            random_state=random_state + chunk,
+            n_jobs=-1
+        ).fit(X_scaled, y_performance))
+
+        print(f"Chunk {chunk + 1}/{n_chunks}: {len(rows)} rows, "
+              f"{time.perf_counter() - start:.2f}s")
+
+    if not classifiers:
+        raise ValueError("No chunk contained both attrition classes")
+
+    attrition_model = _merge_forests(classifiers)
+    performance_model = _merge_forests(regressors)
+
+    # ========== EVALUATION ==========
+    holdout = np.arange(0, n_rows, HOLDOUT_MODULUS)
+    if len(holdout) > eval_size:
+        holdout = holdout[np.linspace(0, len(holdout) - 1, eval_size).astype(np.int64)]
+
+    correct = 0
+    squared_error = 0.0
+    target_sum = 0.0
+    target_square_sum = 0.0
+    for offset in range(0, len(holdout), chunk_size):
+        rows = holdout[offset:offset + chunk_size]
+        X, y_attrition, y_performance = read_columnar_rows(table, rows, dept_remap)
+        X_scaled = scaler.transform(X)
+
+        correct += int((attrition_model.predict(X_scaled) == y_attrition).sum())
+        squared_error += float(((performance_model.predict(X_scaled) - y_performance) ** 2).sum())
+        target_sum += float(y_performance.sum())
+        target_square_sum += float((y_performance ** 2).sum())
+
+    n_eval = len(holdout)
+    accuracy = correct / n_eval
+    rmse = math.sqrt(squared_error / n_eval)
+    total_variance = target_square_sum - target_sum ** 2 / n_eval
+    r2 = 1 - squared_error / total_variance if total_variance > 0 else 0.0
+
+    print(f"\nAttrition Model Accuracy: {accuracy:.4f} ({len(attrition_model.estimators_)} trees)")
+    print(f"Performance Model RMSE: {rmse:.4f}")
+    print(f"Performance Model R² Score: {r2:.4f}")
+
+    # Same artifact layout as train_models
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(attrition_model, f'{model_dir}/attrition_model.pkl')
+    joblib.dump(scaler, f'{model_dir}/attrition_scaler.pkl')
+    joblib.dump(le_dept, f'{model_dir}/label_encoder.pkl')
+    joblib.dump(performance_model, f'{model_dir}/performance_model.pkl')
+    joblib.dump(scaler, f'{model_dir}/performance_scaler.pkl')
+    save_reference(model_dir, reference, FEATURE_COLUMNS + ['department_encoded'])
+
+    print("\n✓ Models saved")
+
+    if compact:
+        X, _, _ = read_columnar_rows(table, holdout[:chunk_size], dept_remap)
+        compact_model_dir(model_dir, X)
+
+    return {
+        'attrition_accuracy': accuracy,
+        'performance_rmse': rmse,
+        'performance_r2': r2
+    }
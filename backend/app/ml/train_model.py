@@ -1,44 +1,149 @@
+import argparse
+import time
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
+from sklearn.ensemble import (
+    RandomForestClassifier,
+    GradientBoostingRegressor,
+    HistGradientBoostingClassifier,
+    HistGradientBoostingRegressor
+)
+from sklearn.linear_model import LogisticRegression, Ridge
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.metrics import accuracy_score, classification_report, mean_squared_error, r2_score
 import joblib
 import os
+from app.ml.columnar import ColumnarTable, is_columnar
+from app.ml.compact import compact_model_dir
+from app.ml.drift import reference_histograms, save_reference
+from app.ml.registry import MODEL_DIR, new_candidate_dir, profile_dir, promote
 
-def train_models():
-    """Train attrition and performance prediction models"""
+DATA_PATH = 'app/ml/employee_data.csv'
+DB_SOURCE = 'db'
+
+# Feature order must match MLPredictor.prepare_features
+FEATURE_COLUMNS = [
+    'age', 'experience', 'salary', 'satisfaction_level',
+    'last_evaluation_score', 'project_count', 'work_hours'
+]
+
+def columnar_encoder(table):
+    """Fit the department encoder from a columnar dataset's dictionary.
+
+    Returns the encoder and an array mapping dictionary codes to encoded
+    values, so departments are never parsed per row.
+    """
+    departments = np.asarray(table.dictionary('department'))
+    le_dept = LabelEncoder().fit(departments)
+    return le_dept, le_dept.transform(departments)
+
+def read_columnar_rows(table, rows, dept_remap):
+    """Read X and both targets for `rows` (a slice or sorted index array)"""
+
+    first = table.codes(FEATURE_COLUMNS[0])[rows]
+    X = np.empty((len(first), len(FEATURE_COLUMNS) + 1))
+    X[:, 0] = first
+    for i, name in enumerate(FEATURE_COLUMNS[1:], start=1):
+        X[:, i] = table.codes(name)[rows]
+    X[:, -1] = dept_remap[table.codes('department')[rows]]
+
+    attrition_values = table.dictionary('attrition')
+    if 'Y' in attrition_values:
+        y_attrition = (table.codes('attrition')[rows] == attrition_values.index('Y')).astype(int)
+    else:
+        y_attrition = np.zeros(len(X), dtype=int)
+    y_performance = np.asarray(table.codes('performance_score')[rows], dtype=np.float64)
+
+    return X, y_attrition, y_performance
+
+def load_training_data(data_path=DATA_PATH):
+    """Load the feature matrix and both targets from CSV, a columnar
+    dataset, or the live database (data_path='db').
+
+    Returns (X, y_attrition, y_performance, department_encoder). The last
+    column of X is the encoded department.
+    """
+
+    if data_path == DB_SOURCE:
+        # Imported lazily so file-based training needs no database settings
+        from app.ml.db_source import load_training_arrays
+        return load_training_arrays()
+
+    if is_columnar(data_path):
+        # Only the needed columns are mapped; numeric columns are read
+        # straight from the .npy files and departments are never parsed
+        table = ColumnarTable(data_path)
+        le_dept, dept_remap = columnar_encoder(table)
+        X, y_attrition, y_performance = read_columnar_rows(table, slice(None), dept_remap)
+    else:
+        df = pd.read_csv(
+            data_path,
+            usecols=FEATURE_COLUMNS + ['department', 'attrition', 'performance_score']
+        )
+
+        # Encode department
+        le_dept = LabelEncoder()
+        X = np.column_stack([
+            df[FEATURE_COLUMNS].to_numpy(dtype=np.float64),
+            le_dept.fit_transform(df['department'])
+        ])
+        y_attrition = (df['attrition'] == 'Y').astype(int).to_numpy()
+        y_performance = df['performance_score'].to_numpy(dtype=np.float64)
+
+    return X, y_attrition, y_performance, le_dept
+
+# Lighter alternatives to the full RandomForest/GradientBoosting pair,
+# as (attrition classifier, performance regressor) factories
+LIGHT_PROFILES = {
+    'hist': (
+        lambda: HistGradientBoostingClassifier(max_iter=100, max_depth=6, random_state=42),
+        lambda: HistGradientBoostingRegressor(max_iter=100, max_depth=6, random_state=42)
+    ),
+    'linear': (
+        lambda: LogisticRegression(max_iter=1000),
+        lambda: Ridge(alpha=1.0)
+    )
+}
+
+def holdout_split(y_attrition):
+    """Stratified 80/20 split of row indices, deterministic for given labels"""
+    return train_test_split(
+        np.arange(len(y_attrition)), test_size=0.2, random_state=42, stratify=y_attrition
+    )
+
+def train_models(data_path=DATA_PATH, model_dir=MODEL_DIR, profiles=tuple(LIGHT_PROFILES),
+                 compact=False, data=None, split=None):
+    """Train attrition and performance prediction models.
+
+    `data` (load_training_data's result) and `split` ((train, test) row
+    indices) let a caller that evaluates the models afterwards train on
+    exactly the rows it read, instead of a second read of data_path.
+
+    With compact=True the saved tree ensembles are converted to
+    CompactForests once the holdout rows confirm identical predictions.
+    That shrinks the artifacts and worker memory, but scikit-learn scores
+    large batches about 2.4x faster, so it is off by default.
+    """
     
     # Load data
-    df = pd.read_csv('app/ml/employee_data.csv')
+    start = time.perf_counter()
+    X, y_attrition, y_performance, le_dept = data if data is not None else load_training_data(data_path)
     
-    print("Dataset shape:", df.shape)
-    print("\nColumns:", df.columns.tolist())
+    print(f"Loaded {data_path} in {time.perf_counter() - start:.2f}s")
+    print("Dataset shape:", X.shape)
     
-    # Prepare features
-    feature_columns = [
-        'age', 'experience', 'salary', 'satisfaction_level',
-        'last_evaluation_score', 'project_count', 'work_hours'
-    ]
-    
-    # Encode department
-    le_dept = LabelEncoder()
-    df['department_encoded'] = le_dept.fit_transform(df['department'])
-    feature_columns.append('department_encoded')
-    
-    X = df[feature_columns]
+    feature_columns = FEATURE_COLUMNS + ['department_encoded']
     
     # ========== ATTRITION MODEL ==========
     print("\n" + "="*50)
     print("Training Attrition Prediction Model")
     print("="*50)
     
-    y_attrition = (df['attrition'] == 'Y').astype(int)
-    
-    X_train_attr, X_test_attr, y_train_attr, y_test_attr = train_test_split(
-        X, y_attrition, test_size=0.2, random_state=42, stratify=y_attrition
-    )
+    # One split for both models, so a holdout evaluation is leak-free for each
+    train_index, test_index = split if split is not None else holdout_split(y_attrition)
+    X_train_attr, X_test_attr = X[train_index], X[test_index]
+    y_train_attr, y_test_attr = y_attrition[train_index], y_attrition[test_index]
     
     # Scale features
     scaler_attr = StandardScaler()
@@ -76,10 +181,11 @@ def train_models():
     print(feature_importance_attr.head())
     
     # Save attrition model and scaler
-    os.makedirs('app/ml/models', exist_ok=True)
-    joblib.dump(attrition_model, 'app/ml/models/attrition_model.pkl')
-    joblib.dump(scaler_attr, 'app/ml/models/attrition_scaler.pkl')
-    joblib.dump(le_dept, 'app/ml/models/label_encoder.pkl')
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(attrition_model, f'{model_dir}/attrition_model.pkl')
+    joblib.dump(scaler_attr, f'{model_dir}/attrition_scaler.pkl')
+    joblib.dump(le_dept, f'{model_dir}/label_encoder.pkl')
+    save_reference(model_dir, reference_histograms(X_train_attr), feature_columns)
     
     print("\n✓ Attrition model saved")
     
@@ -88,11 +194,8 @@ def train_models():
     print("Training Performance Prediction Model")
     print("="*50)
     
-    y_performance = df['performance_score']
-    
-    X_train_perf, X_test_perf, y_train_perf, y_test_perf = train_test_split(
-        X, y_performance, test_size=0.2, random_state=42
-    )
+    X_train_perf, X_test_perf = X[train_index], X[test_index]
+    y_train_perf, y_test_perf = y_performance[train_index], y_performance[test_index]
     
     # Scale features
     scaler_perf = StandardScaler()
@@ -128,11 +231,46 @@ def train_models():
     print(feature_importance_perf.head())
     
     # Save performance model and scaler
-    joblib.dump(performance_model, 'app/ml/models/performance_model.pkl')
-    joblib.dump(scaler_perf, 'app/ml/models/performance_scaler.pkl')
+    joblib.dump(performance_model, f'{model_dir}/performance_model.pkl')
+    joblib.dump(scaler_perf, f'{model_dir}/performance_scaler.pkl')
     
     print("\n✓ Performance model saved")
     
+    # ========== LIGHT PROFILES ==========
+    # Same split and scalers as the full models, so metrics are comparable
+    profile_metrics = {}
+    for profile in profiles:
+        print("\n" + "="*50)
+        print(f"Training '{profile}' Profile")
+        print("="*50)
+        
+        make_classifier, make_regressor = LIGHT_PROFILES[profile]
+        classifier = make_classifier().fit(X_train_attr_scaled, y_train_attr)
+        regressor = make_regressor().fit(X_train_perf_scaled, y_train_perf)
+        
+        profile_accuracy = accuracy_score(y_test_attr, classifier.predict(X_test_attr_scaled))
+        profile_rmse = np.sqrt(mean_squared_error(y_test_perf, regressor.predict(X_test_perf_scaled)))
+        profile_metrics[profile] = {
+            'attrition_accuracy': profile_accuracy,
+            'performance_rmse': profile_rmse
+        }
+        
+        print(f"Attrition Accuracy: {profile_accuracy:.4f}")
+        print(f"Performance RMSE: {profile_rmse:.4f}")
+        
+        output_dir = profile_dir(model_dir, profile)
+        os.makedirs(output_dir, exist_ok=True)
+        joblib.dump(classifier, f'{output_dir}/attrition_model.pkl')
+        joblib.dump(regressor, f'{output_dir}/performance_model.pkl')
+        
+        print(f"✓ '{profile}' profile saved")
+    
+    if compact:
+        print("\n" + "="*50)
+        print("Compacting Models")
+        print("="*50)
+        compact_model_dir(model_dir, X[test_index])
+    
     print("\n" + "="*50)
     print("Model training completed successfully!")
     print("="*50)
@@ -140,12 +278,39 @@ def train_models():
     return {
         'attrition_accuracy': accuracy,
         'performance_rmse': rmse,
-        'performance_r2': r2
+        'performance_r2': r2,
+        'profiles': profile_metrics
     }
 
 if __name__ == "__main__":
-    metrics = train_models()
+    parser = argparse.ArgumentParser(description="Train attrition and performance models")
+    parser.add_argument('--data', default=DATA_PATH,
+                        help="CSV file, columnar dataset directory, or 'db' for the live database")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--mode', choices=['memory', 'incremental'], default='memory',
+                        help="incremental trains out-of-core from a columnar dataset")
+    parser.add_argument('--chunk-size', type=int, default=100_000,
+                        help="Rows per chunk in incremental mode")
+    parser.add_argument('--compact', action='store_true',
+                        help="Compact the tree ensembles: smaller artifacts and workers, "
+                             "slower batch scoring")
+    parser.add_argument('--promote', action='store_true',
+                        help="Publish as a new model version that running workers pick up")
+    args = parser.parse_args()
+
+    if args.promote:
+        args.model_dir = new_candidate_dir()
+
+    if args.mode == 'incremental':
+        from app.ml.train_incremental import train_models_incremental
+        metrics = train_models_incremental(args.data, args.model_dir, chunk_size=args.chunk_size,
+                                           compact=args.compact)
+    else:
+        metrics = train_models(args.data, args.model_dir, compact=args.compact)
     print("\nFinal Metrics:")
     print(f"Attrition Accuracy: {metrics['attrition_accuracy']:.4f}")
     print(f"Performance RMSE: {metrics['performance_rmse']:.4f}")
-    print(f"Performance R²: {metrics['performance_r2']:.4f}")
\ No newline at end of file
+    print(f"Performance R²: {metrics['performance_r2']:.4f}")
+
+    if args.promote:
+        print(f"\n✓ Promoted model version {promote(args.model_dir)}")
\ No newline at end of file
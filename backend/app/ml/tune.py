@@ -0,0 +1,287 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
+from sklearn.metrics import accuracy_score, mean_squared_error
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+from app.ml.train_model import DATA_PATH, load_training_data
+
+CACHE_DIR = 'app/ml/cache/tune'
+REPORT_PATH = 'app/ml/tuning_report.jsonl'
+
+# Search space per model, starting from the values train_models hardcodes
+SEARCH_SPACE = {
+    'attrition': {
+        'estimator': RandomForestClassifier,
+        'fixed': {'min_samples_split': 5, 'random_state': 42, 'n_jobs': 1},
+        'grid': {
+            'n_estimators': [50, 100, 200],
+            'max_depth': [6, 10, 14],
+            'min_samples_leaf': [1, 2, 4]
+        }
+    },
+    'performance': {
+        'estimator': GradientBoostingRegressor,
+        'fixed': {'random_state': 42},
+        'grid': {
+            'n_estimators': [100, 200],
+            'max_depth': [3, 5, 7],
+            'learning_rate': [0.05, 0.1]
+        }
+    }
+}
+
+LATENCY_REPEATS = 50
+
+def candidates():
+    """Yield (model, params) for every grid point"""
+    for model, space in SEARCH_SPACE.items():
+        names = list(space['grid'])
+        for values in itertools.product(*(space['grid'][name] for name in names)):
+            yield model, dict(zip(names, values))
+
+def candidate_key(model, params, fold, folds_id):
+    """Resume key; folds_id names the data, fold count and seed the folds were cut from"""
+    return f"{folds_id}:{model}:{json.dumps(params, sort_keys=True)}:{fold}"
+
+def source_signature(data_path):
+    """Digest of the data files' paths, sizes and modification times; None for the database"""
+
+    if not os.path.exists(data_path):
+        return None
+    if os.path.isfile(data_path):
+        paths = [data_path]
+    else:
+        paths = sorted(os.path.join(root, name) for root, _, names in os.walk(data_path) for name in names)
+    digest = hashlib.sha1(os.path.abspath(data_path).encode())
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.relpath(path, data_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+def _load_sources(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'sources.json')) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _save_source(cache_dir, source_key, fold_dir):
+    sources = _load_sources(cache_dir)
+    sources[source_key] = os.path.basename(fold_dir)
+    tmp_path = os.path.join(cache_dir, 'sources.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(sources, f)
+    os.replace(tmp_path, os.path.join(cache_dir, 'sources.json'))
+
+def prepare_folds(data_path, n_folds, seed, cache_dir=CACHE_DIR):
+    """Split the data into folds and cache the scaled matrices per fold.
+
+    The cache directory is keyed by a digest of the data, fold count and
+    seed. For a CSV or columnar dataset, the files' sizes and
+    modification times are also mapped to that directory, so a re-run on
+    unchanged files (or a resumed search) skips loading and scaling. The
+    database is always read and digested. Fold matrices are plain .npy
+    files that workers memory-map, so all processes share one copy
+    through the page cache.
+    """
+
+    signature = source_signature(data_path)
+    source_key = f"{signature}:{n_folds}:{seed}" if signature else None
+    if source_key:
+        cached = _load_sources(cache_dir).get(source_key)
+        if cached and os.path.exists(os.path.join(cache_dir, cached, 'done')):
+            fold_dir = os.path.join(cache_dir, cached)
+            print(f"✓ Using cached folds in {fold_dir}")
+            return fold_dir
+
+    X, y_attrition, y_performance, _ = load_training_data(data_path)
+
+    digest = hashlib.sha1()
+    for array in (X, y_attrition, y_performance):
+        digest.update(np.ascontiguousarray(array).data)
+    digest.update(f"{n_folds}:{seed}".encode())
+    fold_dir = os.path.join(cache_dir, digest.hexdigest()[:16])
+
+    if os.path.exists(os.path.join(fold_dir, 'done')):
+        if source_key:
+            _save_source(cache_dir, source_key, fold_dir)
+        print(f"✓ Using cached folds in {fold_dir}")
+        return fold_dir
+
+    os.makedirs(fold_dir, exist_ok=True)
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    for fold, (train_index, test_index) in enumerate(splitter.split(X, y_attrition)):
+        scaler = StandardScaler()
+        arrays = {
+            'X_train': scaler.fit_transform(X[train_index]),
+            'X_test': scaler.transform(X[test_index]),
+            'y_attrition_train': y_attrition[train_index],
+            'y_attrition_test': y_attrition[test_index],
+            'y_performance_train': y_performance[train_index],
+            'y_performance_test': y_performance[test_index]
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(fold_dir, f'fold{fold}_{name}.npy'), array)
+
+    # Written last so an interrupted split is redone rather than trusted
+    open(os.path.join(fold_dir, 'done'), 'w').close()
+    if source_key:
+        _save_source(cache_dir, source_key, fold_dir)
+    print(f"✓ Cached {n_folds} folds in {fold_dir}")
+    return fold_dir
+
+def _load_fold(fold_dir, fold, name):
+    return np.load(os.path.join(fold_dir, f'fold{fold}_{name}.npy'), mmap_mode='r')
+
+def run_task(fold_dir, model, params, fold):
+    """Fit and evaluate one candidate on one fold (runs in a worker process)"""
+
+    space = SEARCH_SPACE[model]
+    X_train = _load_fold(fold_dir, fold, 'X_train')
+    X_test = _load_fold(fold_dir, fold, 'X_test')
+    y_train = _load_fold(fold_dir, fold, f'y_{model}_train')
+    y_test = _load_fold(fold_dir, fold, f'y_{model}_test')
+
+    folds_id = os.path.basename(fold_dir)
+    estimator = space['estimator'](**params, **space['fixed'])
+
+    task_start = start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    y_pred = estimator.predict(X_test)
+    record = {
+        'key': candidate_key(model, params, fold, folds_id),
+        'folds_id': folds_id,
+        'model': model,
+        'params': params,
+        'fold': fold,
+        'fit_seconds': fit_seconds
+    }
+    if model == 'attrition':
+        record['accuracy'] = float(accuracy_score(y_test, y_pred))
+    else:
+        record['rmse'] = float(np.sqrt(mean_squared_error(y_test, y_pred)))
+
+    # Single-row latency is what a prediction request pays
+    row = np.array(X_test[:1])
+    timings = []
+    for _ in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        estimator.predict(row)
+        timings.append(time.perf_counter() - start)
+    record['latency_ms'] = float(np.median(timings) * 1000)
+    record['wall_seconds'] = time.perf_counter() - task_start
+
+    return record
+
+def load_report(report_path, folds_id):
+    """Completed task records from a previous (possibly interrupted) run on the same folds.
+
+    Records from runs on other data, fold counts or seeds stay in the
+    report but are neither resumed nor summarized.
+    """
+    records = {}
+    if os.path.exists(report_path):
+        with open(report_path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    record = json.loads(line)
+                    if record.get('folds_id') == folds_id:
+                        records[record['key']] = record
+    return records
+
+def summarize(records):
+    """Aggregate fold records per candidate, best first within each model"""
+
+    grouped = {}
+    for record in records:
+        key = (record['model'], json.dumps(record['params'], sort_keys=True))
+        grouped.setdefault(key, []).append(record)
+
+    summary = []
+    for (model, params), folds in grouped.items():
+        metric = 'accuracy' if model == 'attrition' else 'rmse'
+        scores = [r[metric] for r in folds]
+        summary.append({
+            'model': model,
+            'params': json.loads(params),
+            'folds': len(folds),
+            metric: float(np.mean(scores)),
+            f'{metric}_std': float(np.std(scores)),
+            'fit_seconds': float(sum(r['fit_seconds'] for r in folds)),
+            'wall_seconds': float(sum(r['wall_seconds'] for r in folds)),
+            'latency_ms': float(np.median([r['latency_ms'] for r in folds]))
+        })
+
+    summary.sort(key=lambda s: (s['model'], -s.get('accuracy', 0), s.get('rmse', 0)))
+    return summary
+
+def tune(data_path=DATA_PATH, n_folds=5, workers=None, seed=42,
+         cache_dir=CACHE_DIR, report_path=REPORT_PATH):
+    """Cross-validated grid search on a process pool; resumes from report_path"""
+
+    workers = workers or os.cpu_count()
+    fold_dir = prepare_folds(data_path, n_folds, seed, cache_dir)
+
+    folds_id = os.path.basename(fold_dir)
+    done = load_report(report_path, folds_id)
+    tasks = [
+        (model, params, fold)
+        for model, params in candidates()
+        for fold in range(n_folds)
+        if candidate_key(model, params, fold, folds_id) not in done
+    ]
+    print(f"{len(done)} tasks already done, {len(tasks)} to run on {workers} workers")
+
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor, open(report_path, 'a') as report:
+        futures = [executor.submit(run_task, fold_dir, *task) for task in tasks]
+        for i, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            done[record['key']] = record
+
+            # One line per finished task, flushed so an interrupted search resumes here
+            report.write(json.dumps(record) + "\n")
+            report.flush()
+
+            metric = f"accuracy={record['accuracy']:.4f}" if 'accuracy' in record else f"rmse={record['rmse']:.4f}"
+            print(f"[{i}/{len(tasks)}] {record['model']} fold {record['fold']} {record['params']} {metric}")
+
+    print(f"\nSearch wall time: {time.perf_counter() - start:.1f}s")
+
+    summary = summarize(done.values())
+    summary_path = os.path.splitext(report_path)[0] + '_summary.json'
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"✓ Summary written to {summary_path}")
+
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel cross-validated hyperparameter search")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None, help="Defaults to all cores")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--report', default=REPORT_PATH)
+    args = parser.parse_args()
+
+    summary = tune(args.data, args.folds, args.workers, args.seed, args.cache_dir, args.report)
+
+    for model in SEARCH_SPACE:
+        best = next(s for s in summary if s['model'] == model)
+        metric = 'accuracy' if model == 'attrition' else 'rmse'
+        print(f"\nBest {model}: {best['params']}")
+        print(f"  {metric}: {best[metric]:.4f} ± {best[f'{metric}_std']:.4f}, "
+              f"fit {best['fit_seconds']:.1f}s, latency {best['latency_ms']:.2f}ms")
@@ -0,0 +1,81 @@
+import glob
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+def write_json(path: str, data: Dict):
+    """Replace a JSON file atomically, so readers never see a partial write"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def read_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by another user
+    return True
+
+class WorkerStatsFiles:
+    """One JSON statistics file per server process in a shared directory.
+
+    Each worker publishes its own state as <pid>.json; whichever worker
+    answers a request adds up the others' files. Files of processes that
+    exited, or not rewritten for max_age seconds (a worker that hung, or a
+    pid reused after a restart), are removed when read.
+    """
+
+    def __init__(self, directory: str, max_age: float):
+        self.directory = directory
+        self.max_age = max_age
+
+    @property
+    def own_path(self) -> str:
+        return os.path.join(self.directory, f'{os.getpid()}.json')
+
+    def publish(self, state: Dict):
+        os.makedirs(self.directory, exist_ok=True)
+        write_json(self.own_path, state)
+
+    def withdraw(self):
+        """Remove this worker's file, e.g. on shutdown"""
+        try:
+            os.remove(self.own_path)
+        except FileNotFoundError:
+            pass
+
+    def others(self) -> List[Dict]:
+        """Published states of the other live workers"""
+
+        states = []
+        now = time.time()
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            if path == self.own_path:
+                continue
+            try:
+                pid = int(os.path.basename(path)[:-len('.json')])
+                stale = not _pid_alive(pid) or now - os.path.getmtime(path) > self.max_age
+            except (ValueError, OSError):
+                continue
+            if stale:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            state = read_json(path)
+            if state is not None:
+                states.append(state)
+        return states
@@ -1,5 +1,14 @@
 from app.models.employee import Employee
 from app.models.user import User
 from app.models.feedback import Feedback
+from app.models.job import Job
+from app.models.prediction_history import (
+    PredictionHistory,
+    EmployeePredictionDaily,
+    DepartmentPredictionDaily
+)
 
-__all__ = ["Employee", "User", "Feedback"]
\ No newline at end of file
+__all__ = [
+    "Employee", "User", "Feedback", "Job",
+    "PredictionHistory", "EmployeePredictionDaily", "DepartmentPredictionDaily"
+]
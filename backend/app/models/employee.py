@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -24,5 +24,11 @@ class Employee(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Serves "highest attrition risk" queries (per department) straight
+        # from the index, without sorting the table
+        Index('ix_employees_risk', 'is_active', 'department', attrition_probability.desc()),
+    )
+
     def __repr__(self):
         return f"<Employee {self.name}>"
\ No newline at end of file
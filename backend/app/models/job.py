@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)  # e.g. predict.batch
+    status = Column(String(20), nullable=False, default='queued')  # queued, running, succeeded, failed, cancelled
+    priority = Column(Integer, nullable=False, default=0)  # higher runs first
+    payload = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    progress = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=1)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    worker = Column(String(100), nullable=True)  # host:pid/thread running it
+    created_by = Column(Integer, nullable=True)  # User ID
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    run_after = Column(DateTime(timezone=True), nullable=False)  # retries are delayed
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Workers claim the highest-priority, oldest queued job
+    __table_args__ = (
+        Index('ix_jobs_claim', 'status', priority.desc(), 'id'),
+    )
+    
+    def __repr__(self):
+        return f"<Job {self.id} {self.kind} {self.status}>"
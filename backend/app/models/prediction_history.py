@@ -0,0 +1,46 @@
+from sqlalchemy import BigInteger, Column, Integer, String, Float, DateTime, Index
+from app.database import Base
+
+class PredictionHistory(Base):
+    """One row per prediction, appended and never updated.
+
+    `day` (days since 1970-01-01, UTC) duplicates predicted_at as an
+    integer so trends can be bucketed portably. Rows older than the
+    retention window are folded into the daily tables below and deleted.
+    """
+    __tablename__ = "prediction_history"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    employee_id = Column(Integer, nullable=False)  # no foreign key: history outlives employees
+    department = Column(String(50), nullable=False)
+    day = Column(Integer, nullable=False)
+    predicted_at = Column(DateTime(timezone=True), nullable=False)
+    attrition_probability = Column(Float, nullable=False)
+    performance_prediction = Column(Float, nullable=False)
+    model_version = Column(String(32), nullable=True)
+
+    __table_args__ = (
+        Index('ix_prediction_history_employee', 'employee_id', 'predicted_at'),
+        Index('ix_prediction_history_department', 'department', 'predicted_at'),
+    )
+
+class EmployeePredictionDaily(Base):
+    """Compacted history: per employee and day, sums for averaging"""
+    __tablename__ = "prediction_history_employee_daily"
+
+    employee_id = Column(Integer, primary_key=True)
+    day = Column(Integer, primary_key=True)
+    department = Column(String(50), nullable=False)
+    predictions = Column(Integer, nullable=False)
+    attrition_probability_sum = Column(Float, nullable=False)
+    performance_prediction_sum = Column(Float, nullable=False)
+
+class DepartmentPredictionDaily(Base):
+    """Compacted history: per department and day, sums for averaging"""
+    __tablename__ = "prediction_history_department_daily"
+
+    department = Column(String(50), primary_key=True)
+    day = Column(Integer, primary_key=True)
+    predictions = Column(Integer, nullable=False)
+    attrition_probability_sum = Column(Float, nullable=False)
+    performance_prediction_sum = Column(Float, nullable=False)
@@ -1,3 +1,3 @@
-from app.routes import auth, employee, prediction, feedback
+from app.routes import auth, employee, prediction, feedback, events
 
-__all__ = ["auth", "employee", "prediction", "feedback"]
\ No newline at end of file
+__all__ = ["auth", "employee", "prediction", "feedback", "events"]
\ No newline at end of file
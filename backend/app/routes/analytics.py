@@ -0,0 +1,78 @@
+from typing import Callable, Dict
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import engine
+from app.models.employee import Employee
+from app.models.user import User
+from app.ml.analytics import department_analytics
+from app.ml.db_source import EmployeeArrays, load_employee_arrays
+from app.ml.forecast import departure_forecast
+from app.ml.snapshot import SNAPSHOT_COLUMNS, get_workforce_snapshot
+from app.utils.auth import get_current_admin_user
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+def serve_from_snapshot(request: Request, response: Response, key: tuple,
+                        fn: Callable[[EmployeeArrays], Dict]):
+    """fn over the active employees, cached per snapshot version and tagged with it.
+
+    The snapshot's epoch and version are sent as an ETag so clients can
+    revalidate with If-None-Match; the epoch differs between processes
+    and builds, so one worker's version never matches another's data. Without a built snapshot, one columnar read is used
+    and nothing is cached. Blocking (NumPy work and maybe a table read),
+    so routes run it in the threadpool.
+    """
+
+    computed = get_workforce_snapshot().compute_versioned(key, fn)
+    if computed is None:
+        employees = load_employee_arrays(SNAPSHOT_COLUMNS, (Employee.is_active == True,), bind=engine)
+        return {"version": None, **fn(employees)}
+
+    epoch, version, result = computed
+    etag = 'W/"' + "-".join(str(part) for part in (epoch, version, *key)) + '"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return {"version": version, **result}
+
+@router.get("/departments")
+async def get_department_analytics(
+    request: Request,
+    response: Response,
+    bins: int = Query(10, ge=2, le=100),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Per-department salary, performance and satisfaction distributions (Admin only)
+
+    Histograms share their bin edges across departments.
+    """
+
+    return await run_in_threadpool(
+        serve_from_snapshot, request, response, ("departments", bins),
+        lambda employees: department_analytics(employees, bins)
+    )
+
+@router.get("/departures")
+async def get_departure_forecast(
+    request: Request,
+    response: Response,
+    months: int = Query(3, ge=1, le=24),
+    simulations: int = Query(None, ge=100, le=20000),
+    confidence: float = Query(0.9, gt=0, lt=1),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Expected departures per department over the next months, with confidence bands (Admin only)
+
+    Defaults to the next quarter. Recomputed only when the snapshot
+    (and so the predictions) change.
+    """
+
+    simulations = simulations or settings.FORECAST_SIMULATIONS
+    return await run_in_threadpool(
+        serve_from_snapshot, request, response, ("departures", months, simulations, confidence),
+        lambda employees: departure_forecast(
+            employees, months, settings.FORECAST_HORIZON_MONTHS, simulations, confidence
+        )
+    )
@@ -1,17 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
-from typing import List
+from typing import Dict, List, Optional
+from app.config import settings
 from app.database import get_db
 from app.models.employee import Employee
+from app.models.job import Job
 from app.models.user import User
 from app.schemas.employee import (
     EmployeeCreate,
     EmployeeUpdate,
-    EmployeeResponse
+    EmployeeResponse,
+    SimilarEmployee
 )
+from app.schemas.job import JobResponse
 from app.utils.auth import get_current_user, get_current_admin_user, get_password_hash
 from app.utils.dependencies import PaginationParams, FilterParams
+from app.utils.events import event_bus
+from app.utils.jobs import JobContext, get_job_queue, job_handler
+from app.ml.db_source import EmployeeArrays
+from app.ml.export_data import export_employees
+from app.ml.predict import get_predictor
+from app.ml.similar import get_similarity_index
+from app.ml.snapshot import get_workforce_snapshot
 
 router = APIRouter(prefix="/employees", tags=["Employees"])
 
@@ -68,6 +83,12 @@ async def create_employee(
         print(f"Warning: Could not create user account: {str(e)}")
         # Don't fail the employee creation if user creation fails
     
+    event_bus.publish("employee.created", {
+        "employee_id": db_employee.id,
+        "department": db_employee.department,
+        "is_active": db_employee.is_active
+    })
+    
     return db_employee
 
 @router.get("/", response_model=List[EmployeeResponse])
@@ -101,6 +122,41 @@ async def get_employees(
     
     return employees
 
+@job_handler("employees.export", max_attempts=3)
+def run_export(payload: Dict, context: JobContext) -> Dict:
+    """Job: write labelled employees for training to a CSV under EXPORT_DIR"""
+    
+    path = os.path.join(settings.EXPORT_DIR, f"employees_{context.job_id}.csv")
+    rows = export_employees(path, fmt='csv')
+    return {"path": path, "rows": rows}
+
+@router.post("/export", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def export_employees_csv(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Queue a CSV export of employees; download it from /employees/export/{job_id} (Admin only)"""
+    
+    return get_job_queue().enqueue(db, "employees.export", created_by=current_user.id)
+
+@router.get("/export/{job_id}")
+async def download_export(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Download a finished export (Admin only)"""
+    
+    job = db.query(Job).filter(Job.id == job_id, Job.kind == "employees.export").first()
+    if not job or job.status != "succeeded" or not os.path.exists(job.result["path"]):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found or not finished"
+        )
+    
+    return FileResponse(job.result["path"], media_type="text/csv",
+                        filename=os.path.basename(job.result["path"]))
+
 @router.get("/{employee_id}", response_model=EmployeeResponse)
 async def get_employee(
     employee_id: int,
@@ -126,6 +182,55 @@ async def get_employee(
     
     return employee
 
+@router.get("/{employee_id}/similar", response_model=List[SimilarEmployee])
+async def get_similar_employees(
+    employee_id: int,
+    k: int = Query(10, ge=1, le=100),
+    department: Optional[str] = None,
+    active_only: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Employees most similar to this one in the models' feature space (Admin only)"""
+    
+    index = get_similarity_index()
+    if not index.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Similarity index is not built yet"
+        )
+    
+    neighbours = index.neighbours(employee_id, k, department, active_only)
+    if neighbours is None:
+        employee = db.query(Employee).filter(Employee.id == employee_id).first()
+        if not employee:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Employee not found"
+            )
+        if employee.department not in get_predictor().label_encoder.classes_:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Employee's department is unknown to the model; no features to compare"
+            )
+        # Created in another worker or during a build: index it now
+        await run_in_threadpool(index.reload, [employee_id])
+        neighbours = index.neighbours(employee_id, k, department, active_only)
+        if neighbours is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Employee is not in the similarity index yet"
+            )
+    
+    employees = {
+        e.id: e for e in db.query(Employee).filter(Employee.id.in_([i for i, _ in neighbours])).all()
+    }
+    return [
+        {"distance": distance, "employee": employees[i]}
+        for i, distance in neighbours
+        if i in employees
+    ]
+
 @router.put("/{employee_id}", response_model=EmployeeResponse)
 async def update_employee(
     employee_id: int,
@@ -151,6 +256,11 @@ async def update_employee(
     db.commit()
     db.refresh(employee)
     
+    event_bus.publish("employee.updated", {
+        "employee_id": employee_id,
+        "changes": update_data
+    })
+    
     return employee
 
 @router.delete("/{employee_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -178,8 +288,43 @@ async def delete_employee(
     db.delete(employee)
     db.commit()
     
+    event_bus.publish("employee.deleted", {"employee_id": employee_id})
+    
     return None
 
+def snapshot_dashboard(employees: EmployeeArrays) -> Dict:
+    """Dashboard statistics computed from the workforce snapshot (same result as the SQL path)"""
+    
+    probability = employees['attrition_probability']
+    satisfaction = employees['satisfaction_level_raw']
+    performance = employees['performance_score']
+    
+    # Comparisons with NaN (no prediction yet) are False, as NULLs are in SQL
+    with np.errstate(invalid='ignore'):
+        high_risk = int((probability > 0.6).sum())
+        medium_risk = int(((probability >= 0.3) & (probability <= 0.6)).sum())
+        low_risk = int((probability < 0.3).sum())
+    
+    counts = np.bincount(employees['department'], minlength=len(employees.departments))
+    
+    return {
+        "total_employees": len(employees),
+        "attrition_risk": {
+            "high": high_risk,
+            "medium": medium_risk,
+            "low": low_risk
+        },
+        "averages": {
+            "satisfaction": round(float(np.nanmean(satisfaction)), 2) if (~np.isnan(satisfaction)).any() else 0,
+            "performance": round(float(np.nanmean(performance)), 2) if (~np.isnan(performance)).any() else 0
+        },
+        "department_distribution": [
+            {"department": department, "count": int(count)}
+            for department, count in sorted(zip(employees.departments.tolist(), counts.tolist()))
+            if count > 0
+        ]
+    }
+
 @router.get("/stats/dashboard")
 async def get_dashboard_stats(
     db: Session = Depends(get_db),
@@ -187,6 +332,11 @@ async def get_dashboard_stats(
 ):
     """Get dashboard statistics"""
     
+    # Answered from the in-memory snapshot when it is built, otherwise SQL
+    stats = get_workforce_snapshot().compute("dashboard", snapshot_dashboard)
+    if stats is not None:
+        return stats
+    
     total_employees = db.query(Employee).filter(Employee.is_active == True).count()
     
     high_risk = db.query(Employee).filter(
@@ -237,4 +387,20 @@ async def get_dashboard_stats(
             {"department": dept, "count": count}
             for dept, count in dept_stats
         ]
-    }
\ No newline at end of file
+    }
+
+@router.get("/stats/snapshot")
+async def get_snapshot_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Workforce snapshot size, memory use and version (Admin only)"""
+    
+    return get_workforce_snapshot().stats()
+
+@router.get("/stats/similarity")
+async def get_similarity_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Similarity index size, memory use and model version (Admin only)"""
+    
+    return get_similarity_index().stats()
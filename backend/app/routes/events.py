@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.models.user import User
+from app.utils.auth import get_current_stream_admin_user
+from app.utils.events import event_bus, format_sse
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    current_user: User = Depends(get_current_stream_admin_user)
+):
+    """Server-sent event stream of employee, prediction and feedback changes (Admin only)"""
+
+    subscriber = event_bus.subscribe()
+
+    async def event_generator():
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield "retry: 5000\n\n"
+
+            while True:
+                if await request.is_disconnected():
+                    break
+
+                events = await subscriber.get(timeout=settings.EVENT_KEEPALIVE_SECONDS)
+
+                if not events:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+
+                for event in events:
+                    yield format_sse(event)
+        finally:
+            event_bus.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
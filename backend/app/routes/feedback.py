@@ -7,6 +7,7 @@ from app.models.employee import Employee
 from app.models.user import User
 from app.schemas.feedback import FeedbackCreate, FeedbackResponse
 from app.utils.auth import get_current_user, get_current_admin_user
+from app.utils.events import event_bus
 
 router = APIRouter(prefix="/feedback", tags=["Feedback"])
 
@@ -35,6 +36,12 @@ async def create_feedback(
     db.commit()
     db.refresh(db_feedback)
     
+    event_bus.publish("feedback.created", {
+        "feedback_id": db_feedback.id,
+        "employee_id": db_feedback.employee_id,
+        "rating": db_feedback.rating
+    })
+    
     return db_feedback
 
 @router.get("/employee/{employee_id}", response_model=List[FeedbackResponse])
@@ -92,7 +99,13 @@ async def delete_feedback(
             detail="Feedback not found"
         )
     
+    employee_id = feedback.employee_id
     db.delete(feedback)
     db.commit()
     
+    event_bus.publish("feedback.deleted", {
+        "feedback_id": feedback_id,
+        "employee_id": employee_id
+    })
+    
     return None
\ No newline at end of file
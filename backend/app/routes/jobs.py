@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.models.job import Job
+from app.models.user import User
+from app.schemas.job import JobResponse
+from app.utils.auth import get_current_admin_user
+from app.utils.jobs import FINISHED, get_job_queue
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+def get_job_or_404(db: Session, job_id: int) -> Job:
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.get("/", response_model=List[JobResponse])
+async def get_jobs(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    kind: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Recent jobs, newest first (Admin only)"""
+    
+    query = db.query(Job)
+    if status_filter:
+        query = query.filter(Job.status == status_filter)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    return query.order_by(Job.id.desc()).limit(limit).all()
+
+@router.get("/workers")
+async def get_job_workers(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Job worker threads in this process and the registered job kinds (Admin only)"""
+    
+    return get_job_queue().stats()
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Job status, progress and result (Admin only)"""
+    
+    return get_job_or_404(db, job_id)
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Cancel a queued job, or ask a running one to stop (Admin only)"""
+    
+    job = get_job_or_404(db, job_id)
+    if job.status in FINISHED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job already {job.status}"
+        )
+    return get_job_queue().cancel(db, job_id)
@@ -1,21 +1,131 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import heapq
+import os
+import time
+import numpy as np
+from itertools import chain
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from app.config import settings
 from app.database import get_db
 from app.models.employee import Employee
+from app.models.job import Job
 from app.models.user import User
-from app.schemas.employee import PredictionInput, PredictionResponse
-from app.utils.auth import get_current_user
-from app.ml.predict import get_predictor
+from app.schemas.job import JobResponse
+from app.schemas.employee import (
+    AtRiskResponse,
+    ExperimentConfig,
+    PredictionInput,
+    PredictionResponse,
+    TrendResponse,
+    WhatIfRequest,
+    WhatIfResponse
+)
+from app.utils.auth import get_current_user, get_current_admin_user
+from app.ml.predict import get_predictor, MLPredictor
+from app.ml.batcher import get_prediction_batcher
+from app.ml.batch_scoring import score_active_employees
+from app.ml.db_source import MODEL_COLUMNS, read_employee_arrays
+from app.ml.drift import get_drift_monitor
+from app.ml.experiments import get_model_experiments
+from app.ml.simulate import grid_size, simulate
+from app.ml.explain import explain_many
+from app.ml.history import compact_history, get_history_writer, history_rows, prediction_trend
+from app.ml.repredict import get_reprediction_queue
+from app.ml.registry import BASE_VERSION, list_versions
+from app.ml.scheduler import get_retrain_scheduler
+from app.utils.events import event_bus
+from app.utils.jobs import JobContext, get_job_queue, job_handler
 
 router = APIRouter(prefix="/predict", tags=["Predictions"])
 
+# Batch scoring never runs more worker processes than there are CPUs
+MAX_SCORING_WORKERS = os.cpu_count() or 1
+
+def check_profile(predictor: MLPredictor, profile: Optional[str], explain: bool = False):
+    """Reject unknown model profiles (or ones that cannot explain) before doing any work"""
+    try:
+        predictor.get_models(profile)
+        if explain:
+            predictor.get_explainers(profile)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+AT_RISK_COLUMNS = (
+    Employee.id, Employee.name, Employee.department, Employee.attrition_prediction,
+    Employee.attrition_probability, Employee.performance_prediction
+)
+
+def department_top_at_risk(db: Session, department: str, k: int) -> List:
+    """Highest-risk active employees of one department, read in ix_employees_risk order"""
+    return db.execute(
+        select(*AT_RISK_COLUMNS)
+        .where(
+            Employee.is_active == True,
+            Employee.department == department,
+            Employee.attrition_probability.isnot(None)
+        )
+        .order_by(Employee.attrition_probability.desc())
+        .limit(k)
+    ).all()
+
+def active_departments(db: Session) -> List[str]:
+    """Distinct departments of active employees, one index seek each.
+
+    A loose index scan: each step asks for the smallest department after
+    the previous one, instead of reading every index entry like DISTINCT.
+    """
+    departments = []
+    while True:
+        query = select(func.min(Employee.department)).where(Employee.is_active == True)
+        if departments:
+            query = query.where(Employee.department > departments[-1])
+        department = db.execute(query).scalar()
+        if department is None:
+            return departments
+        departments.append(department)
+
+def top_at_risk(db: Session, k: int, department: Optional[str] = None,
+                per_department: bool = False):
+    """Top K active employees by attrition probability.
+
+    Each department is one index range scan that stops after K rows. The
+    overall top K is merged from the per-department lists, so at most
+    K x departments rows are read and nothing is sorted in the database.
+    """
+    
+    departments = [department] if department is not None else active_departments(db)
+    
+    tops = {name: department_top_at_risk(db, name, k) for name in departments}
+    if per_department:
+        return tops
+    return heapq.nlargest(k, chain.from_iterable(tops.values()), key=lambda row: row.attrition_probability)
+
+def at_risk_entry(row) -> Dict:
+    return {**row._asdict(), "risk_level": MLPredictor.get_risk_level(row.attrition_probability)}
+
 @router.post("/employee/{employee_id}", response_model=PredictionResponse)
 async def predict_employee(
     employee_id: int,
+    profile: Optional[str] = Query(None, description="Model profile; defaults to MODEL_PROFILE"),
+    explain: bool = Query(False, description="Include per-feature contributions"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Predict attrition and performance for an employee"""
+    """Predict attrition and performance for an employee
+    
+    With an A/B experiment running, a fixed share of employees is served
+    by the challenger version, reported as model_version.
+    """
+    
+    experiments = get_model_experiments()
+    predictor, arm = experiments.assign(employee_id, get_predictor())
+    check_profile(predictor, profile, explain)
     
     employee = db.query(Employee).filter(Employee.id == employee_id).first()
     
@@ -31,15 +141,19 @@ async def predict_employee(
         'experience': employee.experience,
         'salary': employee.salary,
         'department': employee.department,
-        'satisfaction_level': employee.satisfaction_level or 0.7,
-        'last_evaluation_score': employee.last_evaluation_score or 0.7,
+        'satisfaction_level': employee.satisfaction_level,
+        'last_evaluation_score': employee.last_evaluation_score,
         'project_count': employee.project_count,
         'work_hours': employee.work_hours
     }
     
-    # Get predictor and make predictions
-    predictor = get_predictor()
-    predictions = predictor.predict_all(employee_data)
+    # Make predictions, coalesced with concurrent requests when batching is on
+    started = time.perf_counter()
+    if settings.PREDICTION_BATCH_ENABLED:
+        predictions = await get_prediction_batcher().predict(employee_data, profile, predictor)
+    else:
+        predictions = predictor.predict_all(employee_data, profile)
+    experiments.record_arm(arm, predictions, time.perf_counter() - started)
     
     # Update employee record
     employee.attrition_prediction = predictions['attrition_prediction']
@@ -49,20 +163,68 @@ async def predict_employee(
     
     db.commit()
     
-    return {
+    if settings.HISTORY_ENABLED:
+        get_history_writer().record(history_rows(
+            [{"employee_id": employee_id, "department": employee.department, **predictions}],
+            predictor.version
+        ))
+    
+    event_bus.publish("prediction.updated", {
         "employee_id": employee_id,
         "attrition_prediction": predictions['attrition_prediction'],
         "attrition_probability": predictions['attrition_probability'],
         "performance_prediction": predictions['performance_prediction'],
         "risk_level": predictions['risk_level']
+    })
+    
+    return {
+        "employee_id": employee_id,
+        "attrition_prediction": predictions['attrition_prediction'],
+        "attrition_probability": predictions['attrition_probability'],
+        "performance_prediction": predictions['performance_prediction'],
+        "risk_level": predictions['risk_level'],
+        "model_version": predictor.version,
+        "explanation": explain_many(predictor, [employee_data], profile)[0] if explain else None
     }
 
-@router.post("/batch", status_code=status.HTTP_200_OK)
+@job_handler("predict.batch", max_attempts=3)
+def run_batch_prediction(payload: Dict, context: JobContext) -> Dict:
+    """Job: re-score all active employees; chunks already written stay written on retry or cancel"""
+    
+    def report_progress(totals):
+        event_bus.publish("prediction.batch.progress", totals)
+        context.progress(totals)
+        context.raise_if_cancelled()
+    
+    result = score_active_employees(
+        min(payload.get('workers') or settings.BATCH_SCORING_WORKERS, MAX_SCORING_WORKERS),
+        profile=payload.get('profile'),
+        chunk_size=settings.BATCH_SCORING_CHUNK_SIZE,
+        predictor=get_predictor(),
+        progress=report_progress,
+        explain=payload.get('explain', False),
+        history=settings.HISTORY_ENABLED
+    )
+    updated_count = result['updated_count']
+    
+    event_bus.publish("prediction.batch", {"updated_count": updated_count})
+    
+    return {
+        "message": f"Successfully updated predictions for {updated_count} employees",
+        **result
+    }
+
+@router.post("/batch", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def predict_batch(
+    profile: Optional[str] = Query(None, description="Model profile; defaults to MODEL_PROFILE"),
+    workers: Optional[int] = Query(None, ge=1, le=MAX_SCORING_WORKERS,
+                                   description="Worker processes, at most one per CPU; defaults to BATCH_SCORING_WORKERS"),
+    explain: bool = Query(False, description="Include per-feature contributions for every employee"),
+    priority: int = Query(0, description="Higher-priority jobs run first"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Run predictions for all active employees"""
+    """Queue predictions for all active employees; poll /jobs/{id} for the result"""
     
     if current_user.role != "admin":
         raise HTTPException(
@@ -70,35 +232,236 @@ async def predict_batch(
             detail="Only admins can run batch predictions"
         )
     
-    employees = db.query(Employee).filter(Employee.is_active == True).all()
+    check_profile(get_predictor(), profile, explain)
+    
+    return get_job_queue().enqueue(
+        db, "predict.batch",
+        {"profile": profile, "workers": workers, "explain": explain},
+        priority=priority,
+        created_by=current_user.id
+    )
+
+@router.post("/what-if", response_model=WhatIfResponse)
+async def what_if(
+    request: WhatIfRequest,
+    profile: Optional[str] = Query(None, description="Model profile; defaults to MODEL_PROFILE"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Predict how feature changes would move employees' risk (read-only)"""
+    
     predictor = get_predictor()
+    check_profile(predictor, profile)
+    
+    sweeps = {feature: sweep.model_dump() for feature, sweep in request.sweeps.items()}
+    size = grid_size(len(request.employee_ids), sweeps)
+    if size > settings.WHATIF_MAX_GRID_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Simulation grid has {size} rows, the limit is {settings.WHATIF_MAX_GRID_ROWS}"
+        )
+    
+    employees = read_employee_arrays(db, MODEL_COLUMNS, (Employee.id.in_(request.employee_ids),))
+    found = set(employees['id'].tolist())
+    missing = [employee_id for employee_id in request.employee_ids if employee_id not in found]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Employees not found: {missing}"
+        )
+    
+    features, known = employees.features(predictor.label_encoder)
+    if not known.all():
+        unknown = sorted(set(employees.department_names()[~known]))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The model does not know department(s): {', '.join(unknown)}"
+        )
+    
+    # Rows come back in id order; simulate in request order
+    rows = features[np.searchsorted(employees['id'], request.employee_ids)]
+    results = await run_in_threadpool(simulate, predictor, rows, sweeps, profile)
     
-    updated_count = 0
-    
-    for employee in employees:
-        employee_data = {
-            'age': employee.age,
-            'experience': employee.experience,
-            'salary': employee.salary,
-            'department': employee.department,
-            'satisfaction_level': employee.satisfaction_level or 0.7,
-            'last_evaluation_score': employee.last_evaluation_score or 0.7,
-            'project_count': employee.project_count,
-            'work_hours': employee.work_hours
+    return {
+        "grid_size": size,
+        "results": [
+            {"employee_id": employee_id, "baseline": {"employee_id": employee_id, **result['baseline']},
+             "scenarios": result['scenarios']}
+            for employee_id, result in zip(request.employee_ids, results)
+        ]
+    }
+
+@router.get("/at-risk", response_model=AtRiskResponse)
+async def get_at_risk_employees(
+    k: int = Query(50, ge=1, le=1000, description="Employees to return (per department with per_department)"),
+    department: Optional[str] = Query(None),
+    per_department: bool = Query(False, description="Top K for every department instead of overall"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Active employees with the highest predicted attrition risk (Admin only)"""
+    
+    tops = top_at_risk(db, k, department, per_department)
+    if per_department:
+        return {
+            "k": k,
+            "departments": {name: [at_risk_entry(row) for row in rows] for name, rows in tops.items()}
         }
-        
-        predictions = predictor.predict_all(employee_data)
-        
-        employee.attrition_prediction = predictions['attrition_prediction']
-        employee.attrition_probability = predictions['attrition_probability']
-        employee.performance_prediction = predictions['performance_prediction']
-        employee.performance_score = predictions['performance_prediction']
-        
-        updated_count += 1
+    return {"k": k, "employees": [at_risk_entry(row) for row in tops]}
+
+@router.get("/history/employee/{employee_id}", response_model=TrendResponse)
+async def get_employee_trend(
+    employee_id: int,
+    days: int = Query(90, ge=1, le=3650),
+    points: int = Query(90, ge=1, le=1000, description="Maximum buckets; days are grouped to fit"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Average predictions for an employee over time"""
     
-    db.commit()
+    # Non-admin can only view their own data
+    if current_user.role != "admin" and current_user.employee_id != employee_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this employee"
+        )
+    
+    return prediction_trend(db, days, points, employee_id=employee_id)
+
+@router.get("/history/department/{department}", response_model=TrendResponse)
+async def get_department_trend(
+    department: str,
+    days: int = Query(90, ge=1, le=3650),
+    points: int = Query(90, ge=1, le=1000, description="Maximum buckets; days are grouped to fit"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Average predictions across a department over time (Admin only)"""
+    
+    return prediction_trend(db, days, points, department=department)
+
+@router.post("/history/compact")
+async def compact_prediction_history(
+    retention_days: int = Query(settings.HISTORY_RAW_RETENTION_DAYS, ge=1),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Fold raw prediction history older than the retention window into daily sums (Admin only)"""
+    
+    get_history_writer().flush()
+    return await run_in_threadpool(compact_history, retention_days)
+
+@router.get("/models")
+async def get_model_status(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Serving model version and profiles, available versions and retraining status (Admin only)"""
     
+    predictor = get_predictor()
     return {
-        "message": f"Successfully updated predictions for {updated_count} employees",
-        "updated_count": updated_count
-    }
\ No newline at end of file
+        "serving_version": predictor.version,
+        "profiles": list(predictor.profiles),
+        "default_profile": predictor.default_profile,
+        "versions": [BASE_VERSION] + list_versions(),
+        "retraining": get_retrain_scheduler().status()
+    }
+
+@router.get("/batching")
+async def get_batching_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Micro-batching configuration, batch sizes and queueing delay (Admin only)"""
+    
+    return get_prediction_batcher().stats()
+
+@router.get("/repredict")
+async def get_reprediction_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Re-prediction queue backlog and throughput (Admin only)"""
+    
+    return get_reprediction_queue().stats()
+
+@router.get("/drift")
+async def get_feature_drift(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """PSI and KS of every model feature, rows scored by all workers vs. the training data (Admin only)"""
+    
+    return get_drift_monitor().report()
+
+@router.post("/drift/reset")
+async def reset_feature_drift(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Start the live histograms over in every worker, e.g. after fixing an upstream data issue (Admin only)"""
+    
+    get_drift_monitor().reset()
+    return get_drift_monitor().report()
+
+@router.get("/experiments")
+async def get_model_experiment_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Shadow and A/B configuration with their comparisons since the last change (Admin only)"""
+    
+    return get_model_experiments().stats()
+
+@router.put("/experiments")
+async def configure_model_experiments(
+    config: ExperimentConfig,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Shadow a model version and/or A/B test one against the serving model (Admin only)
+    
+    Leaving a version out turns that experiment off. Applies to every
+    server worker within EXPERIMENTS_SYNC_SECONDS and resets the statistics.
+    """
+    
+    try:
+        await run_in_threadpool(
+            get_model_experiments().configure,
+            config.shadow_version, config.shadow_profile, config.ab_version, config.ab_percent
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return get_model_experiments().stats()
+
+@router.post("/experiments/reset")
+async def reset_model_experiments(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Start the shadow and A/B statistics over in every worker (Admin only)"""
+    
+    await run_in_threadpool(get_model_experiments().reset)
+    return get_model_experiments().stats()
+
+@job_handler("models.retrain")
+def run_retraining(payload: Dict, context: JobContext) -> Dict:
+    """Job: retrain, evaluate and promote if better"""
+    
+    return get_retrain_scheduler().run("manual")
+
+@router.post("/models/retrain", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def retrain_models(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Queue a retraining run (Admin only)
+    
+    Rejected while a retraining job is queued or running in any worker,
+    or a scheduled run is in progress on this host.
+    """
+    
+    pending = db.query(Job.id).filter(
+        Job.kind == "models.retrain", Job.status.in_(("queued", "running"))
+    ).first()
+    if pending is not None or get_retrain_scheduler().in_progress():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Retraining already in progress"
+        )
+    
+    return get_job_queue().enqueue(db, "models.retrain", created_by=current_user.id)
@@ -2,8 +2,16 @@ from app.schemas.employee import (
     EmployeeCreate, 
     EmployeeUpdate, 
     EmployeeResponse,
+    SimilarEmployee,
     PredictionInput,
-    PredictionResponse
+    PredictionResponse,
+    PredictionExplanation,
+    FeatureSweep,
+    WhatIfRequest,
+    WhatIfResponse,
+    AtRiskResponse,
+    TrendResponse,
+    ExperimentConfig
 )
 from app.schemas.user import (
     UserCreate,
@@ -16,18 +24,28 @@ from app.schemas.feedback import (
     FeedbackCreate,
     FeedbackResponse
 )
+from app.schemas.job import JobResponse
 
 __all__ = [
     "EmployeeCreate",
     "EmployeeUpdate", 
     "EmployeeResponse",
+    "SimilarEmployee",
     "PredictionInput",
     "PredictionResponse",
+    "PredictionExplanation",
+    "FeatureSweep",
+    "WhatIfRequest",
+    "WhatIfResponse",
+    "AtRiskResponse",
+    "TrendResponse",
+    "ExperimentConfig",
     "UserCreate",
     "UserLogin",
     "UserResponse",
     "Token",
     "TokenData",
     "FeedbackCreate",
-    "FeedbackResponse"
+    "FeedbackResponse",
+    "JobResponse"
 ]
\ No newline at end of file
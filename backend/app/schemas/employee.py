@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Dict, List, Literal, Optional
+from datetime import date, datetime
 
 class EmployeeBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -42,12 +42,98 @@ class EmployeeResponse(EmployeeBase):
     class Config:
         from_attributes = True
 
+class SimilarEmployee(BaseModel):
+    distance: float  # Euclidean, in the models' scaled feature space
+    employee: EmployeeResponse
+
 class PredictionInput(BaseModel):
     employee_id: int
 
+class FeatureContributions(BaseModel):
+    base_value: float  # prediction for an average employee
+    contributions: Dict[str, float]  # base_value + sum(contributions) = prediction
+
+class PredictionExplanation(BaseModel):
+    attrition: FeatureContributions
+    performance: FeatureContributions
+
 class PredictionResponse(BaseModel):
     employee_id: int
     attrition_prediction: str
     attrition_probability: float
     performance_prediction: float
-    risk_level: str  # Low, Medium, High
\ No newline at end of file
+    risk_level: str  # Low, Medium, High
+    model_version: Optional[str] = None  # the A/B challenger's when it served this
+    explanation: Optional[PredictionExplanation] = None
+    
+    class Config:
+        protected_namespaces = ()
+
+SweepFeature = Literal[
+    'age', 'experience', 'salary', 'satisfaction_level',
+    'last_evaluation_score', 'project_count', 'work_hours'
+]
+
+class FeatureSweep(BaseModel):
+    values: Optional[List[float]] = Field(None, min_length=1)  # absolute values, e.g. [45]
+    change_pct: Optional[List[float]] = Field(None, min_length=1)  # relative, e.g. [5, 10, 20]
+    
+    @model_validator(mode='after')
+    def check_one_kind(self):
+        if (self.values is None) == (self.change_pct is None):
+            raise ValueError("Give exactly one of values or change_pct")
+        return self
+
+class WhatIfRequest(BaseModel):
+    employee_ids: List[int] = Field(..., min_length=1)
+    sweeps: Dict[SweepFeature, FeatureSweep] = Field(..., min_length=1)
+
+class WhatIfScenario(BaseModel):
+    changes: Dict[str, float]
+    attrition_prediction: str
+    attrition_probability: float
+    performance_prediction: float
+    risk_level: str
+    attrition_probability_change: float
+    performance_change: float
+
+class WhatIfEmployee(BaseModel):
+    employee_id: int
+    baseline: PredictionResponse
+    scenarios: List[WhatIfScenario]
+
+class WhatIfResponse(BaseModel):
+    grid_size: int
+    results: List[WhatIfEmployee]
+
+class AtRiskEmployee(BaseModel):
+    id: int
+    name: str
+    department: str
+    attrition_prediction: Optional[str]
+    attrition_probability: float
+    performance_prediction: Optional[float]
+    risk_level: str
+
+class AtRiskResponse(BaseModel):
+    k: int
+    employees: Optional[List[AtRiskEmployee]] = None  # overall top K
+    departments: Optional[Dict[str, List[AtRiskEmployee]]] = None  # top K per department
+
+class TrendPoint(BaseModel):
+    start: date  # first day of the bucket
+    predictions: int
+    attrition_probability: float  # averages over the bucket
+    performance_prediction: float
+
+class TrendResponse(BaseModel):
+    start: date
+    end: date
+    bucket_days: int
+    points: List[TrendPoint]
+
+class ExperimentConfig(BaseModel):
+    shadow_version: Optional[str] = None  # None turns shadow scoring off
+    shadow_profile: Optional[str] = None
+    ab_version: Optional[str] = None  # None turns the A/B split off
+    ab_percent: float = Field(0.0, ge=0, le=100)  # share of employees served by ab_version
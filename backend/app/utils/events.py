@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List
+from app.config import settings
+
+class Subscriber:
+    """A single stream consumer with a bounded event buffer"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.buffer = deque(maxlen=maxsize)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def push(self, event: Dict):
+        """Queue an event; safe to call from any thread"""
+
+        # A full deque silently discards the oldest entry, so remember that
+        # the client has a gap and must re-fetch
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(event)
+
+        try:
+            self.loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # Event loop already closed, the stream is going away
+            pass
+
+    async def get(self, timeout: float) -> List[Dict]:
+        """Wait up to `timeout` seconds and drain all buffered events"""
+
+        self._ready.clear()
+        if not self.buffer:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+
+        events = []
+        if self.dropped:
+            events.append({"id": None, "type": "resync", "data": {"dropped": self.dropped}})
+            self.dropped = 0
+        while self.buffer:
+            events.append(self.buffer.popleft())
+        return events
+
+class EventBus:
+    """In-process pub/sub for data change notifications"""
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._sequence = 0
+
+    def subscribe(self) -> Subscriber:
+        """Register a stream subscriber (must be called from the event loop)"""
+
+        subscriber = Subscriber(asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def add_listener(self, listener: Callable[[Dict], None]):
+        """Register an in-process callback invoked synchronously on publish"""
+
+        with self._lock:
+            self._listeners.append(listener)
+
+    def publish(self, event_type: str, data: Dict) -> Dict:
+        """Publish a compact change event to all subscribers and listeners"""
+
+        with self._lock:
+            self._sequence += 1
+            event = {
+                "id": self._sequence,
+                "type": event_type,
+                "data": data,
+                "ts": time.time()
+            }
+            subscribers = list(self._subscribers)
+            listeners = list(self._listeners)
+
+        for subscriber in subscribers:
+            subscriber.push(event)
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"Warning: event listener failed for {event_type}: {str(e)}")
+
+        return event
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+def format_sse(event: Dict) -> str:
+    """Serialize an event in text/event-stream framing"""
+
+    message = ""
+    if event.get("id") is not None:
+        message += f"id: {event['id']}\n"
+    payload = json.dumps({"type": event["type"], "data": event["data"]}, default=str)
+    message += f"data: {payload}\n\n"
+    return message
+
+# Singleton instance
+event_bus = EventBus(settings.EVENT_BUFFER_SIZE)
@@ -0,0 +1,274 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.job import Job
+from app.utils.events import event_bus
+
+FINISHED = ('succeeded', 'failed', 'cancelled')
+
+class JobCancelled(Exception):
+    """Raised inside a handler to stop a job that was asked to cancel"""
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+class JobContext:
+    """What a running handler gets besides its payload: progress and cancellation"""
+
+    def __init__(self, job_id: int, check_seconds: float = 1.0):
+        self.job_id = job_id
+        self.check_seconds = check_seconds
+        self._checked_at = 0.0
+        self._cancelled = False
+
+    def progress(self, data: Dict):
+        with SessionLocal() as db:
+            db.execute(update(Job).where(Job.id == self.job_id)
+                       .values(progress=data, heartbeat_at=_now()))
+            db.commit()
+        event_bus.publish("job.progress", {"job_id": self.job_id, **data})
+
+    def cancelled(self) -> bool:
+        # Read at most once per check_seconds; handlers may call this per chunk
+        if not self._cancelled and time.monotonic() - self._checked_at >= self.check_seconds:
+            self._checked_at = time.monotonic()
+            with SessionLocal() as db:
+                self._cancelled = bool(db.execute(
+                    select(Job.cancel_requested).where(Job.id == self.job_id)
+                ).scalar())
+        return self._cancelled
+
+    def raise_if_cancelled(self):
+        if self.cancelled():
+            raise JobCancelled()
+
+# kind -> (handler(payload, context) -> result, max_attempts)
+_handlers: Dict[str, tuple] = {}
+
+def job_handler(kind: str, max_attempts: int = 1):
+    """Register a function(payload, context) as the handler for a job kind"""
+
+    def register(handler: Callable[[Dict, JobContext], Optional[Dict]]):
+        _handlers[kind] = (handler, max_attempts)
+        return handler
+    return register
+
+class JobQueue:
+    """Durable job queue in the jobs table, run by worker threads.
+
+    Any process may enqueue; workers in every process claim jobs with a
+    compare-and-set on status, so each job runs once even with several
+    server workers. Higher priority runs first, then oldest. A failed job
+    is retried with exponential backoff until its kind's max_attempts. A
+    queued job is cancelled at once; a running one is asked to stop and
+    its handler checks `context.cancelled()`. Running jobs send a
+    heartbeat, and jobs whose worker died are put back in the queue.
+    """
+
+    def __init__(self, workers: int, poll_seconds: float, heartbeat_seconds: float,
+                 stale_seconds: float, retry_backoff_seconds: float):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds
+        self.retry_backoff = retry_backoff_seconds
+        self._identity = f"{socket.gethostname()}:{os.getpid()}"
+        self._running = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def enqueue(self, db: Session, kind: str, payload: Optional[Dict] = None, priority: int = 0,
+                created_by: Optional[int] = None) -> Job:
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(kind=kind, payload=payload or {}, priority=priority, created_by=created_by,
+                  max_attempts=_handlers[kind][1], run_after=_now())
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self._publish(job.id, kind, 'queued')
+        self._wake.set()
+        return job
+
+    def cancel(self, db: Session, job_id: int) -> Optional[Job]:
+        """Cancel a queued job now or ask a running one to stop"""
+
+        cancelled = db.execute(
+            update(Job).where(Job.id == job_id, Job.status == 'queued')
+            .values(status='cancelled', finished_at=_now())
+        ).rowcount
+        if not cancelled:
+            db.execute(update(Job).where(Job.id == job_id, Job.status == 'running')
+                       .values(cancel_requested=True))
+        db.commit()
+
+        job = db.get(Job, job_id)
+        if job is not None:
+            db.refresh(job)
+            if cancelled:
+                self._publish(job.id, job.kind, 'cancelled')
+        return job
+
+    def _publish(self, job_id: int, kind: str, status: str):
+        event_bus.publish("job.updated", {"job_id": job_id, "kind": kind, "status": status})
+
+    def _claim(self, worker: str) -> Optional[Job]:
+        with SessionLocal() as db:
+            while True:
+                now = _now()
+                job_id = db.execute(
+                    select(Job.id).where(Job.status == 'queued', Job.run_after <= now)
+                    .order_by(Job.priority.desc(), Job.id).limit(1)
+                ).scalar()
+                if job_id is None:
+                    return None
+
+                # Another worker may claim the same row first; then try the next
+                claimed = db.execute(
+                    update(Job).where(Job.id == job_id, Job.status == 'queued')
+                    .values(status='running', worker=worker, started_at=now, heartbeat_at=now,
+                            attempts=Job.attempts + 1)
+                ).rowcount
+                db.commit()
+                if claimed:
+                    job = db.get(Job, job_id)
+                    db.expunge(job)
+                    return job
+
+    def _finish(self, job: Job, **values):
+        with SessionLocal() as db:
+            db.execute(update(Job).where(Job.id == job.id, Job.status == 'running').values(**values))
+            db.commit()
+        self._publish(job.id, job.kind, values['status'])
+
+    def run_one(self, worker: str = None) -> bool:
+        """Claim and run one job; False if none was due"""
+
+        worker = worker or f"{self._identity}/{threading.current_thread().name}"
+        job = self._claim(worker)
+        if job is None:
+            return False
+
+        self._publish(job.id, job.kind, 'running')
+        with self._lock:
+            self._running.add(job.id)
+        try:
+            handler = _handlers.get(job.kind, (None,))[0]
+            if handler is None:
+                raise ValueError(f"No handler for job kind {job.kind}")
+            context = JobContext(job.id)
+            context.raise_if_cancelled()
+            result = handler(job.payload or {}, context)
+            self._finish(job, status='succeeded', result=result, error=None, finished_at=_now())
+        except JobCancelled:
+            self._finish(job, status='cancelled', finished_at=_now())
+        except Exception as e:
+            if job.attempts < job.max_attempts:
+                delay = self.retry_backoff * 2 ** (job.attempts - 1)
+                self._finish(job, status='queued', error=str(e), worker=None,
+                             run_after=_now() + timedelta(seconds=delay))
+                print(f"Warning: job {job.id} ({job.kind}) failed, retrying in {delay:.0f}s: {str(e)}")
+            else:
+                self._finish(job, status='failed', error=str(e), finished_at=_now())
+                print(f"Warning: job {job.id} ({job.kind}) failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._running.discard(job.id)
+        return True
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_one():
+                    continue
+            except Exception as e:
+                print(f"Warning: job worker error: {str(e)}")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def _supervise(self):
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                self.heartbeat()
+                self.recover_stale()
+            except Exception as e:
+                print(f"Warning: job supervisor error: {str(e)}")
+
+    def heartbeat(self):
+        with self._lock:
+            running = list(self._running)
+        if running:
+            with SessionLocal() as db:
+                db.execute(update(Job).where(Job.id.in_(running)).values(heartbeat_at=_now()))
+                db.commit()
+
+    def recover_stale(self) -> int:
+        """Requeue (or fail, when out of attempts) running jobs whose worker stopped beating"""
+
+        stale = Job.status == 'running', Job.heartbeat_at < _now() - timedelta(seconds=self.stale_seconds)
+        with SessionLocal() as db:
+            failed = db.execute(
+                update(Job).where(*stale, Job.attempts >= Job.max_attempts)
+                .values(status='failed', error='Worker stopped while running the job', finished_at=_now())
+            ).rowcount
+            requeued = db.execute(
+                update(Job).where(*stale).values(status='queued', worker=None, run_after=_now())
+            ).rowcount
+            db.commit()
+        if requeued:
+            self._wake.set()
+        return failed + requeued
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._supervise, name="job-supervisor", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        print(f"✓ Job queue started with {self.workers} worker(s)")
+
+    def stop(self):
+        # Running jobs are not interrupted; another process picks them up
+        # once their heartbeat goes stale
+        self._stop.set()
+        self._wake.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            running = sorted(self._running)
+        return {
+            'workers': self.workers,
+            'running_here': running,
+            'kinds': sorted(_handlers)
+        }
+
+# Singleton instance
+_queue = None
+
+def get_job_queue() -> JobQueue:
+    """Get or create the job queue"""
+    global _queue
+    if _queue is None:
+        _queue = JobQueue(
+            settings.JOB_WORKERS,
+            settings.JOB_POLL_SECONDS,
+            settings.JOB_HEARTBEAT_SECONDS,
+            settings.JOB_STALE_SECONDS,
+            settings.JOB_RETRY_BACKOFF_SECONDS
+        )
+    return _queue
@@ -0,0 +1,83 @@
+"""Single-employee prediction throughput with and without micro-batching
+
+Simulates concurrent clients in one event loop, as a uvicorn worker sees
+them. Each client issues predictions back to back, either straight
+through MLPredictor.predict_all or through the PredictionBatcher.
+
+Run from the backend directory:
+    python -m benchmarks.bench_batching --clients 1 8 32 --requests 2000
+"""
+import argparse
+import asyncio
+import random
+import time
+import numpy as np
+from app.ml.batcher import PredictionBatcher
+from app.ml.predict import get_predictor
+
+def employees(n, departments):
+    rnd = random.Random(0)
+    return [{
+        'department': rnd.choice(departments),
+        'age': rnd.randint(22, 60),
+        'experience': rnd.randint(0, 20),
+        'salary': rnd.randint(40000, 120000),
+        'satisfaction_level': rnd.random(),
+        'last_evaluation_score': rnd.random(),
+        'project_count': rnd.randint(1, 9),
+        'work_hours': rnd.randint(35, 70)
+    } for _ in range(n)]
+
+async def drive(predict, rows, clients):
+    latencies = []
+    queue = list(rows)
+
+    async def client():
+        while queue:
+            row = queue.pop()
+            start = time.perf_counter()
+            await predict(row)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return len(rows) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--max-size', type=int, default=64)
+    args = parser.parse_args()
+
+    predictor = get_predictor()
+    rows = employees(args.requests, list(predictor.label_encoder.classes_))
+
+    async def direct(row):
+        return predictor.predict_all(row)
+
+    # Parity: batched and direct scoring agree
+    batched = predictor.predict_many(rows[:100])
+    for row, result in zip(rows[:100], batched):
+        expected = predictor.predict_all(row)
+        assert abs(result['attrition_probability'] - expected['attrition_probability']) < 1e-9
+        assert abs(result['performance_prediction'] - expected['performance_prediction']) < 1e-9
+
+    print(f"{args.requests} predictions per run, max wait {args.max_wait_ms}ms, "
+          f"max batch {args.max_size}")
+    print(f"{'clients':>7} {'mode':>8} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>7} {'mean batch':>10}")
+    for clients in args.clients:
+        throughput, p50, p99 = asyncio.run(drive(direct, rows, clients))
+        print(f"{clients:>7} {'direct':>8} {throughput:>8.0f} {p50:>7.2f} {p99:>7.2f} {1:>10.1f}")
+
+        batcher = PredictionBatcher(args.max_wait_ms, args.max_size)
+        throughput, p50, p99 = asyncio.run(drive(batcher.predict, rows, clients))
+        stats = batcher.stats()
+        print(f"{clients:>7} {'batched':>8} {throughput:>8.0f} {p50:>7.2f} {p99:>7.2f} "
+              f"{stats['mean_batch_size']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Compare scikit-learn and compacted model artifacts
+
+Trains once without compaction, compacts a copy, then loads each model
+directory in a fresh interpreter (as a worker would) and reports artifact
+size, RSS, latency and the largest prediction difference. Exits non-zero
+if the difference exceeds compact.PARITY_TOLERANCE.
+
+Run from the backend directory:
+    python -m benchmarks.bench_compact --rows 200000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import numpy as np
+from app.ml.compact import PARITY_TOLERANCE, compact_model_dir
+from app.ml.generate_data import write_employee_data
+from app.ml.train_model import holdout_split, load_training_data, train_models
+
+WORKER_SCRIPT = """
+import json, os, sys, time
+import numpy as np
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+import sklearn.preprocessing  # needed by the scalers either way
+from app.ml.predict import MLPredictor
+model_dir, rows_path = sys.argv[1], sys.argv[2]
+
+# Includes modules the models pull in on unpickling
+baseline_mb = rss_mb()
+predictor = MLPredictor(model_dir=model_dir)
+loaded_mb = rss_mb()
+
+X = np.load(rows_path)
+attrition = predictor.attrition_model.predict_proba(predictor.attrition_scaler.transform(X))[:, 1]
+performance = predictor.performance_model.predict(predictor.performance_scaler.transform(X))
+
+employee = {'department': predictor.label_encoder.classes_[0], 'age': 35, 'experience': 8,
+            'salary': 75000, 'satisfaction_level': 0.6, 'last_evaluation_score': 0.7,
+            'project_count': 4, 'work_hours': 45}
+for _ in range(20):
+    predictor.predict_all(employee)
+timings = []
+for _ in range(500):
+    start = time.perf_counter()
+    predictor.predict_all(employee)
+    timings.append(time.perf_counter() - start)
+
+start = time.perf_counter()
+predictor.attrition_model.predict_proba(predictor.attrition_scaler.transform(X))
+predictor.performance_model.predict(predictor.performance_scaler.transform(X))
+batch_seconds = time.perf_counter() - start
+
+np.save(sys.argv[3], np.column_stack([attrition, performance]))
+print(json.dumps({
+    'model_rss_mb': loaded_mb - baseline_mb,
+    'worker_rss_mb': loaded_mb,
+    'p50_ms': float(np.percentile(timings, 50) * 1000),
+    'batch_rows_per_s': len(X) / batch_seconds
+}))
+"""
+
+def artifact_mb(model_dir):
+    return sum(
+        os.path.getsize(os.path.join(model_dir, name))
+        for name in ('attrition_model.pkl', 'performance_model.pkl')
+    ) / 1024 / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_compact_')
+    try:
+        data_path = os.path.join(workdir, 'data.csv')
+        original_dir = os.path.join(workdir, 'original')
+        compact_dir = os.path.join(workdir, 'compact')
+        write_employee_data(data_path, args.rows)
+        with contextlib.redirect_stdout(io.StringIO()):
+            train_models(data_path, original_dir, profiles=(), compact=False)
+        shutil.copytree(original_dir, compact_dir)
+
+        X, y_attrition, _, _ = load_training_data(data_path)
+        _, test_index = holdout_split(y_attrition)
+        rows_path = os.path.join(workdir, 'holdout.npy')
+        np.save(rows_path, X[test_index])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = compact_model_dir(compact_dir, X[test_index])
+
+        print(f"{args.rows} rows, parity checked on {len(test_index)} holdout rows")
+        for name, entry in report.items():
+            print(f"  {name}: {entry['nodes_before']} -> {entry['nodes_after']} nodes, "
+                  f"max abs error {entry['max_abs_error']:.2e}")
+
+        print(f"\n{'artifacts':>10} {'size MB':>8} {'model RSS MB':>13} {'worker RSS MB':>14} "
+              f"{'p50 ms':>7} {'batch rows/s':>13}")
+        predictions = {}
+        for label, model_dir in (('sklearn', original_dir), ('compact', compact_dir)):
+            output_path = os.path.join(workdir, f'{label}.npy')
+            output = subprocess.run(
+                [sys.executable, '-c', WORKER_SCRIPT, model_dir, rows_path, output_path],
+                capture_output=True, text=True, check=True
+            ).stdout
+            m = json.loads(output.strip().splitlines()[-1])
+            predictions[label] = np.load(output_path)
+            print(f"{label:>10} {artifact_mb(model_dir):>8.2f} {m['model_rss_mb']:>13.1f} "
+                  f"{m['worker_rss_mb']:>14.1f} {m['p50_ms']:>7.2f} {m['batch_rows_per_s']:>13.0f}")
+
+        error = np.abs(predictions['sklearn'] - predictions['compact']).max(axis=0)
+        print(f"\nMax abs difference: attrition probability {error[0]:.2e}, "
+              f"performance {error[1]:.2e} (tolerance {PARITY_TOLERANCE:.0e})")
+        if error.max() > PARITY_TOLERANCE:
+            sys.exit("Parity check failed")
+        print("✓ Parity check passed")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
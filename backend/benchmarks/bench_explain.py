@@ -0,0 +1,95 @@
+"""Latency of per-prediction explanations, with a budget check
+
+Measures single-row explanations (uncached and cached) and vectorized
+throughput for the serving model, and checks that contributions add up
+to the predictions. Exits non-zero if the uncached single-row p99 is
+over --budget-ms or the contributions do not add up.
+
+Run from the backend directory:
+    python -m benchmarks.bench_explain --budget-ms 5
+"""
+import argparse
+import sys
+import time
+import numpy as np
+from app.ml.compact import PARITY_TOLERANCE
+from app.ml.explain import explain_features, explanation_cache
+from app.ml.predict import get_predictor
+
+def random_features(predictor, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(22, 61, n), rng.integers(0, 21, n), rng.integers(40000, 120001, n),
+        rng.random(n), rng.random(n), rng.integers(1, 10, n), rng.integers(35, 71, n),
+        rng.integers(0, len(predictor.label_encoder.classes_), n)
+    ]).astype(np.float64)
+
+def percentiles(timings):
+    timings = np.array(timings) * 1000
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--budget-ms', type=float, default=5.0)
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    predictor = get_predictor()
+    start = time.perf_counter()
+    predictor.get_explainers()
+    print(f"Model version {predictor.version}, profile {predictor.default_profile}; "
+          f"explainers ready in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    rows = random_features(predictor, args.iterations, seed=1)
+    uncached = []
+    for row in rows:
+        start = time.perf_counter()
+        explain_features(predictor, row[None, :])
+        uncached.append(time.perf_counter() - start)
+    cached = []
+    for row in rows:
+        start = time.perf_counter()
+        explain_features(predictor, row[None, :])
+        cached.append(time.perf_counter() - start)
+
+    prediction = []
+    for row in rows[:200]:
+        start = time.perf_counter()
+        predictor.score_features(row[None, :])
+        prediction.append(time.perf_counter() - start)
+
+    features = random_features(predictor, args.rows, seed=2)
+    explanation_cache.maxsize = 0
+    start = time.perf_counter()
+    explanations = explain_features(predictor, features)
+    vectorized_seconds = time.perf_counter() - start
+
+    # Contributions must add up to the (unclipped) predictions
+    attrition_model, performance_model = predictor.get_models()
+    probability = attrition_model.predict_proba(predictor.attrition_scaler.transform(features))[:, 1]
+    performance = performance_model.predict(predictor.performance_scaler.transform(features))
+    attrition_total = np.array([e['attrition']['base_value'] + sum(e['attrition']['contributions'].values())
+                                for e in explanations])
+    performance_total = np.array([e['performance']['base_value'] + sum(e['performance']['contributions'].values())
+                                  for e in explanations])
+    error = max(np.abs(attrition_total - probability).max(), np.abs(performance_total - performance).max())
+
+    print(f"{'':>22} {'p50 ms':>7} {'p99 ms':>7}")
+    for label, timings in (('prediction only', prediction), ('explanation uncached', uncached),
+                           ('explanation cached', cached)):
+        p50, p99 = percentiles(timings)
+        print(f"{label:>22} {p50:>7.3f} {p99:>7.3f}")
+    print(f"\nVectorized: {args.rows} rows in {vectorized_seconds:.2f}s "
+          f"({args.rows / vectorized_seconds:.0f} rows/s)")
+    print(f"Largest gap between contributions and prediction: {error:.2e}")
+
+    _, p99 = percentiles(uncached)
+    if error > PARITY_TOLERANCE:
+        sys.exit("Contributions do not add up to the predictions")
+    if p99 > args.budget_ms:
+        sys.exit(f"Uncached p99 {p99:.3f}ms is over the {args.budget_ms}ms budget")
+    print(f"✓ Within the {args.budget_ms}ms budget")
+
+if __name__ == "__main__":
+    main()
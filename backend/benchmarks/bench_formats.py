@@ -0,0 +1,63 @@
+"""Compare training-data load time and memory: CSV vs columnar .npy
+
+Run from the backend directory:
+    python -m benchmarks.bench_formats --rows 1000000 10000000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from app.ml.generate_data import write_employee_data
+
+LOAD_SCRIPT = """
+import json, resource, sys, time
+from app.ml.train_model import load_training_data
+start = time.perf_counter()
+X, y_attrition, y_performance, le_dept = load_training_data(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'seconds': elapsed,
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'rows': X.shape[0]
+}))
+"""
+
+def _size_mb(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 2**20
+    return os.path.getsize(path) / 2**20
+
+def _measure_load(path):
+    """Load in a fresh interpreter so peak RSS belongs to this load only"""
+    output = subprocess.run(
+        [sys.executable, '-c', LOAD_SCRIPT, path],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--workdir', default=None)
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench_formats_')
+    try:
+        print(f"{'rows':>12} {'format':>9} {'size MB':>9} {'load s':>8} {'peak RSS MB':>12}")
+        for rows in args.rows:
+            for fmt, name in (('csv', 'data.csv'), ('columnar', 'data.cols')):
+                path = os.path.join(workdir, f'{rows}_{name}')
+                write_employee_data(path, rows, fmt=fmt)
+                result = _measure_load(path)
+                print(f"{rows:>12} {fmt:>9} {_size_mb(path):>9.1f} "
+                      f"{result['seconds']:>8.2f} {result['peak_rss_mb']:>12.1f}")
+                shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
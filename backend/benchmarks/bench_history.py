@@ -0,0 +1,111 @@
+"""Prediction history: append throughput and trend queries before and after compaction
+
+Seeds a throwaway SQLite database with a year of daily predictions,
+times buffered versus row-by-row appends, then times per-employee and
+per-department trend queries on raw history and again after compacting
+everything outside the retention window into the daily tables.
+
+Run from the backend directory:
+    python -m benchmarks.bench_history --employees 5000 --days 365
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RUN_SCRIPT = """
+import sys, time
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, insert, select
+from app.database import SessionLocal, engine, init_db
+from app.models.prediction_history import PredictionHistory
+from app.ml.history import HistoryWriter, compact_history, history_rows, prediction_trend
+
+n_employees, n_days, retention = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+init_db()
+rng = np.random.default_rng(0)
+departments = np.array(['IT', 'Sales', 'Marketing', 'HR', 'Finance', 'Operations', 'Support'])
+employee_department = departments[rng.integers(0, len(departments), n_employees)]
+now = datetime.now(timezone.utc)
+
+def predictions(count):
+    return [{'employee_id': int(i), 'department': str(employee_department[i]),
+             'attrition_probability': float(p), 'performance_prediction': 70.0}
+            for i, p in zip(range(count), rng.random(count))]
+
+# Appends: one transaction per prediction versus the buffered writer
+sample = history_rows(predictions(2000), 'bench')
+start = time.perf_counter()
+for row in sample:
+    with engine.begin() as conn:
+        conn.execute(insert(PredictionHistory), [row])
+single_rate = len(sample) / (time.perf_counter() - start)
+writer = HistoryWriter(batch_size=500, flush_seconds=60)
+start = time.perf_counter()
+for row in sample:
+    writer.record([row])
+writer.stop()
+buffered_rate = len(sample) / (time.perf_counter() - start)
+print(f"Appends: {single_rate:9.0f} rows/s one insert each, {buffered_rate:9.0f} rows/s buffered")
+
+# A year of one prediction per employee per day
+for day in range(n_days, 0, -1):
+    with engine.begin() as conn:
+        conn.execute(insert(PredictionHistory),
+                     history_rows(predictions(n_employees), 'bench', now - timedelta(days=day)))
+with engine.connect() as conn:
+    total = conn.execute(select(func.count()).select_from(PredictionHistory)).scalar()
+print(f"{total} history rows, {n_employees} employees, {n_days} days")
+
+def best_of(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+def trends(label):
+    db = SessionLocal()
+    employee_ms, employee = best_of(lambda: prediction_trend(db, n_days, 52, employee_id=42))
+    department_ms, department = best_of(lambda: prediction_trend(db, n_days, 52, department='IT'), 3)
+    recent_ms, _ = best_of(lambda: prediction_trend(db, 14, 14, department='IT'))
+    db.close()
+    print(f"  {label:<18} employee {employee_ms:8.2f}ms   department {department_ms:9.2f}ms   "
+          f"department, last 14 days {recent_ms:8.2f}ms")
+    return employee, department
+
+print("Trend queries (52 weekly points):")
+before = trends('raw history')
+report = compact_history(retention)
+print(f"Compacted {report['raw_rows_compacted']} rows in {report['seconds']:.1f}s, "
+      f"keeping {retention} days raw")
+after = trends('after compaction')
+
+for a, b in zip(before, after):
+    assert [p['predictions'] for p in a['points']] == [p['predictions'] for p in b['points']]
+    assert np.allclose([p['attrition_probability'] for p in a['points']],
+                       [p['attrition_probability'] for p in b['points']])
+print("✓ Trends match before and after compaction")
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--employees', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--retention-days', type=int, default=30)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_history_')
+    try:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir}/bench.db", DEBUG='false')
+        subprocess.run([sys.executable, '-c', RUN_SCRIPT, str(args.employees), str(args.days),
+                        str(args.retention_days)], env=env, check=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
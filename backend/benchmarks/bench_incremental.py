@@ -0,0 +1,60 @@
+"""Compare in-memory and incremental (out-of-core) training
+
+Both modes train on the same columnar dataset; each runs in a fresh
+interpreter so peak RSS is attributable to that mode alone.
+
+Run from the backend directory:
+    python -m benchmarks.bench_incremental --rows 1000000
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import os
+from app.ml.generate_data import write_employee_data
+
+TRAIN_SCRIPT = """
+import contextlib, io, json, resource, sys, time
+mode, data_path, model_dir, chunk_size = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    if mode == 'incremental':
+        from app.ml.train_incremental import train_models_incremental
+        metrics = train_models_incremental(data_path, model_dir, chunk_size=chunk_size)
+    else:
+        from app.ml.train_model import train_models
+        metrics = train_models(data_path, model_dir)
+metrics['seconds'] = time.perf_counter() - start
+metrics['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(metrics))
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_incremental_')
+    try:
+        data_path = os.path.join(workdir, 'data.cols')
+        write_employee_data(data_path, args.rows, fmt='columnar')
+
+        print(f"{args.rows} rows, chunk size {args.chunk_size}")
+        print(f"{'mode':>12} {'accuracy':>9} {'rmse':>8} {'r2':>7} {'seconds':>8} {'peak RSS MB':>12}")
+        for mode in ('memory', 'incremental'):
+            output = subprocess.run(
+                [sys.executable, '-c', TRAIN_SCRIPT, mode, data_path,
+                 os.path.join(workdir, mode), str(args.chunk_size)],
+                capture_output=True, text=True, check=True
+            ).stdout
+            m = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:>12} {m['attrition_accuracy']:>9.4f} {m['performance_rmse']:>8.4f} "
+                  f"{m['performance_r2']:>7.4f} {m['seconds']:>8.1f} {m['peak_rss_mb']:>12.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Column-projected NumPy loading versus hydrating Employee ORM objects
+
+Seeds a throwaway SQLite database and builds the model feature matrix for
+every active employee three ways: ORM objects with per-row attribute
+reads (the old path), read_employee_arrays in keyset chunks (what batch
+scoring does) and load_employee_arrays in one streamed pass. All three
+page on the primary key. Reports the best of three runs and checks they
+agree.
+
+Run from the backend directory:
+    python -m benchmarks.bench_loader --rows 200000
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RUN_SCRIPT = """
+import sys, time
+import numpy as np
+from app.database import SessionLocal, engine, init_db
+from app.models.employee import Employee
+from app.ml.db_source import MODEL_COLUMNS, load_employee_arrays, read_employee_arrays
+from app.ml.predict import get_predictor
+
+n, chunk_size = int(sys.argv[1]), int(sys.argv[2])
+init_db()
+rng = np.random.default_rng(0)
+predictor = get_predictor()
+departments = predictor.label_encoder.classes_
+with engine.begin() as conn:
+    for start in range(0, n, 50000):
+        count = min(50000, n - start)
+        dept = departments[rng.integers(0, len(departments), count)]
+        conn.execute(Employee.__table__.insert(), [
+            {'name': f'E{i}', 'email': f'e{i}@example.com', 'department': str(dept[j]),
+             'age': int(rng.integers(22, 61)), 'experience': int(rng.integers(0, 21)),
+             'salary': float(rng.integers(40000, 120001)), 'satisfaction_level': float(rng.random()),
+             'last_evaluation_score': float(rng.random()), 'project_count': int(rng.integers(1, 10)),
+             'work_hours': int(rng.integers(35, 71)), 'is_active': True}
+            for j, i in enumerate(range(start, start + count))
+        ])
+
+def orm_features():
+    db = SessionLocal()
+    features = []
+    last_id = 0
+    while True:
+        employees = db.query(Employee).filter(Employee.id > last_id) \\
+            .order_by(Employee.id).limit(chunk_size).all()
+        if not employees:
+            break
+        last_id = employees[-1].id
+        employees = [e for e in employees if e.is_active]
+        features.append(predictor.prepare_features_many([{
+            'age': e.age, 'experience': e.experience, 'salary': e.salary, 'department': e.department,
+            'satisfaction_level': e.satisfaction_level or 0.7,
+            'last_evaluation_score': e.last_evaluation_score or 0.7,
+            'project_count': e.project_count, 'work_hours': e.work_hours
+        } for e in employees]))
+        db.expunge_all()
+    db.close()
+    return np.vstack(features)
+
+def chunked_features():
+    db = SessionLocal()
+    features = []
+    last_id = 0
+    while True:
+        employees = read_employee_arrays(db, MODEL_COLUMNS + ('is_active',), (Employee.id > last_id,),
+                                         limit=chunk_size)
+        if not len(employees):
+            break
+        last_id = int(employees['id'][-1])
+        employees = employees.take(employees['is_active'])
+        features.append(employees.features(predictor.label_encoder)[0])
+    db.close()
+    return np.vstack(features)
+
+def streamed_features():
+    employees = load_employee_arrays(MODEL_COLUMNS, (Employee.is_active == True,), chunk_size)
+    return employees.features(predictor.label_encoder)[0]
+
+def measure(fn):
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+print(f"{n} active employees, chunks of {chunk_size}")
+print(f"{'':>28} {'seconds':>8} {'rows/s':>10}")
+results = {}
+for label, fn in (('ORM objects', orm_features), ('read_employee_arrays chunks', chunked_features),
+                  ('load_employee_arrays', streamed_features)):
+    seconds, results[label] = measure(fn)
+    print(f"{label:>28} {seconds:>8.2f} {n / seconds:>10.0f}")
+
+reference = results['ORM objects']
+for label, features in results.items():
+    assert np.array_equal(features, reference), label
+print("✓ All three paths build the same feature matrix")
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_loader_')
+    try:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir}/bench.db", DEBUG='false')
+        subprocess.run([sys.executable, '-c', RUN_SCRIPT, str(args.rows), str(args.chunk_size)],
+                       env=env, check=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
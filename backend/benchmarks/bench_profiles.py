@@ -0,0 +1,109 @@
+"""Compare model profiles: single-row latency, memory and accuracy
+
+Trains every profile once on a generated dataset, then measures each in a
+fresh interpreter so RSS reflects only that profile's models.
+
+Run from the backend directory:
+    python -m benchmarks.bench_profiles --rows 50000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from app.ml.generate_data import write_employee_data
+from app.ml.registry import PROFILES, profile_dir
+from app.ml.train_model import train_models
+
+PROFILE_SCRIPT = """
+import json, os, sys, time
+import joblib
+import numpy as np
+from app.ml.predict import MLPredictor
+from app.ml.registry import profile_dir
+from app.ml.train_model import holdout_split, load_training_data
+profile, data_path, model_dir, iterations = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+# Current (not peak) RSS growth from loading just this profile's two models
+path = profile_dir(model_dir, profile)
+baseline_mb = rss_mb()
+models = (joblib.load(f'{path}/attrition_model.pkl'), joblib.load(f'{path}/performance_model.pkl'))
+loaded_mb = rss_mb()
+predictor = MLPredictor(model_dir=model_dir)
+predictor.profiles = {profile: models}
+
+employee = {'department': predictor.label_encoder.classes_[0], 'age': 35, 'experience': 8,
+            'salary': 75000, 'satisfaction_level': 0.6, 'last_evaluation_score': 0.7,
+            'project_count': 4, 'work_hours': 45}
+for _ in range(20):
+    predictor.predict_all(employee, profile)
+timings = []
+for _ in range(iterations):
+    start = time.perf_counter()
+    predictor.predict_all(employee, profile)
+    timings.append(time.perf_counter() - start)
+
+X, y_attrition, y_performance, _ = load_training_data(data_path)
+_, test_index = holdout_split(y_attrition)
+attrition_model, performance_model = predictor.get_models(profile)
+X_test = X[test_index]
+accuracy = (attrition_model.predict(predictor.attrition_scaler.transform(X_test)) == y_attrition[test_index]).mean()
+performance = np.clip(performance_model.predict(predictor.performance_scaler.transform(X_test)), 0, 100)
+rmse = np.sqrt(((performance - y_performance[test_index]) ** 2).mean())
+
+print(json.dumps({
+    'p50_ms': float(np.percentile(timings, 50) * 1000),
+    'p99_ms': float(np.percentile(timings, 99) * 1000),
+    'model_rss_mb': loaded_mb - baseline_mb,
+    'accuracy': float(accuracy),
+    'rmse': float(rmse)
+}))
+"""
+
+def artifact_mb(model_dir, profile):
+    path = profile_dir(model_dir, profile)
+    return sum(
+        os.path.getsize(os.path.join(path, name))
+        for name in ('attrition_model.pkl', 'performance_model.pkl')
+    ) / 1024 / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_profiles_')
+    try:
+        data_path = os.path.join(workdir, 'data.csv')
+        model_dir = os.path.join(workdir, 'models')
+        write_employee_data(data_path, args.rows)
+        with contextlib.redirect_stdout(io.StringIO()):
+            train_models(data_path, model_dir)
+
+        print(f"{args.rows} rows, {args.iterations} single-row predictions per profile")
+        print(f"{'profile':>8} {'p50 ms':>7} {'p99 ms':>7} {'pickle MB':>10} {'RSS MB':>7} "
+              f"{'accuracy':>9} {'rmse':>7}")
+        for profile in PROFILES:
+            output = subprocess.run(
+                [sys.executable, '-c', PROFILE_SCRIPT, profile, data_path, model_dir,
+                 str(args.iterations)],
+                capture_output=True, text=True, check=True
+            ).stdout
+            m = json.loads(output.strip().splitlines()[-1])
+            print(f"{profile:>8} {m['p50_ms']:>7.2f} {m['p99_ms']:>7.2f} "
+                  f"{artifact_mb(model_dir, profile):>10.2f} {m['model_rss_mb']:>7.1f} "
+                  f"{m['accuracy']:>9.4f} {m['rmse']:>7.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Change-driven re-prediction versus re-scoring the whole workforce
+
+Seeds a throwaway SQLite database, queues a burst of employee edits
+(with repeats, as an admin editing a record several times would), and
+times draining the re-prediction queue against a full batch rescore.
+
+Run from the backend directory:
+    python -m benchmarks.bench_repredict --employees 200000 --changes 2000
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RUN_SCRIPT = """
+import sys, time
+import numpy as np
+from app.database import engine, init_db
+from app.models.employee import Employee
+from app.ml.batch_scoring import score_active_employees
+from app.ml.predict import get_predictor
+from app.ml.repredict import RepredictionQueue
+
+n, changes = int(sys.argv[1]), int(sys.argv[2])
+init_db()
+rng = np.random.default_rng(0)
+predictor = get_predictor()
+departments = predictor.label_encoder.classes_
+with engine.begin() as conn:
+    for start in range(0, n, 50000):
+        count = min(50000, n - start)
+        dept = departments[rng.integers(0, len(departments), count)]
+        conn.execute(Employee.__table__.insert(), [
+            {'name': f'E{i}', 'email': f'e{i}@example.com', 'department': str(dept[j]),
+             'age': int(rng.integers(22, 61)), 'experience': int(rng.integers(0, 21)),
+             'salary': float(rng.integers(40000, 120001)), 'satisfaction_level': float(rng.random()),
+             'last_evaluation_score': float(rng.random()), 'project_count': int(rng.integers(1, 10)),
+             'work_hours': int(rng.integers(35, 71)), 'is_active': True}
+            for j, i in enumerate(range(start, start + count))
+        ])
+
+start = time.perf_counter()
+summary = score_active_employees(1, predictor=predictor)
+full_seconds = time.perf_counter() - start
+
+# Edits hit a quarter as many distinct employees as there are events
+queue = RepredictionQueue(debounce_seconds=0, max_delay_seconds=0, batch_size=1000)
+events = rng.choice(rng.integers(1, n + 1, changes // 4), changes)
+for employee_id in events:
+    queue._on_event({'type': 'employee.updated',
+                     'data': {'employee_id': int(employee_id), 'changes': {'work_hours': 50}}})
+start = time.perf_counter()
+updated = queue.drain(flush=True)
+queue_seconds = time.perf_counter() - start
+stats = queue.stats()
+
+print(f"{n} active employees, {changes} edit events on {len(set(events.tolist()))} employees")
+print(f"  full rescore:     {summary['updated_count']:>8} rows in {full_seconds * 1000:9.1f}ms")
+print(f"  queue drain:      {updated:>8} rows in {queue_seconds * 1000:9.1f}ms "
+      f"({stats['batches']} batches, {stats['coalesced']} edits coalesced)")
+print(f"  speedup:          {full_seconds / queue_seconds:8.1f}x")
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--employees', type=int, default=200_000)
+    parser.add_argument('--changes', type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_repredict_')
+    try:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir}/bench.db", DEBUG='false',
+                   HISTORY_ENABLED='false')
+        subprocess.run([sys.executable, '-c', RUN_SCRIPT, str(args.employees), str(args.changes)],
+                       env=env, check=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
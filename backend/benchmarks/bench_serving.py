@@ -0,0 +1,158 @@
+"""Throughput and memory of gunicorn.conf.py serving with 1..N workers
+
+Starts the production server against a throwaway SQLite database, drives
+POST /predict/employee/{id} from concurrent keep-alive clients, then sums
+proportional set size (PSS) over the master and workers. With preloading,
+model pages are shared, so PSS grows by much less than one model copy per
+worker.
+
+Run from the backend directory:
+    python -m benchmarks.bench_serving --workers 1 2 4 --duration 10
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+SEED_SCRIPT = """
+import random, sys
+from app.database import SessionLocal, init_db
+from app.models.employee import Employee
+from app.models.user import User
+from app.utils.auth import create_access_token
+init_db()
+db = SessionLocal()
+db.add(User(username='bench', email='bench@example.com', password_hash='x', role='admin'))
+rnd = random.Random(0)
+for i in range(int(sys.argv[1])):
+    db.add(Employee(name=f'E{i}', email=f'e{i}@example.com',
+                    department=rnd.choice(['IT', 'Sales', 'Marketing', 'HR', 'Finance']),
+                    age=rnd.randint(22, 60), experience=rnd.randint(0, 20),
+                    salary=rnd.randint(40000, 120000), satisfaction_level=rnd.random(),
+                    last_evaluation_score=rnd.random(), project_count=rnd.randint(1, 9),
+                    work_hours=rnd.randint(35, 70), is_active=True))
+db.commit()
+print(create_access_token({'sub': 'bench', 'role': 'admin'}))
+"""
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def client(port, token, employees, duration, results):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    headers = {'Authorization': f'Bearer {token}'}
+    rnd = random.Random(os.getpid())
+    done = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        try:
+            connection.request('POST', f'/predict/employee/{rnd.randint(1, employees)}', headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                done += 1
+            else:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+    results.put((done, errors))
+
+def process_tree(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [pid] + [int(child) for child in f.read().split()]
+
+def memory_mb(pid, field):
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+def run(workers, preload, env, token, employees, clients, duration):
+    port = free_port()
+    server_env = dict(env, SERVER_WORKERS=str(workers), SERVER_PRELOAD=str(preload).lower(),
+                      BIND=f'127.0.0.1:{port}')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app.main:app'],
+        env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(port)
+        # Let every worker boot (and load models when not preloaded)
+        client(port, token, employees, 2.0, multiprocessing.Queue())
+
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=client, args=(port, token, employees, duration, results))
+            for _ in range(clients)
+        ]
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        pids = process_tree(server.pid)
+        return {
+            'requests_per_s': sum(done for done, _ in totals) / duration,
+            'errors': sum(errors for _, errors in totals),
+            'pss_mb': sum(memory_mb(pid, 'Pss') for pid in pids),
+            'worker_rss_mb': max(memory_mb(pid, 'Rss') for pid in pids[1:])
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--employees', type=int, default=1000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_serving_')
+    try:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir}/bench.db", DEBUG='false',
+                   RETRAIN_ENABLED='false')
+        token = subprocess.run(
+            [sys.executable, '-c', SEED_SCRIPT, str(args.employees)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+
+        print(f"{os.cpu_count()} CPUs, {args.clients} clients, {args.duration:.0f}s per run")
+        print(f"{'workers':>7} {'preload':>7} {'req/s':>8} {'errors':>6} {'total PSS MB':>13} "
+              f"{'worker RSS MB':>14}")
+        for workers in args.workers:
+            for preload in (True, False):
+                m = run(workers, preload, env, token, args.employees, args.clients, args.duration)
+                print(f"{workers:>7} {str(preload):>7} {m['requests_per_s']:>8.1f} {m['errors']:>6} "
+                      f"{m['pss_mb']:>13.1f} {m['worker_rss_mb']:>14.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Shadow scoring: latency it adds to the primary prediction
+
+Times single-employee MLPredictor.predict_many calls (the request path)
+with and without a shadow model that takes 50ms per batch, alternating
+at random in one run so both see the same machine noise, and with the
+shadow model scored inline as a synchronous comparison would. The slow
+shadow only sleeps and returns fixed scores, so the worker thread holds
+no CPU and any difference in the primary latency would come from the
+hand-off itself. Fails if the shadowed p50 is more than the margin above
+the unshadowed one or if shadow batches were scored on the request
+thread. Also times the hand-off on its own, and the primary latency
+while the shadow model does real CPU work on the same cores.
+
+Run from the backend directory:
+    python -m benchmarks.bench_shadow
+"""
+import argparse
+import threading
+import time
+import numpy as np
+from app.ml import experiments
+from app.ml.experiments import ModelExperiments
+from app.ml.predict import MLPredictor
+
+EMPLOYEE = {
+    'age': 35, 'experience': 8, 'salary': 65000, 'department': 'IT',
+    'satisfaction_level': 0.6, 'last_evaluation_score': 0.7, 'project_count': 4, 'work_hours': 45
+}
+
+class SlowPredictor:
+    """A model that takes `delay` per batch without using the CPU; records the threads it ran on"""
+
+    def __init__(self, delay: float):
+        self.version = 'slow'
+        self.delay = delay
+        self.threads = set()
+
+    def score_features(self, features, profile=None, observe=True):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return np.full(len(features), 0.55), np.full(len(features), 60.0)
+
+def install(shadow=None, queue_size=64) -> ModelExperiments:
+    # Not synced with the shared configuration, so nothing is written to the model directory
+    ex = ModelExperiments(queue_size, sync_seconds=60)
+    if shadow is not None:
+        ex._predictors[shadow.version] = shadow
+        ex.shadow_version = shadow.version
+        ex._start_shadow_worker()
+    experiments._experiments = ex
+    return ex
+
+def latencies(fn, requests, pause):
+    seconds = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+        time.sleep(pause)
+    return np.array(seconds) * 1000
+
+def report(label, ms):
+    print(f"{label:>34}: p50 {np.percentile(ms, 50):7.2f}ms  p99 {np.percentile(ms, 99):7.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--delay-ms', type=float, default=50)
+    parser.add_argument('--pause-ms', type=float, default=5, help="between requests")
+    parser.add_argument('--margin-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    primary = MLPredictor()
+    predict = lambda: primary.predict_many([EMPLOYEE])
+    for _ in range(20):
+        predict()
+
+    idle = install()
+    slow = SlowPredictor(args.delay_ms / 1000)
+    ex = install(slow)
+    shadowed = np.random.default_rng(0).random(2 * args.requests) < 0.5
+    ms = []
+    for shadow in shadowed:
+        experiments._experiments = ex if shadow else idle
+        ms.extend(latencies(predict, 1, args.pause_ms / 1000))
+    ex.drain()
+    ms = np.array(ms)
+    off, on = ms[~shadowed], ms[shadowed]
+    report("no shadow", off)
+    report(f"shadow ({args.delay_ms:.0f}ms/batch), async", on)
+    stats = ex.stats()['shadow']
+    print(f"{'':>34}  {stats['batches']} batches compared, {stats['dropped_batches']} dropped "
+          f"with the queue full")
+    ex.stop()
+    shadow_threads = set(slow.threads)
+
+    features = primary.prepare_features_many([EMPLOYEE])
+    inline = latencies(
+        lambda: (primary.score_features(features, observe=False), slow.score_features(features)),
+        min(args.requests, 50), args.pause_ms / 1000
+    )
+    report("shadow scored inline", inline)
+
+    handoff = install(queue_size=10 ** 6)
+    handoff._predictors['slow'] = slow
+    handoff.shadow_version = 'slow'
+    probabilities, performances = primary.score_features(features, observe=False)
+    start = time.perf_counter()
+    for _ in range(10000):
+        handoff.shadow(primary, features, probabilities, performances, None)
+    print(f"{'hand-off per batch':>34}: {(time.perf_counter() - start) / 10000 * 1e6:7.2f}us")
+
+    cpu_shadow = MLPredictor()
+    cpu_shadow.experimental = True
+    cpu_shadow.version = 'cpu'
+    ex = install(cpu_shadow)
+    busy = latencies(predict, args.requests, args.pause_ms / 1000)
+    ex.drain()
+    report("shadow doing CPU work, async", busy)
+    ex.stop()
+    install()
+
+    assert shadow_threads and threading.get_ident() not in shadow_threads, "shadow scored on the request thread"
+    increase = np.percentile(on, 50) - np.percentile(off, 50)
+    assert increase < args.margin_ms, f"shadow added {increase:.2f}ms to the primary p50"
+    print(f"✓ Shadow scoring ran off the request thread and moved the primary p50 by {increase:+.2f}ms")
+
+if __name__ == "__main__":
+    main()
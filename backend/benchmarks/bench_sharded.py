@@ -0,0 +1,85 @@
+"""Batch scoring throughput with 1..N worker processes
+
+Seeds a throwaway SQLite database with active employees and re-scores
+all of them with score_active_employees for each worker count. Each run
+is a fresh interpreter, so the numbers include spawning the pool and
+loading the (memory-mapped) models in every worker.
+
+Run from the backend directory:
+    python -m benchmarks.bench_sharded --rows 200000 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+SEED_SCRIPT = """
+import sys
+import numpy as np
+from app.database import engine, init_db
+from app.models.employee import Employee
+init_db()
+n = int(sys.argv[1])
+rng = np.random.default_rng(0)
+departments = np.array(['IT', 'Sales', 'Marketing', 'HR', 'Finance', 'Operations'])
+columns = {
+    'department': departments[rng.integers(0, len(departments), n)],
+    'age': rng.integers(22, 61, n), 'experience': rng.integers(0, 21, n),
+    'salary': rng.integers(40000, 120001, n).astype(float), 'satisfaction_level': rng.random(n),
+    'last_evaluation_score': rng.random(n), 'project_count': rng.integers(1, 10, n),
+    'work_hours': rng.integers(35, 71, n)
+}
+with engine.begin() as conn:
+    for start in range(0, n, 50000):
+        stop = min(start + 50000, n)
+        conn.execute(Employee.__table__.insert(), [
+            dict({name: values[i].item() for name, values in columns.items()},
+                 name=f'E{i}', email=f'e{i}@example.com', is_active=True)
+            for i in range(start, stop)
+        ])
+"""
+
+RUN_SCRIPT = """
+import contextlib, io, json, sys
+from app.ml.batch_scoring import score_active_employees
+workers, chunk_size = int(sys.argv[1]), int(sys.argv[2])
+with contextlib.redirect_stdout(io.StringIO()):
+    summary = score_active_employees(workers, chunk_size=chunk_size)
+print(json.dumps(summary))
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_sharded_')
+    try:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir}/bench.db", DEBUG='false')
+        subprocess.run([sys.executable, '-c', SEED_SCRIPT, str(args.rows)], env=env, check=True)
+
+        print(f"{args.rows} active employees, {os.cpu_count()} CPUs")
+        print(f"{'workers':>7} {'shards':>6} {'seconds':>8} {'rows/s':>8} {'speedup':>8} "
+              f"{'shard rows/s (min-max)':>23}")
+        baseline = None
+        for workers in args.workers:
+            output = subprocess.run(
+                [sys.executable, '-c', RUN_SCRIPT, str(workers), str(args.chunk_size)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            m = json.loads(output.strip().splitlines()[-1])
+            baseline = baseline or m['seconds']
+            shard_rates = [shard['rows_per_s'] for shard in m['shards']]
+            print(f"{workers:>7} {len(m['shards']):>6} {m['seconds']:>8.1f} {m['rows_per_s']:>8.0f} "
+                  f"{baseline / m['seconds']:>7.2f}x "
+                  f"{min(shard_rates):>11.0f} - {max(shard_rates):<9.0f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Dashboard statistics: SQL versus the in-memory workforce snapshot
+
+Seeds a throwaway SQLite database and compares the dashboard endpoint's
+SQL queries against the same statistics computed from the snapshot,
+both freshly (after a change) and cached for an unchanged version. Also
+reports build time, memory and the cost of the write hooks.
+
+Run from the backend directory:
+    python -m benchmarks.bench_snapshot --rows 200000
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RUN_SCRIPT = """
+import sys, time
+import numpy as np
+from app.database import SessionLocal, engine, init_db
+from app.models.employee import Employee
+from app.ml.snapshot import WorkforceSnapshot
+from app.routes.employee import get_dashboard_stats, snapshot_dashboard
+
+n = int(sys.argv[1])
+init_db()
+rng = np.random.default_rng(0)
+departments = np.array(['IT', 'Sales', 'Marketing', 'HR', 'Finance', 'Operations', 'Support'])
+with engine.begin() as conn:
+    for start in range(0, n, 50000):
+        count = min(50000, n - start)
+        dept = departments[rng.integers(0, len(departments), count)]
+        conn.execute(Employee.__table__.insert(), [
+            {'name': f'E{i}', 'email': f'e{i}@example.com', 'department': str(dept[j]),
+             'age': int(rng.integers(22, 61)), 'experience': int(rng.integers(0, 21)),
+             'salary': float(rng.integers(40000, 120001)),
+             'satisfaction_level': float(rng.random()) if rng.random() > 0.05 else None,
+             'last_evaluation_score': float(rng.random()), 'project_count': int(rng.integers(1, 10)),
+             'work_hours': int(rng.integers(35, 71)), 'is_active': bool(rng.random() > 0.15),
+             'attrition_probability': float(rng.random()), 'performance_score': float(rng.random() * 100)}
+            for j, i in enumerate(range(start, start + count))
+        ])
+
+def best_of(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+snapshot = WorkforceSnapshot(max_rows=10_000_000, refresh_seconds=3600)
+snapshot.build()
+memory = snapshot.memory_bytes()
+print(f"{snapshot.size} active employees; snapshot built in {snapshot.build_seconds:.2f}s, "
+      f"{memory['arrays'] / 2**20:.1f}MB arrays + {memory['index'] / 2**20:.1f}MB id index "
+      f"({memory['total'] / snapshot.size:.0f} bytes/employee)")
+
+class Admin:
+    role = 'admin'
+
+db = SessionLocal()
+from app.ml import snapshot as snapshot_module
+snapshot_module._snapshot = WorkforceSnapshot(max_rows=0, refresh_seconds=3600)  # force the SQL path
+import asyncio
+sql_seconds, sql_stats = best_of(lambda: asyncio.run(get_dashboard_stats(db=db, current_user=Admin())))
+
+def fresh():
+    snapshot.version += 1
+    return snapshot.compute('dashboard', snapshot_dashboard)
+fresh_seconds, snapshot_stats = best_of(fresh)
+cached_seconds, _ = best_of(lambda: snapshot.compute('dashboard', snapshot_dashboard), 1000)
+
+sql_stats['department_distribution'].sort(key=lambda d: d['department'])
+assert sql_stats == snapshot_stats, (sql_stats, snapshot_stats)
+
+ids = rng.integers(1, n + 1, 200).tolist()
+start = time.perf_counter()
+for employee_id in ids:
+    snapshot.set_prediction(employee_id, 0.5, 60.0)
+prediction_hook = (time.perf_counter() - start) / len(ids)
+start = time.perf_counter()
+for employee_id in ids:
+    snapshot.reload([employee_id])
+reload_hook = (time.perf_counter() - start) / len(ids)
+
+print(f"  SQL (dashboard queries):      {sql_seconds * 1000:10.2f}ms")
+print(f"  snapshot, after a change:     {fresh_seconds * 1000:10.2f}ms")
+print(f"  snapshot, cached version:     {cached_seconds * 1e6:10.2f}us")
+print(f"  hook: prediction in place:    {prediction_hook * 1e6:10.2f}us")
+print(f"  hook: re-read one employee:   {reload_hook * 1e6:10.2f}us")
+print("✓ Snapshot statistics match SQL")
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_snapshot_')
+    try:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir}/bench.db", DEBUG='false')
+        subprocess.run([sys.executable, '-c', RUN_SCRIPT, str(args.rows)], env=env, check=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Production server: gunicorn master with uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+With SERVER_PRELOAD the master imports the app and loads the models once,
+then forks the workers. They share those pages copy-on-write instead of
+each loading its own copy.
+
+SERVER_WORKERS defaults to 1. With more, SSE clients on /events/stream only
+receive events published by the worker they are connected to, and the
+workforce snapshot and similarity index answer from their last periodic
+refresh for writes made in other workers.
+"""
+import gc
+import multiprocessing
+import os
+from app.config import settings
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = settings.SERVER_WORKERS or multiprocessing.cpu_count()
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = settings.SERVER_PRELOAD
+timeout = 120
+
+def when_ready(server):
+    if not preload_app:
+        return
+
+    from app.ml.predict import get_predictor
+    predictor = get_predictor()
+    server.log.info(f"Preloaded model version {predictor.version} ({', '.join(predictor.profiles)})")
+
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in the workers do not write to (and un-share) its pages
+    gc.collect()
+    gc.freeze()
+
+def post_fork(server, worker):
+    # Pooled connections opened by the master must not be shared with the
+    # children; close=False leaves them for the master to close
+    from app.database import engine
+    engine.dispose(close=False)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import the app package and use its relative model paths, so they
+# run from the backend directory wherever pytest was started
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
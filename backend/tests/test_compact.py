@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestClassifier, RandomForestRegressor
+from app.ml.compact import PARITY_TOLERANCE, CompactForest
+
+def make_data(rows=3000, features=8, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features))
+    # Integer-valued columns put thresholds exactly between float32 values
+    X[:, -2:] = rng.integers(0, 10, size=(rows, 2))
+    signal = X[:, 0] + 0.5 * X[:, 1] * X[:, 2] - 0.3 * X[:, -1]
+    return X, signal
+
+@pytest.fixture(scope="module")
+def data():
+    X, signal = make_data()
+    X_test, _ = make_data(seed=1)
+    return X, signal, X_test
+
+def test_forest_classifier_probabilities_match(data):
+    X, signal, X_test = data
+    model = RandomForestClassifier(n_estimators=30, max_depth=10, min_samples_leaf=2,
+                                   random_state=0).fit(X, signal > 0)
+    compact = CompactForest(model)
+
+    assert np.abs(compact.predict_proba(X_test) - model.predict_proba(X_test)).max() <= PARITY_TOLERANCE
+    assert (compact.predict(X_test) == model.predict(X_test)).all()
+    assert compact.node_count <= compact.nodes_before
+
+def test_forest_regressor_matches(data):
+    X, signal, X_test = data
+    model = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0).fit(X, signal * 10)
+
+    assert np.abs(CompactForest(model).predict(X_test) - model.predict(X_test)).max() <= PARITY_TOLERANCE
+
+def test_gradient_boosting_matches(data):
+    X, signal, X_test = data
+    model = GradientBoostingRegressor(n_estimators=50, max_depth=4, random_state=0).fit(X, signal * 10)
+
+    assert np.abs(CompactForest(model).predict(X_test) - model.predict(X_test)).max() <= PARITY_TOLERANCE
+
+def test_float32_thresholds_route_like_sklearn():
+    # A value between a float64 threshold and its float32 rounding must take the same branch
+    X = np.array([[0.1], [0.1 + 1e-9], [0.2]])
+    model = RandomForestClassifier(n_estimators=1, bootstrap=False, random_state=0).fit(X, [0, 1, 1])
+    compact = CompactForest(model)
+
+    probe = np.array([[np.float32(model.estimators_[0].tree_.threshold[0])], [0.1], [0.2]])
+    assert np.array_equal(compact.predict_proba(probe), model.predict_proba(probe))
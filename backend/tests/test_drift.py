@@ -0,0 +1,67 @@
+import json
+import os
+import numpy as np
+import pytest
+from app.ml.drift import DriftMonitor
+
+REFERENCE = {
+    'rows': 100,
+    'features': {
+        'age': {'edges': [30.0, 40.0], 'counts': [30, 40, 30]},
+        'salary': {'edges': [50000.0], 'counts': [50, 50]}
+    }
+}
+
+@pytest.fixture
+def make_monitor(tmp_path):
+    def make():
+        return DriftMonitor(0, min_rows=1, sync_seconds=60, stats_dir=str(tmp_path / 'stats'),
+                            reset_path=str(tmp_path / 'DRIFT_RESET'))
+    return make
+
+def rows(n, age):
+    return np.column_stack([np.full(n, age), np.full(n, 60000.0)])
+
+def publish_as(monitor, pid):
+    """Publish monitor's counts as if another worker process had"""
+    monitor.publish()
+    with open(monitor._files.own_path) as f:
+        state = json.load(f)
+    os.remove(monitor._files.own_path)
+    with open(os.path.join(monitor._files.directory, f'{pid}.json'), 'w') as f:
+        json.dump(state, f)
+
+def test_report_adds_up_every_workers_counts(make_monitor):
+    other, this = make_monitor(), make_monitor()
+    other.observe('v1', REFERENCE, rows(30, 25))
+    publish_as(other, os.getppid())
+    this.observe('v1', REFERENCE, rows(10, 45))
+
+    report = this.report()
+    assert report['workers'] == 2
+    assert report['rows_observed'] == 40
+    assert report['features']['age']['live'] == [0.75, 0.0, 0.25]
+
+def test_other_versions_and_exited_workers_are_left_out(make_monitor, tmp_path):
+    other, this = make_monitor(), make_monitor()
+    other.observe('v0', REFERENCE, rows(30, 25))
+    publish_as(other, os.getppid())
+    exited = make_monitor()
+    exited.observe('v1', REFERENCE, rows(30, 25))
+    publish_as(exited, 2 ** 22 + 1)  # above the largest possible pid_max, so no such process
+    this.observe('v1', REFERENCE, rows(10, 45))
+
+    report = this.report()
+    assert (report['workers'], report['rows_observed']) == (1, 10)
+    assert not os.path.exists(tmp_path / 'stats' / f'{2 ** 22 + 1}.json')
+
+def test_reset_reaches_other_workers(make_monitor):
+    this, other = make_monitor(), make_monitor()
+    this.observe('v1', REFERENCE, rows(10, 45))
+    other.observe('v1', REFERENCE, rows(10, 45))
+
+    this.reset()
+    other.publish()
+
+    assert other.generation == this.generation
+    assert other.report()['rows_observed'] == 0
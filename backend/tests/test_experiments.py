@@ -0,0 +1,98 @@
+import os
+import shutil
+import threading
+import time
+import numpy as np
+import pytest
+from app.ml import experiments
+from app.ml.experiments import ModelExperiments
+from app.ml.predict import MLPredictor
+
+class BlockingPredictor:
+    """A shadow model that blocks until released; records the threads it ran on"""
+
+    def __init__(self):
+        self.version = 'blocking'
+        self.release = threading.Event()
+        self.threads = []
+
+    def score_features(self, features, profile=None, observe=True):
+        self.threads.append(threading.get_ident())
+        self.release.wait(10)
+        return np.full(len(features), 0.55), np.full(len(features), 60.0)
+
+@pytest.fixture(scope="module")
+def predictor():
+    return MLPredictor()
+
+@pytest.fixture
+def make_experiments(tmp_path, monkeypatch):
+    def make():
+        ex = ModelExperiments(8, sync_seconds=60, config_path=str(tmp_path / 'EXPERIMENTS'),
+                              stats_dir=str(tmp_path / 'stats'))
+        monkeypatch.setattr(experiments, '_experiments', ex)
+        return ex
+    return make
+
+def test_score_features_does_not_wait_for_the_shadow_model(predictor, make_experiments):
+    ex = make_experiments()
+    shadow = BlockingPredictor()
+    ex._predictors[shadow.version] = shadow
+    ex.shadow_version = shadow.version
+    ex._start_shadow_worker()
+    features = predictor.prepare_features_many([{
+        'age': 35, 'experience': 8, 'salary': 65000, 'department': 'IT'
+    }] * 4)
+
+    start = time.perf_counter()
+    for _ in range(3):
+        probabilities, _ = predictor.score_features(features)
+    seconds = time.perf_counter() - start
+
+    assert len(probabilities) == 4
+    assert seconds < 5  # the shadow model is still blocked
+    assert threading.get_ident() not in shadow.threads
+
+    shadow.release.set()
+    ex.drain()
+    assert len(shadow.threads) == 3
+    assert threading.get_ident() not in shadow.threads
+    assert ex.stats()['shadow']['batches'] == 3
+    ex.stop()
+
+def test_configuration_reaches_other_workers(make_experiments):
+    configured, other = make_experiments(), make_experiments()
+    configured.configure(ab_version='base', ab_percent=25.0)
+
+    assert other.sync()
+    assert (other.ab_version, other.ab_percent) == ('base', 25.0)
+    assert other.generation == configured.generation
+
+    configured.reset()
+    other.sync()
+    assert other.generation == configured.generation
+
+def publish_as(ex, pid):
+    """Publish ex's statistics as if another worker process had"""
+    ex.write_stats()
+    os.replace(ex._files.own_path, os.path.join(ex._files.directory, f'{pid}.json'))
+
+def test_stats_survive_stuck_workers_and_skip_exited_ones(make_experiments):
+    healthy = make_experiments()
+    healthy.configure(ab_version='base', ab_percent=50.0)
+    healthy.record_arm('control', {'attrition_prediction': 'Y', 'attrition_probability': 0.7,
+                                   'performance_prediction': 60.0}, 0.002)
+    publish_as(healthy, os.getppid())
+    shutil.copy(os.path.join(healthy._files.directory, f'{os.getppid()}.json'),
+                os.path.join(healthy._files.directory, f'{2 ** 22 + 1}.json'))  # no such process
+
+    stuck = make_experiments()
+    stuck.generation = 'older'  # e.g. could not load the configured version
+    stuck.write_stats()
+    os.remove(stuck._files.own_path)
+
+    reader = make_experiments()
+    reader.sync()
+    stats = reader.stats()
+    assert stats['workers'] == 2
+    assert stats['ab']['arms']['control']['requests'] == 1
@@ -0,0 +1,52 @@
+import time
+import numpy as np
+import pytest
+from app.ml.compact import PARITY_TOLERANCE
+from app.ml.predict import MLPredictor
+
+# Single-row explanation of both models, uncached, as a prediction request pays it
+LATENCY_BUDGET_MS = 5.0
+
+@pytest.fixture(scope="module")
+def predictor():
+    return MLPredictor()
+
+def random_features(predictor, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(22, 61, n), rng.integers(0, 21, n), rng.integers(40000, 120001, n),
+        rng.random(n), rng.random(n), rng.integers(1, 10, n), rng.integers(35, 71, n),
+        rng.integers(0, len(predictor.label_encoder.classes_), n)
+    ]).astype(np.float64)
+
+def test_contributions_add_up_to_predictions(predictor):
+    attrition_model, performance_model = predictor.get_models()
+    attrition_explainer, performance_explainer = predictor.get_explainers()
+    features = random_features(predictor, 2000)
+
+    X = predictor.attrition_scaler.transform(features)
+    bias, contributions = attrition_explainer.contributions(X, output=1)
+    assert contributions.shape == features.shape
+    assert np.abs(bias + contributions.sum(axis=1) - attrition_model.predict_proba(X)[:, 1]).max() <= PARITY_TOLERANCE
+
+    X = predictor.performance_scaler.transform(features)
+    bias, contributions = performance_explainer.contributions(X, output=0)
+    assert np.abs(bias + contributions.sum(axis=1) - performance_model.predict(X)).max() <= PARITY_TOLERANCE
+
+def test_single_row_contributions_within_latency_budget(predictor):
+    explainers = predictor.get_explainers()
+    rows = random_features(predictor, 300, seed=1)
+    attrition_rows = predictor.attrition_scaler.transform(rows)
+    performance_rows = predictor.performance_scaler.transform(rows)
+    for i in range(20):
+        explainers[0].contributions(attrition_rows[i:i + 1], output=1)
+
+    timings = []
+    for i in range(len(rows)):
+        start = time.perf_counter()
+        explainers[0].contributions(attrition_rows[i:i + 1], output=1)
+        explainers[1].contributions(performance_rows[i:i + 1], output=0)
+        timings.append(time.perf_counter() - start)
+
+    p99 = np.percentile(timings, 99) * 1000
+    assert p99 <= LATENCY_BUDGET_MS, f"p99 {p99:.2f}ms over the {LATENCY_BUDGET_MS}ms budget"
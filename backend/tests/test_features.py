@@ -0,0 +1,36 @@
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models.employee import Employee
+from app.ml.db_source import read_employee_arrays
+from app.ml.predict import MLPredictor
+
+def test_missing_inputs_get_the_same_defaults_in_every_scoring_path(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        employee = Employee(name="A", email="a@x.com", department="IT", age=35, experience=8, salary=65000,
+                            satisfaction_level=0.0, last_evaluation_score=None, project_count=None,
+                            work_hours=None, is_active=True)
+        db.add(employee)
+        db.commit()
+        # Null the columns that have a column default
+        db.query(Employee).update({'project_count': None, 'work_hours': None})
+        db.commit()
+
+        predictor = MLPredictor()
+        columnar, known = read_employee_arrays(db).features(predictor.label_encoder)
+        single = predictor.prepare_features_many([{
+            name: getattr(employee, name) for name in (
+                'age', 'experience', 'salary', 'department', 'satisfaction_level',
+                'last_evaluation_score', 'project_count', 'work_hours'
+            )
+        }])
+        omitted = predictor.prepare_features_many([{
+            'age': 35, 'experience': 8, 'salary': 65000, 'department': 'IT', 'satisfaction_level': 0.0
+        }])
+
+    assert known.all()
+    np.testing.assert_array_equal(single, columnar)
+    np.testing.assert_array_equal(omitted, columnar)
@@ -0,0 +1,54 @@
+from app.ml.repredict import RepredictionQueue
+
+class FlakyQueue(RepredictionQueue):
+    """Scores by recording ids; any batch holding a bad id fails"""
+
+    def __init__(self, bad, **kwargs):
+        super().__init__(debounce_seconds=0, max_delay_seconds=0, batch_size=100, **kwargs)
+        self.bad = set(bad)
+        self.scored = []
+        self.calls = 0
+
+    def _score(self, employee_ids):
+        self.calls += 1
+        if self.bad.intersection(employee_ids):
+            raise ValueError("bad row")
+        self.scored.extend(employee_ids)
+        return len(employee_ids)
+
+def test_bad_row_is_isolated_from_its_batch():
+    queue = FlakyQueue(bad=[13])
+    queue.enqueue(range(40))
+
+    assert queue.drain() == 39
+    assert sorted(queue.scored) == [i for i in range(40) if i != 13]
+    assert list(queue._pending) == [13]
+    assert queue.calls < 20
+
+def test_failing_id_is_dropped_after_max_attempts():
+    queue = FlakyQueue(bad=[7], max_attempts=3)
+    queue.enqueue([7])
+
+    for _ in range(5):
+        queue.drain(flush=True)
+
+    assert queue.failed == 1
+    assert not queue._pending and not queue._attempts
+    assert queue.calls == 3
+
+def test_success_clears_earlier_failures():
+    queue = FlakyQueue(bad=[5])
+    queue.enqueue([5])
+    queue.drain(flush=True)
+    assert queue._attempts == {5: 1}
+
+    queue.bad.clear()
+    assert queue.drain(flush=True) == 1
+    assert not queue._attempts and queue.failed == 0
+
+def test_flush_scores_every_batch_past_a_failing_row():
+    queue = FlakyQueue(bad=[13])
+    queue.enqueue(range(250))
+
+    assert queue.drain(flush=True) == 249
+    assert list(queue._pending) == [13]
@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import create_engine
+from app.config import settings
+from app.database import Base
+from app.ml import scheduler
+from app.ml.scheduler import RetrainScheduler
+
+@pytest.fixture
+def fresh_install(tmp_path, monkeypatch):
+    """An empty SQLite database and no retrain state file"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(scheduler, 'engine', engine)
+    monkeypatch.setattr(scheduler, 'STATE_FILE', str(tmp_path / 'retrain_state.json'))
+    monkeypatch.setattr(scheduler, 'RUN_LOCK_FILE', str(tmp_path / '.retrain.run.lock'))
+    monkeypatch.setattr(settings, 'RETRAIN_ENABLED', False)
+
+@pytest.mark.parametrize('history_enabled', [True, False])
+def test_status_of_a_disabled_scheduler_without_a_baseline(fresh_install, monkeypatch, history_enabled):
+    monkeypatch.setattr(settings, 'HISTORY_ENABLED', history_enabled)
+
+    status = RetrainScheduler().status()
+
+    assert status['enabled'] is False
+    assert status['running'] is False
+    assert status['predictions_since_last_training'] == 0
+    assert status['last_trained_at'] is None
+
+def test_pending_changes_records_the_baseline(fresh_install):
+    retrain = RetrainScheduler()
+
+    assert retrain.pending_changes() == 0
+    assert retrain.state['history_id'] == 0
+    assert retrain.status()['predictions_since_last_training'] == 0
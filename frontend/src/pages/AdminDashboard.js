@@ -45,7 +45,7 @@ import {
   Legend,
   ResponsiveContainer,
 } from 'recharts';
-import { employeeAPI, predictionAPI } from '../services/api';
+import { employeeAPI, predictionAPI, eventsAPI, waitForJob } from '../services/api';
 import { useNavigate } from 'react-router-dom';
 import WelcomeTutorial from '../components/WelcomeTutorial';
 
@@ -82,6 +82,18 @@ const AdminDashboard = () => {
         setShowTutorial(true);
       }, 500);
     }
+
+    // Refresh stats when the backend reports changes, coalescing bursts
+    let refreshTimer = null;
+    const unsubscribe = eventsAPI.subscribe(() => {
+      clearTimeout(refreshTimer);
+      refreshTimer = setTimeout(loadStats, 1000);
+    });
+
+    return () => {
+      clearTimeout(refreshTimer);
+      unsubscribe();
+    };
   }, []);
 
   const loadStats = async () => {
@@ -99,10 +111,11 @@ const AdminDashboard = () => {
     setPredicting(true);
     try {
       const response = await predictionAPI.predictBatch();
+      const job = await waitForJob(response.data.id);
       setPredictionDialog({
         open: true,
         type: 'batch',
-        result: response.data,
+        result: job.result,
       });
       await loadStats();
     } catch (error) {
@@ -50,6 +50,7 @@ export const employeeAPI = {
   create: (data) => api.post('/employees/', data),
   update: (id, data) => api.put(`/employees/${id}`, data),
   delete: (id) => api.delete(`/employees/${id}`),
+  getSimilar: (id, params) => api.get(`/employees/${id}/similar`, { params }),
   getStats: () => api.get('/employees/stats/dashboard'),
 };
 
@@ -57,6 +58,58 @@ export const employeeAPI = {
 export const predictionAPI = {
   predictEmployee: (id) => api.post(`/predict/employee/${id}`),
   predictBatch: () => api.post('/predict/batch'),
+  whatIf: (employeeIds, sweeps) => api.post('/predict/what-if', { employee_ids: employeeIds, sweeps }),
+  atRisk: (params) => api.get('/predict/at-risk', { params }),
+  employeeTrend: (id, params) => api.get(`/predict/history/employee/${id}`, { params }),
+  departmentTrend: (department, params) =>
+    api.get(`/predict/history/department/${encodeURIComponent(department)}`, { params }),
+  drift: () => api.get('/predict/drift'),
+  experiments: () => api.get('/predict/experiments'),
+  configureExperiments: (config) => api.put('/predict/experiments', config),
+};
+
+// Jobs API (long-running work returns a job to poll)
+export const jobsAPI = {
+  get: (id) => api.get(`/jobs/${id}`),
+  list: (params) => api.get('/jobs/', { params }),
+  cancel: (id) => api.post(`/jobs/${id}/cancel`),
+};
+
+// Poll a job until it finishes; resolves with the job, rejects if it failed
+export const waitForJob = async (id, intervalMs = 1000) => {
+  for (;;) {
+    const { data: job } = await jobsAPI.get(id);
+    if (job.status === 'succeeded') return job;
+    if (job.status === 'failed' || job.status === 'cancelled') {
+      throw new Error(job.error || `Job ${job.status}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
+// Analytics API (department distributions and departure forecasts)
+export const analyticsAPI = {
+  departments: (bins = 10) => api.get('/analytics/departments', { params: { bins } }),
+  departures: (months = 3, confidence = 0.9) =>
+    api.get('/analytics/departures', { params: { months, confidence } }),
+};
+
+// Events API (server-sent events replace polling for dashboard updates)
+export const eventsAPI = {
+  subscribe: (onEvent) => {
+    const token = localStorage.getItem('token');
+    const source = new EventSource(
+      `${API_URL}/events/stream?access_token=${encodeURIComponent(token || '')}`
+    );
+    source.onmessage = (message) => {
+      try {
+        onEvent(JSON.parse(message.data));
+      } catch (error) {
+        console.error('Error parsing event:', error);
+      }
+    };
+    return () => source.close();
+  },
 };
 
 // Feedback API